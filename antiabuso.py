@@ -0,0 +1,123 @@
+"""
+Limite de tentativas de contribuição por e-mail, CPF e IP, com contadores de
+janela deslizante (aproximada por dois baldes fixos: o atual e o anterior,
+ponderado pelo quanto dele ainda cabe na janela). Nenhuma consulta ao banco.
+
+Sem ANTIABUSO_REDIS_URL os contadores ficam na memória do worker (LRU
+limitado a ANTIABUSO_MAX_CHAVES, com TTL de duas janelas); com ele, ficam no
+Redis e valem para todos os workers. As chaves são hashes: e-mails e CPFs não
+vão em claro para o Redis.
+"""
+import hashlib
+import threading
+import time
+from config import Config
+from lru_cache import LRUCache
+from metrics import metrics
+from security import logger
+
+
+def _baldes(janela):
+    """(balde atual, peso do balde anterior) para o instante atual"""
+    agora = time.time()
+    return int(agora // janela), 1 - (agora % janela) / janela
+
+
+class ContadorMemoria:
+    def __init__(self, max_chaves=None):
+        self._janelas = LRUCache(max_itens=max_chaves or Config.ANTIABUSO_MAX_CHAVES)
+        self._lock = threading.Lock()
+
+    def registrar(self, chave, limite, janela):
+        """Conta uma tentativa se ainda cabe no limite; False (sem contar) se não cabe"""
+        balde, peso = _baldes(janela)
+        with self._lock:
+            balde_salvo, atual, anterior = self._janelas.get(chave) or (balde, 0, 0)
+            if balde_salvo != balde:
+                anterior = atual if balde_salvo == balde - 1 else 0
+                atual = 0
+            permitido = anterior * peso + atual < limite
+            if permitido:
+                atual += 1
+            self._janelas.set(chave, (balde, atual, anterior), ttl=2 * janela)
+        return permitido
+
+    def estatisticas(self):
+        return self._janelas.stats()
+
+
+class ContadorRedis:
+    # Lê os dois baldes e incrementa o atual numa operação só (atômico entre workers)
+    SCRIPT = """
+    local atual = tonumber(redis.call('GET', KEYS[1]) or '0')
+    local anterior = tonumber(redis.call('GET', KEYS[2]) or '0')
+    if anterior * tonumber(ARGV[1]) + atual >= tonumber(ARGV[2]) then
+        return 0
+    end
+    redis.call('INCR', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return 1
+    """
+
+    def __init__(self, url, prefixo='antiabuso'):
+        import redis
+        self._erro_redis = redis.RedisError
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._cliente.register_script(self.SCRIPT)
+        self.prefixo = prefixo
+
+    def registrar(self, chave, limite, janela):
+        balde, peso = _baldes(janela)
+        chaves = [f'{self.prefixo}:{chave}:{balde}', f'{self.prefixo}:{chave}:{balde - 1}']
+        try:
+            return bool(self._script(keys=chaves, args=[peso, limite, int(2 * janela)]))
+        except self._erro_redis as e:
+            # Redis fora não pode derrubar as contribuições: deixa passar e registra
+            metrics.incr('antiabuso.erros_redis')
+            logger.warning("antiabuso_redis_indisponivel", error=str(e))
+            return True
+
+    def estatisticas(self):
+        return {'backend': 'redis'}
+
+
+_contador = None
+_contador_lock = threading.Lock()
+
+
+def contador():
+    """Contador do processo: Redis se ANTIABUSO_REDIS_URL estiver definido, senão memória"""
+    global _contador
+    if _contador is None:
+        with _contador_lock:
+            if _contador is None:
+                _contador = (ContadorRedis(Config.ANTIABUSO_REDIS_URL) if Config.ANTIABUSO_REDIS_URL
+                             else ContadorMemoria())
+    return _contador
+
+
+def _normalizar(dimensao, valor):
+    valor = str(valor).strip().lower()
+    if dimensao == 'cpf':
+        valor = ''.join(c for c in valor if c.isdigit())
+    return hashlib.sha256(f'{dimensao}:{valor}'.encode()).hexdigest()[:24]
+
+
+def registrar_tentativa(**valores):
+    """
+    Conta uma tentativa para cada dimensão informada (email=, cpf=, ip=) com
+    limite em ANTIABUSO_LIMITES. Devolve a primeira dimensão que estourou o
+    limite, ou None se a tentativa pode seguir.
+    """
+    for dimensao, valor in valores.items():
+        limite = Config.ANTIABUSO_LIMITES.get(dimensao)
+        if not valor or not limite:
+            continue
+        maximo, janela = limite
+        if not contador().registrar(_normalizar(dimensao, valor), maximo, janela):
+            metrics.incr(f'antiabuso.bloqueadas.{dimensao}')
+            return dimensao
+    return None
+
+
+metrics.registrar_fonte('antiabuso', lambda: contador().estatisticas())
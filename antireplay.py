@@ -0,0 +1,132 @@
+"""
+Proteção contra replay e entregas duplicadas de webhooks, antes de qualquer
+consulta ao banco ou ao provedor: o evento precisa estar dentro da janela de
+tempo (WEBHOOK_JANELA_SEGUNDOS, pelo horário que vem no corpo assinado) e não
+pode ter sido visto antes. Os vistos ficam por duas janelas: replay dentro da
+janela é barrado aqui, e fora dela, pela data.
+
+O registro fica num LRU do worker (limitado a WEBHOOK_VISTOS_MAX) e, com
+WEBHOOK_REDIS_URL, também no Redis (SET NX EX), valendo para todos os workers.
+O LRU responde primeiro: o mesmo evento em rajada não vai nem ao Redis.
+
+Uso num handler de webhook, logo depois de validar a assinatura:
+
+    motivo, chave = verificar_evento('mercadopago', evento_id=..., assinatura=..., corpo=..., instante=...)
+    if motivo:
+        return jsonify({'status': motivo}), 200  # o provedor para de reenviar
+    ...processa; se falhar (exceção ou 5xx): esquecer_evento(chave)
+
+Os webhooks estão desativados nesta versão (routes/webhook.py não é registrado);
+o módulo fica pronto para quando forem religados.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime
+from config import Config
+from lru_cache import LRUCache
+from metrics import metrics
+from security import logger
+
+
+class VistosMemoria:
+    def __init__(self, max_chaves=None):
+        self._vistos = LRUCache(max_itens=max_chaves or Config.WEBHOOK_VISTOS_MAX)
+
+    def registrar(self, chave, ttl):
+        """True se a chave é nova (e passa a constar como vista); False se repetida"""
+        return self._vistos.add(chave, True, ttl=ttl)
+
+    def esquecer(self, chave):
+        self._vistos.delete(chave)
+
+    def estatisticas(self):
+        return self._vistos.stats()
+
+
+class VistosRedis:
+    def __init__(self, url, prefixo='webhook:visto'):
+        import redis
+        self._erro_redis = redis.RedisError
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._local = VistosMemoria()
+        self.prefixo = prefixo
+
+    def registrar(self, chave, ttl):
+        if not self._local.registrar(chave, ttl):
+            return False
+        try:
+            return bool(self._cliente.set(f'{self.prefixo}:{chave}', 1, nx=True, ex=int(ttl)))
+        except self._erro_redis as e:
+            # Redis fora: fica só a proteção deste worker (o processamento já é idempotente)
+            metrics.incr('webhook.erros_redis')
+            logger.warning("webhook_redis_indisponivel", error=str(e))
+            return True
+
+    def esquecer(self, chave):
+        self._local.esquecer(chave)
+        try:
+            self._cliente.delete(f'{self.prefixo}:{chave}')
+        except self._erro_redis:
+            metrics.incr('webhook.erros_redis')
+
+    def estatisticas(self):
+        return dict(self._local.estatisticas(), backend='redis')
+
+
+_vistos = None
+_vistos_lock = threading.Lock()
+
+
+def vistos():
+    """Registro do processo: LRU + Redis se WEBHOOK_REDIS_URL estiver definido, senão só o LRU"""
+    global _vistos
+    if _vistos is None:
+        with _vistos_lock:
+            if _vistos is None:
+                _vistos = (VistosRedis(Config.WEBHOOK_REDIS_URL) if Config.WEBHOOK_REDIS_URL
+                           else VistosMemoria())
+    return _vistos
+
+
+def chave_evento(provedor, evento_id=None, assinatura=None, corpo=b''):
+    """Id do evento, senão a assinatura, senão o hash do corpo (sempre com o provedor)"""
+    origem = evento_id or assinatura or hashlib.sha256(corpo or b'').hexdigest()
+    return hashlib.sha256(f'{provedor}:{origem}'.encode()).hexdigest()[:32]
+
+
+def _epoch(instante):
+    """Segundos desde a época a partir de ISO 8601 ou número (segundos ou milissegundos)"""
+    if isinstance(instante, (int, float)) and not isinstance(instante, bool):
+        return instante / 1000 if instante > 10**12 else float(instante)
+    try:
+        return datetime.fromisoformat(str(instante)).timestamp()
+    except ValueError:
+        return None
+
+
+def verificar_evento(provedor, evento_id=None, assinatura=None, corpo=b'', instante=None):
+    """
+    Recusa replays em O(1): devolve (motivo, chave), com motivo 'expirado' (fora
+    da janela), 'duplicado' (já visto) ou None se o evento pode ser processado.
+    Eventos sem horário só passam pelo registro de vistos.
+    """
+    janela = Config.WEBHOOK_JANELA_SEGUNDOS
+    chave = chave_evento(provedor, evento_id, assinatura, corpo)
+    if instante is not None and janela:
+        momento = _epoch(instante)
+        if momento is None or abs(time.time() - momento) > janela:
+            metrics.incr(f'webhook.expirados.{provedor}')
+            return 'expirado', chave
+    if not vistos().registrar(chave, ttl=2 * janela or 3600):
+        metrics.incr(f'webhook.duplicados.{provedor}')
+        return 'duplicado', chave
+    return None, chave
+
+
+def esquecer_evento(chave):
+    """Libera o evento para a próxima entrega (o processamento falhou)"""
+    vistos().esquecer(chave)
+
+
+metrics.registrar_fonte('webhook_vistos', lambda: vistos().estatisticas())
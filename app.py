@@ -4,8 +4,20 @@ from config import Config
 from database import db, init_db
 from routes import register_routes
 from models.presente import Presente
+from services.catalogo_service import presentes_ativos, versao_catalogo
+from services.imagem_service import init_imagens
+from services.lista_service import init_listas, lista_atual
+from services.busca_service import init_busca
+from services.agregados_service import init_agregados
+from services.resiliencia import init_resiliencia
+from assets import init_assets
+from jinja_cache import init_jinja_cache
 from security import init_security, cache, logger
 from production import init_production, validate_request_json
+from tracing import init_tracing
+from profiling import init_profiling
+from snapshot import init_snapshot
+from aquecimento import init_aquecimento
 import os
 import time
 
@@ -24,6 +36,27 @@ def create_app():
     # Inicializa segurança (CORS, Rate Limit, Cache)
     init_security(app)
     
+    # Prazo por requisição para retries e timeouts das chamadas externas
+    init_resiliencia(app)
+    
+    # Lista padrão e resolução da lista por domínio ou /l/<slug>/ (multi-lista)
+    init_listas(app)
+    
+    # Índice de busca textual (FTS5 no SQLite, tsvector/GIN no PostgreSQL)
+    init_busca(app)
+    
+    # Agregados do painel (por hora/dia) mantidos a cada contribuição gravada
+    init_agregados(app)
+    
+    # Helpers de imagens responsivas (srcset WebP/AVIF) nos templates
+    init_imagens(app)
+    
+    # Assets com fingerprint, cache imutável e versões pré-comprimidas
+    init_assets(app)
+    
+    # Templates compilados uma vez (no build) e lidos do disco por todos os workers
+    init_jinja_cache(app)
+    
     # Inicializa configurações de produção se necessário
     if Config.PRODUCTION:
         init_production(app)
@@ -33,15 +66,17 @@ def create_app():
     
     # Rota principal
     @app.route('/')
-    @cache.cached(timeout=300)  # Cache por 5 minutos
+    @cache.cached(timeout=300, key_prefix=lambda: f"view/index/{lista_atual().id}/v{versao_catalogo(lista_atual().id)}")  # Cache por 5 minutos ou até o catálogo da lista mudar
     def index():
         try:
-            presentes = Presente.query.filter_by(ativo=True).all()  # Corrigido: usa 'ativo'
-            logger.info("presentes_carregados", quantidade=len(presentes))
+            lista = lista_atual()
+            presentes = presentes_ativos(lista.id)
+            logger.info("presentes_carregados", quantidade=len(presentes), lista_id=lista.id)
             return render_template('index.html', 
                                  presentes=presentes,
-                                 noivo_nome=Config.NOIVO_NOME,
-                                 data_casamento=Config.DATA_CASAMENTO)
+                                 noivo_nome=lista.noivo_nome,
+                                 data_casamento=lista.data_casamento,
+                                 chave_pix=lista.chave_pix)
         except Exception as e:
             print(f"💥 Erro na rota principal: {e}")
             return "Erro ao carregar a página"
@@ -61,6 +96,9 @@ def create_app():
         except Exception as e:
             return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
     
+    # /readyz: 503 até o aquecimento do worker terminar
+    init_aquecimento(app)
+    
     # Rota de status da API
     @app.route('/api/status')
     def api_status():
@@ -71,6 +109,15 @@ def create_app():
             'payment_methods': ['pix']
         })
     
+    # Tracing das fases da requisição e do SQL (depois de todas as rotas e hooks)
+    init_tracing(app)
+    
+    # Profiler sob demanda (instalado com ADMIN_TOKEN ou PROFILE_SAMPLE_RATE)
+    init_profiling(app)
+    
+    # Páginas públicas em HTML estático, servidas antes do Flask (só com SNAPSHOT=1)
+    init_snapshot(app)
+    
     return app
 
 app = create_app()
@@ -0,0 +1,122 @@
+"""
+Aquecimento do worker: depois do fork (ou de uma reciclagem por max_requests,
+ou da subida a frio no Fly), abre as conexões do pool, compila os templates,
+carrega o catálogo no cache e faz requisições sintéticas pela pilha inteira,
+antes que a primeira requisição de verdade pague por isso.
+
+No Gunicorn roda em post_worker_init (gunicorn.conf.py), antes do worker
+aceitar conexões. Em outros servidores, a primeira sonda em /readyz dispara o
+aquecimento em segundo plano. /readyz responde 503 até ele terminar.
+"""
+import os
+import threading
+import time
+from flask import jsonify
+from config import Config
+from metrics import metrics
+from security import logger
+
+# Requisições sintéticas (rotas públicas mais acessadas; GET sem efeito colateral)
+ROTAS = ('/', '/api/presentes')
+
+_lock = threading.Lock()
+_estado = {'pid': None, 'pronto': False, 'iniciado': False, 'etapas_ms': {}, 'erros': {}}
+
+
+def _estado_atual():
+    """Estado deste processo (o herdado do master no fork não vale)"""
+    if _estado['pid'] != os.getpid():
+        _estado.update(pid=os.getpid(), pronto=False, iniciado=False, etapas_ms={}, erros={})
+    return _estado
+
+
+def _abrir_conexoes(app):
+    from database import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            conexoes = []
+            try:
+                for _ in range(Config.AQUECIMENTO_CONEXOES):
+                    conexao = engine.connect()
+                    conexoes.append(conexao)
+                    conexao.exec_driver_sql('SELECT 1')
+            finally:
+                # Devolvidas ao pool, já abertas
+                for conexao in conexoes:
+                    conexao.close()
+
+
+def _compilar_templates(app):
+    from jinja_cache import precompilar
+    precompilar(app)
+
+
+def _carregar_catalogo(app):
+    from services.catalogo_service import presentes_ativos, versao_catalogo
+    from services.lista_service import lista_padrao_info
+
+    with app.app_context():
+        lista = lista_padrao_info()
+        versao_catalogo(lista.id)
+        presentes_ativos(lista.id)
+
+
+def _requisicoes_sinteticas(app):
+    cliente = app.test_client()
+    for rota in ROTAS:
+        resposta = cliente.get(rota)
+        resposta.close()
+        if resposta.status_code >= 500:
+            raise RuntimeError(f'{rota} respondeu {resposta.status_code}')
+
+
+ETAPAS = (
+    ('conexoes', _abrir_conexoes),
+    ('templates', _compilar_templates),
+    ('catalogo', _carregar_catalogo),
+    ('requisicoes', _requisicoes_sinteticas),
+)
+
+
+def aquecer(app):
+    """
+    Roda as etapas do aquecimento uma vez por processo e marca o worker como
+    pronto. Uma etapa que falha é registrada e não impede as outras.
+    """
+    with _lock:
+        estado = _estado_atual()
+        if estado['iniciado'] or not Config.AQUECIMENTO:
+            return estado
+        estado['iniciado'] = True
+
+    inicio = time.perf_counter()
+    for nome, etapa in ETAPAS:
+        t0 = time.perf_counter()
+        try:
+            etapa(app)
+        except Exception as e:
+            estado['erros'][nome] = str(e)
+            metrics.incr('aquecimento.erros')
+            logger.warning("aquecimento_etapa_falhou", etapa=nome, error=str(e))
+        estado['etapas_ms'][nome] = round((time.perf_counter() - t0) * 1000, 1)
+    total_ms = round((time.perf_counter() - inicio) * 1000, 1)
+    metrics.observe('aquecimento.ms', total_ms)
+    estado['pronto'] = True
+    logger.info("worker_aquecido", pid=os.getpid(), total_ms=total_ms, **estado['etapas_ms'])
+    return estado
+
+
+def init_aquecimento(app):
+    """Registra /readyz (pronto só depois do aquecimento deste worker)"""
+
+    @app.route('/readyz')
+    def readyz():
+        estado = _estado_atual()
+        if estado['pronto'] or not Config.AQUECIMENTO:
+            return jsonify({'status': 'pronto', 'etapas_ms': estado['etapas_ms'], 'erros': estado['erros']})
+        if not estado['iniciado']:
+            threading.Thread(target=aquecer, args=(app,), name='aquecimento', daemon=True).start()
+        return jsonify({'status': 'aquecendo'}), 503
+
+    return app
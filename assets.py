@@ -0,0 +1,146 @@
+"""
+Assets estáticos com fingerprint: manifesto de nomes com hash de conteúdo,
+cache imutável e versões pré-comprimidas (.gz/.br) servidas por negociação
+de Accept-Encoding, sem custo de compressão por requisição.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from flask import request, send_from_directory, abort
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# Pastas de static/ que recebem fingerprint
+PASTAS = ('css', 'js', 'images')
+
+# Tipos de texto que ganham irmãos .gz/.br no build
+COMPRIMIVEIS = ('.css', '.js', '.svg', '.json', '.html', '.txt')
+
+# Um ano: o nome muda sempre que o conteúdo muda
+MAX_AGE_IMUTAVEL = 31536000
+
+# Prefixos servidos com cache imutável (nomes endereçados por conteúdo)
+PREFIXOS_IMUTAVEIS = ('/static/dist/', '/static/cache/')
+
+# Encodings pré-comprimidos, em ordem de preferência
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _hash(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(65536), b''):
+            h.update(bloco)
+    return h.hexdigest()[:12]
+
+
+def _comprimir(caminho):
+    """Grava os irmãos .gz e .br (se o brotli estiver disponível)"""
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    with open(caminho + '.gz', 'wb') as f:
+        f.write(gzip.compress(dados, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    with open(caminho + '.br', 'wb') as f:
+        f.write(brotli.compress(dados, quality=11))
+
+
+def construir_assets():
+    """Copia os assets para static/dist com hash no nome e grava o manifesto"""
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+
+    manifesto = {}
+    for pasta in PASTAS:
+        origem = os.path.join(STATIC_DIR, pasta)
+        for raiz, _, arquivos in os.walk(origem):
+            for nome in sorted(arquivos):
+                caminho = os.path.join(raiz, nome)
+                relativo = os.path.relpath(caminho, STATIC_DIR).replace(os.sep, '/')
+                base, ext = os.path.splitext(relativo)
+                hasheado = f'{base}.{_hash(caminho)}{ext}'
+
+                destino = os.path.join(DIST_DIR, hasheado)
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                shutil.copy2(caminho, destino)
+                if ext.lower() in COMPRIMIVEIS:
+                    _comprimir(destino)
+                manifesto[relativo] = f'dist/{hasheado}'
+
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+    return manifesto
+
+
+def carregar_manifesto():
+    """Lê o manifesto gerado no build (vazio em desenvolvimento)"""
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_assets(app):
+    """Reescreve url_for('static') para os nomes com hash e serve static/dist"""
+    manifesto = carregar_manifesto()
+    app.extensions['assets_manifest'] = manifesto
+
+    def asset_url(caminho):
+        """Versão com fingerprint de um caminho /static/... literal (ex.: imagem_url)"""
+        if caminho and caminho.startswith('/static/'):
+            hasheado = manifesto.get(caminho[len('/static/'):])
+            if hasheado:
+                return f'/static/{hasheado}'
+        return caminho
+
+    app.jinja_env.globals['asset_url'] = asset_url
+
+    if manifesto:
+        @app.url_defaults
+        def fingerprint_static(endpoint, values):
+            if endpoint == 'static' and values.get('filename') in manifesto:
+                values['filename'] = manifesto[values['filename']]
+
+    @app.route('/static/dist/<path:filename>')
+    def static_dist(filename):
+        if filename.endswith(('.gz', '.br')) or filename == 'manifest.json':
+            abort(404)
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        aceitos = request.accept_encodings
+        for encoding, sufixo in ENCODINGS:
+            if aceitos[encoding] and os.path.isfile(os.path.join(DIST_DIR, filename + sufixo)):
+                response = send_from_directory(DIST_DIR, filename + sufixo, mimetype=mimetype,
+                                               max_age=MAX_AGE_IMUTAVEL)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(DIST_DIR, filename, mimetype=mimetype,
+                                           max_age=MAX_AGE_IMUTAVEL)
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    @app.after_request
+    def cache_imutavel(response):
+        if request.path.startswith(PREFIXOS_IMUTAVEIS) and response.status_code in (200, 304):
+            response.cache_control.public = True
+            response.cache_control.max_age = MAX_AGE_IMUTAVEL
+            response.cache_control.immutable = True
+        return response
+
+    return app
+
+
+if __name__ == '__main__':
+    manifesto = construir_assets()
+    print(f"✅ {len(manifesto)} assets com fingerprint em {DIST_DIR}")
@@ -2,6 +2,7 @@
 from app import create_app
 from database import db
 from models.presente import Presente
+from dinheiro import reais_texto
 
 app = create_app()
 
@@ -14,7 +15,7 @@ with app.app_context():
         if count > 0:
             presentes = Presente.query.all()
             for p in presentes:
-                print(f"🎁 {p.nome} - R$ {p.valor_total} - Ativo: {p.ativo}")
+                print(f"🎁 {p.nome} - R$ {reais_texto(p.valor_total_centavos)} - Ativo: {p.ativo}")
         else:
             print("❌ Nenhum presente encontrado no banco!")
             
@@ -1,6 +1,5 @@
 # check_production.py
 import os
-import mercadopago
 from config import Config
 
 def verificar_configuracao_mp():
@@ -26,33 +25,14 @@ def verificar_configuracao_mp():
     
     print("✅ Token de produção configurado:", access_token[:20] + "...")
     
-    # Testa a conexão
+    # Testa a conexão (cliente compartilhado, com timeouts; só leitura, nada é criado na conta)
     try:
-        sdk = mercadopago.SDK(access_token)
-        test_data = {
-            "items": [{
-                "title": "Teste Conexão Produção",
-                "quantity": 1,
-                "currency_id": "BRL",
-                "unit_price": 10.0
-            }]
-        }
-        
-        result = sdk.preference().create(test_data)
-        
-        if result and "response" in result:
-            response_data = result["response"]
-            if "init_point" in response_data:
-                print("✅ Conexão com Mercado Pago PRODUÇÃO - OK")
-                return True
-            else:
-                print("❌ Resposta inválida do Mercado Pago")
-                if "message" in response_data:
-                    print(f"   Erro: {response_data['message']}")
-                return False
-        else:
-            print("❌ Falha na comunicação com Mercado Pago")
-            return False
+        from services.mercado_pago_service import MercadoPagoService
+        if MercadoPagoService(access_token).testar_credenciais():
+            print("✅ Conexão com Mercado Pago PRODUÇÃO - OK")
+            return True
+        print("❌ Token recusado pelo Mercado Pago")
+        return False
             
     except Exception as e:
         print(f"❌ Erro ao testar Mercado Pago: {e}")
@@ -15,15 +15,70 @@ class Config:
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
     RATE_LIMIT_APP = os.environ.get('RATE_LIMIT_APP', '100/hour')  # Limite global
     RATE_LIMIT_PAYMENT = os.environ.get('RATE_LIMIT_PAYMENT', '10/minute')  # Limite pagamentos
+    # Antiabuso de /api/contribuir: tentativas/janela em segundos por e-mail, CPF e IP (antiabuso.py)
+    # Ex.: ANTIABUSO_LIMITES="email=5/300,cpf=5/300,ip=20/300"; uma dimensão ausente não é limitada
+    ANTIABUSO_LIMITES = {
+        nome.strip(): tuple(int(parte) for parte in limite.split('/'))
+        for nome, limite in (
+            item.split('=') for item in os.environ.get(
+                'ANTIABUSO_LIMITES', 'email=5/300,cpf=5/300,ip=20/300'
+            ).split(',') if '=' in item
+        )
+    }
+    ANTIABUSO_REDIS_URL = os.environ.get('ANTIABUSO_REDIS_URL')  # contadores compartilhados entre workers
+    ANTIABUSO_MAX_CHAVES = int(os.environ.get('ANTIABUSO_MAX_CHAVES', 100000))  # sem Redis: chaves na memória
     
     # Cache
     CACHE_TYPE = 'simple'  # Usando cache simples em memória
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutos
     
+    # Compressão (produção): respostas em streaming (exportações) não são bufferizadas para comprimir
+    COMPRESS_STREAMS = False
+    
+    # Compressão (produção): cache das respostas comprimidas e nível por tipo de conteúdo
+    COMPRESS_CACHE_MAX_BYTES = int(os.environ.get('COMPRESS_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+    COMPRESS_NIVEIS = {
+        # Respostas cacheadas são comprimidas uma vez, então vale um nível mais alto
+        'text/html': {'gzip': 9, 'br': 9},
+        'application/json': {'gzip': 6, 'br': 5},
+        'text/css': {'gzip': 9, 'br': 11},
+        'application/javascript': {'gzip': 9, 'br': 11}
+    }
+    
+    # Administração (métricas, exportações): token enviado em "Authorization: Bearer <token>"
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    
     # Mercado Pago
     MERCADOPAGO_ACCESS_TOKEN = os.environ.get("MERCADOPAGO_ACCESS_TOKEN")
     MERCADOPAGO_WEBHOOK_SECRET = os.environ.get("MERCADOPAGO_WEBHOOK_SECRET")
     MERCADOPAGO_WEBHOOK_URL = os.environ.get('MERCADOPAGO_WEBHOOK_URL')
+    # Base da API (o stub local de scripts/mercadopago_stub.py serve para testes)
+    MERCADOPAGO_API_URL = os.environ.get('MERCADOPAGO_API_URL', 'https://api.mercadopago.com')
+    # Cliente HTTP compartilhado: timeouts de conexão e de leitura (segundos), pool e cache das consultas por id
+    MERCADOPAGO_CONNECT_TIMEOUT = float(os.environ.get('MERCADOPAGO_CONNECT_TIMEOUT', 3.05))
+    MERCADOPAGO_READ_TIMEOUT = float(os.environ.get('MERCADOPAGO_READ_TIMEOUT', 10))
+    MERCADOPAGO_POOL_MAX = int(os.environ.get('MERCADOPAGO_POOL_MAX', 10))  # conexões mantidas por host
+    MERCADOPAGO_CACHE_TTL = int(os.environ.get('MERCADOPAGO_CACHE_TTL', 30))  # segundos; 0 desliga
+    MERCADOPAGO_CACHE_MAX = int(os.environ.get('MERCADOPAGO_CACHE_MAX', 1000))
+    # Tentativas por consulta em falhas transitórias (1 = sem retry)
+    MERCADOPAGO_TENTATIVAS = int(os.environ.get('MERCADOPAGO_TENTATIVAS', 3))
+    # Disjuntor das dependências externas: abre após N falhas seguidas (0 desliga) e testa de novo depois de X segundos
+    DISJUNTOR_FALHAS = int(os.environ.get('DISJUNTOR_FALHAS', 5))
+    DISJUNTOR_ABERTO_SEGUNDOS = float(os.environ.get('DISJUNTOR_ABERTO_SEGUNDOS', 30))
+    # Prazo de cada requisição: retries e timeouts das chamadas externas nunca passam dele
+    REQUEST_DEADLINE_SEGUNDOS = float(os.environ.get('REQUEST_DEADLINE_SEGUNDOS', 15))
+    # Fila em background das tarefas adiadas (services/resiliencia.py)
+    RETRY_FILA_MAX = int(os.environ.get('RETRY_FILA_MAX', 1000))
+    # Webhooks: janela do horário do evento e eventos já vistos (antireplay.py), com Redis opcional entre workers
+    WEBHOOK_JANELA_SEGUNDOS = int(os.environ.get('WEBHOOK_JANELA_SEGUNDOS', 900))
+    WEBHOOK_VISTOS_MAX = int(os.environ.get('WEBHOOK_VISTOS_MAX', 100000))
+    WEBHOOK_REDIS_URL = os.environ.get('WEBHOOK_REDIS_URL')
+    
+    # Reconciliação de contribuições pendentes (webhooks perdidos): reconciliar_pagamentos.py
+    RECONCILIACAO_LOTE = int(os.environ.get('RECONCILIACAO_LOTE', 100))
+    RECONCILIACAO_THREADS = int(os.environ.get('RECONCILIACAO_THREADS', 8))
+    RECONCILIACAO_TAXA = float(os.environ.get('RECONCILIACAO_TAXA', 20))  # consultas/s ao provedor
+    RECONCILIACAO_IDADE_MINIMA = int(os.environ.get('RECONCILIACAO_IDADE_MINIMA', 600))  # segundos
     
     if PRODUCTION:
         if not MERCADOPAGO_ACCESS_TOKEN:
@@ -47,8 +102,8 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
-    # Engine options: somente aplicar SSL em produção
-    if PRODUCTION:
+    # Engine options: somente aplicar SSL em produção (e nunca no SQLite, que não tem sslmode)
+    if PRODUCTION and not (SQLALCHEMY_DATABASE_URI or '').startswith('sqlite'):
         SQLALCHEMY_ENGINE_OPTIONS = {
             'pool_size': 1,
             'max_overflow': 2,
@@ -64,48 +119,96 @@ class Config:
         SQLALCHEMY_ENGINE_OPTIONS = {
             'pool_pre_ping': True
         }
-    
-    # Configurações do Casal
+
+    # Perfil SQLite para vários workers: WAL, busy_timeout e BEGIN IMMEDIATE nas escritas
+    SQLITE_PERFIL = os.environ.get('SQLITE_PERFIL', '1') == '1'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # bytes
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))  # negativo = KiB (64MB)
+    SQLITE_CHECKPOINT_SEGUNDOS = int(os.environ.get('SQLITE_CHECKPOINT_SEGUNDOS', 60))  # 0 desliga
+
+    # Réplica de leitura opcional: SELECTs de GET/HEAD vão para ela, escritas para o primário
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    # Depois de uma escrita, o navegador lê do primário por este tempo (atraso da replicação)
+    REPLICA_STICKY_SEGUNDOS = int(os.environ.get('REPLICA_STICKY_SEGUNDOS', 30))
+
+    # Configurações do Casal (lista padrão)
     NOIVO_NOME = "Junior & Karol"
+    PIX_CHAVE = os.environ.get('PIX_CHAVE', '83991314075')
+    # Tipo da PIX_CHAVE (cpf, cnpj, telefone, email, aleatoria): 11 dígitos tanto podem ser CPF quanto celular
+    PIX_TIPO_CHAVE = os.environ.get('PIX_TIPO_CHAVE', 'telefone')
+    PIX_CIDADE = os.environ.get('PIX_CIDADE', 'JOAO PESSOA')  # cidade do recebedor no payload PIX
+    PIX_QR_CACHE_MAX_BYTES = int(os.environ.get('PIX_QR_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+    
+    # Multi-lista: vários casais no mesmo processo, por domínio ou por /l/<slug>/
+    MULTI_LISTA = os.environ.get('MULTI_LISTA') == '1'
+    LISTAS_CACHE_MAX = int(os.environ.get('LISTAS_CACHE_MAX', 10000))
+    LISTAS_CACHE_TTL = int(os.environ.get('LISTAS_CACHE_TTL', 60))  # segundos
+    # Por quanto tempo um worker reaproveita a versão do catálogo lida do banco (segundos):
+    # é o atraso máximo até os outros workers verem uma sincronização
+    CATALOGO_VERSAO_TTL = float(os.environ.get('CATALOGO_VERSAO_TTL', 2))
     
-    # Configurações de Logging
-    LOGGING_CONFIG = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'default': {
-                'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            },
-            'json': {
-                '()': 'pythonjsonlogger.jsonlogger.JsonFormatter',
-                'format': '%(asctime)s %(name)s %(levelname)s %(message)s'
-            }
-        },
-        'handlers': {
-            'console': {
-                'class': 'logging.StreamHandler',
-                'formatter': 'default',
-                'stream': 'ext://sys.stdout'
-            }
-        },
-        'root': {
-            'level': 'INFO',
-            'handlers': ['console']
-        }
-    }
     DATA_CASAMENTO = "24 de Janeiro de 2026"
     
+    # Tracing: spans por requisição (fases do Flask e SQL), exportados em OTLP/JSON
+    TRACING = os.environ.get('TRACING') == '1'
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0.01))  # fração exportada
+    TRACE_LENTO_MS = float(os.environ.get('TRACE_LENTO_MS', 500))  # requisições lentas sempre exportadas
+    # Arquivo (uma requisição OTLP por linha) ou URL do coletor, ex.: http://otel-collector:4318/v1/traces
+    TRACE_EXPORT = os.environ.get('TRACE_EXPORT', 'traces.jsonl')
+    TRACE_QUEUE_MAX = int(os.environ.get('TRACE_QUEUE_MAX', 1000))
+    TRACE_SERVICO = os.environ.get('TRACE_SERVICO', 'lista-presentes')
+    
+    # Profiling sob demanda: cabeçalho X-Profile assinado (ver /admin/api/profiles/token) ou amostragem
+    # Ligado por padrão (só é instalado com ADMIN_TOKEN ou amostragem); PROFILING=0 desinstala
+    PROFILING = os.environ.get('PROFILING', '1') == '1'
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_ARQUIVOS = int(os.environ.get('PROFILE_MAX_ARQUIVOS', 50))
+    PROFILE_FORMATO = os.environ.get('PROFILE_FORMATO', 'html')  # html ou speedscope (pyinstrument)
+    PROFILE_INTERVALO = float(os.environ.get('PROFILE_INTERVALO', 0.001))  # segundos entre amostras
+
+    # Bytecode dos templates Jinja em disco, compartilhado entre workers e reinícios ('' desliga)
+    JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.jinja_cache'))
+
+    # Aquecimento do worker depois do fork (conexões, templates, catálogo, requisições sintéticas)
+    AQUECIMENTO = os.environ.get('AQUECIMENTO', '1') == '1'
+    AQUECIMENTO_CONEXOES = int(os.environ.get('AQUECIMENTO_CONEXOES', 2))  # por engine; ~ threads do worker
+
+    # Modo snapshot: /, /obrigado e /erro servidos de HTML estático gerado a cada versão do catálogo
+    SNAPSHOT = os.environ.get('SNAPSHOT') == '1'
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+    SNAPSHOT_MAX_AGE = int(os.environ.get('SNAPSHOT_MAX_AGE', 60))  # segundos de cache no navegador/CDN
+    
+    # Logging: fila limitada (descarta quando cheia), amostragem por evento e limites de tamanho
+    LOG_QUEUE_MAX = int(os.environ.get('LOG_QUEUE_MAX', 10000))
+    # Ex.: LOG_SAMPLE_RATES="request_started=0,request_finished=0.1" (só afeta info/debug)
+    LOG_SAMPLE_RATES = {
+        nome.strip(): float(taxa)
+        for nome, taxa in (
+            item.split('=') for item in os.environ.get(
+                'LOG_SAMPLE_RATES',
+                'request_started=0.05,request_finished=0.2' if PRODUCTION else ''
+            ).split(',') if '=' in item
+        )
+    }
+    LOG_MAX_TEXTO = int(os.environ.get('LOG_MAX_TEXTO', 500))  # caracteres por campo
+    LOG_MAX_ITENS = int(os.environ.get('LOG_MAX_ITENS', 20))  # itens por dict/lista
+    
     # Logging
     LOGGING_CONFIG = {
         'version': 1,
         'disable_existing_loggers': False,
         'formatters': {
+            # Renderizados na thread do listener da fila (ver logs.py)
             'default': {
-                'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+                '()': 'logs.criar_formatador',
+                'formato': 'console'
             },
             'json': {
-                'class': 'pythonjsonlogger.jsonlogger.JsonFormatter',
-                'format': '%(asctime)s %(name)s %(levelname)s %(message)s'
+                '()': 'logs.criar_formatador',
+                'formato': 'json'
             }
         },
         'handlers': {
@@ -1,8 +1,158 @@
+import os
+import threading
+import time
+from flask import g, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from metrics import metrics
+
+# Cookie que mantém o navegador no primário logo depois de uma escrita (read-your-writes)
+COOKIE_PRIMARIO = 'primario_ate'
+
+METODOS_LEITURA = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class SessaoRoteada(Session):
+    """
+    Envia para a réplica (bind 'replica') os SELECTs das requisições de leitura;
+    flush, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE e tudo fora de uma
+    requisição vão para o primário. Sem réplica configurada nada muda.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _ler_da_replica():
+            replica = self._db.engines.get('replica')
+            if replica is not None and not _escreve(clause):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _ler_da_replica():
+    return has_request_context() and g.get('ler_da_replica', False)
+
+
+def _escreve(clause):
+    if clause is None:
+        return False
+    return getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None
+
+
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
+
+
+# --- Perfil SQLite para vários workers ---
+
+def _aplicar_perfil_sqlite(engine, config):
+    """PRAGMAs a cada conexão nova e BEGIN emitido por nós (permite BEGIN IMMEDIATE)"""
+    pragmas = [
+        'PRAGMA journal_mode=WAL',  # leitores não bloqueiam o escritor
+        'PRAGMA synchronous=NORMAL',  # no WAL só perde as últimas transações numa queda de energia
+        f"PRAGMA busy_timeout={config['SQLITE_BUSY_TIMEOUT_MS']}",
+        f"PRAGMA mmap_size={config['SQLITE_MMAP_SIZE']}",
+        f"PRAGMA cache_size={config['SQLITE_CACHE_SIZE']}",
+        'PRAGMA temp_store=MEMORY',
+    ]
+
+    @event.listens_for(engine, 'connect')
+    def configurar_conexao(dbapi_connection, connection_record):
+        # Sem o BEGIN implícito do pysqlite: o evento 'begin' abaixo decide o tipo
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def iniciar_transacao(conn):
+        conn.exec_driver_sql('BEGIN IMMEDIATE' if conn.get_execution_options().get('sqlite_imediato') else 'BEGIN')
+
+
+def iniciar_escrita():
+    """
+    Começa a transação da sessão já com a trava de escrita (BEGIN IMMEDIATE no SQLite).
+    Uma transação que lê e depois escreve falharia com 'database is locked' ao
+    promover a trava se outro worker escrevesse no meio; assim ela espera o busy_timeout.
+    Nos outros bancos não faz nada.
+    """
+    sessao = db.session()
+    if sessao.get_bind().dialect.name != 'sqlite':
+        return
+    if sessao.in_transaction():
+        sessao.commit()
+    sessao.connection(execution_options={'sqlite_imediato': True})
+
+
+class Checkpointer:
+    """Thread que roda wal_checkpoint(PASSIVE) periodicamente, fora das requisições"""
+
+    def __init__(self, engine, intervalo):
+        self.engine = engine
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._rodar, name='sqlite-checkpoint', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def checkpoint(self):
+        conexao = self.engine.raw_connection()
+        try:
+            # PASSIVE não espera leitores nem escritores: copia o que der do WAL para o banco
+            ocupado, paginas_wal, copiadas = conexao.cursor().execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+        finally:
+            conexao.close()
+        metrics.incr('sqlite.checkpoints')
+        metrics.incr('sqlite.paginas_copiadas', max(copiadas, 0))
+        return ocupado, paginas_wal, copiadas
+
+    def _rodar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.checkpoint()
+            except Exception:
+                metrics.incr('sqlite.erros_checkpoint')
 
-db = SQLAlchemy()
 
 def init_db(app):
     db.init_app(app)
     with app.app_context():
-        db.create_all()
\ No newline at end of file
+        if app.config['SQLITE_PERFIL']:
+            for engine in db.engines.values():
+                if engine.dialect.name == 'sqlite':
+                    _aplicar_perfil_sqlite(engine, app.config)
+            arquivo = db.engine.dialect.name == 'sqlite' and db.engine.url.database not in (None, '', ':memory:')
+            if arquivo and app.config['SQLITE_CHECKPOINT_SEGUNDOS'] > 0:
+                checkpointer = Checkpointer(db.engine, app.config['SQLITE_CHECKPOINT_SEGUNDOS'])
+                checkpointer.iniciar()
+                # A thread não sobrevive ao fork dos workers do gunicorn
+                os.register_at_fork(after_in_child=checkpointer.iniciar)
+                app.extensions['sqlite_checkpoint'] = checkpointer
+        # Só o bind padrão: a réplica recebe o schema pela replicação
+        db.create_all(bind_key=None)
+
+    if 'replica' not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+
+    @app.before_request
+    def rotear_leituras():
+        try:
+            recente = float(request.cookies.get(COOKIE_PRIMARIO, 0)) > time.time()
+        except ValueError:
+            recente = False
+        g.ler_da_replica = request.method in METODOS_LEITURA and not recente
+
+    @app.after_request
+    def fixar_no_primario(response):
+        # Depois de uma escrita (ex.: contribuição), as próximas leituras deste navegador
+        # vão ao primário por alguns segundos, até a réplica alcançar
+        if request.method not in METODOS_LEITURA and response.status_code < 400:
+            segundos = app.config['REPLICA_STICKY_SEGUNDOS']
+            response.set_cookie(COOKIE_PRIMARIO, str(int(time.time() + segundos)), max_age=segundos,
+                                httponly=True, samesite='Lax', secure=request.is_secure)
+        return response
@@ -0,0 +1,59 @@
+"""
+Dinheiro em centavos inteiros, do banco à resposta JSON.
+
+Valores monetários são `int` em centavos: somas são adições inteiras no SQL e
+no Python, sem Decimal nem float acumulando arredondamento. A conversão só
+acontece nas bordas: `para_centavos` na entrada (formulários, catálogo, APIs
+externas, sempre a partir do texto) e `em_reais`/`reais_texto` na saída.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class Centavos(TypeDecorator):
+    """Coluna de dinheiro em centavos (BIGINT); recusa float e Decimal para não esconder conversões"""
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or (isinstance(value, int) and not isinstance(value, bool)):
+            return value
+        raise TypeError(f'Valor monetário deve ser int em centavos (use para_centavos): {value!r}')
+
+    def process_result_value(self, value, dialect):
+        # SUM() de BIGINT volta como Decimal no PostgreSQL
+        return None if value is None else int(value)
+
+
+def para_centavos(valor):
+    """
+    Converte reais (str com vírgula ou ponto, int, float ou Decimal) em
+    centavos, arredondando meio centavo para cima. ValueError se inválido.
+    """
+    if isinstance(valor, bool) or valor is None:
+        raise ValueError(f'Valor inválido: {valor!r}')
+    if isinstance(valor, int):
+        return valor * 100
+    # float passa pelo texto (repr mais curto): 0.1 vira exatamente 10 centavos
+    texto = str(valor).strip().replace(',', '.')
+    try:
+        reais = Decimal(texto)
+    except InvalidOperation:
+        raise ValueError(f'Valor inválido: {valor!r}')
+    if not reais.is_finite():
+        raise ValueError(f'Valor inválido: {valor!r}')
+    return int((reais * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def em_reais(centavos):
+    """Número em reais para JSON (a divisão por 100 é correta até o último dígito exibido)"""
+    return (centavos or 0) / 100
+
+
+def reais_texto(centavos):
+    """'1234.56' (exportações, PIX)"""
+    centavos = centavos or 0
+    sinal = '-' if centavos < 0 else ''
+    inteiro, resto = divmod(abs(centavos), 100)
+    return f'{sinal}{inteiro}.{resto:02d}'
@@ -0,0 +1,60 @@
+# exportar_contribuicoes.py - Exporta contribuições em CSV/JSONL (streaming, memória constante)
+import argparse
+import contextlib
+import sys
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta as contribuições')
+    parser.add_argument('--formato', choices=('csv', 'jsonl'), default='csv')
+    parser.add_argument('--saida', help='arquivo de saída (padrão: stdout)')
+    parser.add_argument('--gzip', action='store_true', help='comprime a saída em gzip')
+    parser.add_argument('--desde', help='data inicial (AAAA-MM-DD)')
+    parser.add_argument('--ate', help='data final, exclusiva (AAAA-MM-DD)')
+    parser.add_argument('--presente', type=int, help='id do presente')
+    parser.add_argument('--status', help='status (ex.: aprovado, pendente)')
+    parser.add_argument('--lista', help='slug da lista (padrão: lista principal)')
+    args = parser.parse_args()
+
+    # Logs e mensagens da aplicação vão para stderr; stdout fica só com os dados
+    saida_padrao = sys.stdout.buffer
+    with contextlib.redirect_stdout(sys.stderr):
+        exportar(args, saida_padrao)
+
+def exportar(args, saida_padrao):
+    from app import create_app
+    from models.lista import LISTA_PADRAO_ID
+    from services.exportacao_service import consulta_exportacao, gerar_linhas, gzip_stream, parse_data
+    from services.lista_service import lista_por_slug
+
+    app = create_app()
+    with app.app_context():
+        lista_id = LISTA_PADRAO_ID
+        if args.lista:
+            lista = lista_por_slug(args.lista)
+            if lista is None:
+                raise SystemExit(f"❌ Lista '{args.lista}' não encontrada")
+            lista_id = lista.id
+
+        query = consulta_exportacao(
+            lista_id,
+            desde=parse_data(args.desde),
+            ate=parse_data(args.ate),
+            presente_id=args.presente,
+            status=args.status
+        )
+        pedacos = gerar_linhas(query, args.formato)
+        if args.gzip:
+            pedacos = gzip_stream(pedacos)
+        else:
+            pedacos = (p.encode('utf-8') for p in pedacos)
+
+        saida = open(args.saida, 'wb') if args.saida else saida_padrao
+        try:
+            for pedaco in pedacos:
+                saida.write(pedaco)
+        finally:
+            if args.saida:
+                saida.close()
+
+if __name__ == '__main__':
+    main()
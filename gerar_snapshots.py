@@ -0,0 +1,21 @@
+# gerar_snapshots.py - Grava o HTML estático das páginas públicas de todas as listas (deploy, cron, proxy)
+import argparse
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera os snapshots estáticos de /, /obrigado e /erro')
+    parser.add_argument('--lista', type=int, help='só esta lista (id)')
+    args = parser.parse_args()
+
+    from app import create_app
+    from config import Config
+    from snapshot import gerar_snapshot, gerar_todas
+
+    app = create_app()
+    if args.lista:
+        gravados = gerar_snapshot(app, args.lista, forcar=True)
+    else:
+        gravados = gerar_todas(app)
+    print(f"✅ {gravados} páginas gravadas em {Config.SNAPSHOT_DIR}")
+
+if __name__ == '__main__':
+    main()
@@ -42,6 +42,13 @@ def worker_abort(worker):
     """Log quando um worker falha"""
     print(f"💥 Worker {worker.pid} abortado")
 
+def post_worker_init(worker):
+    """Aquece o worker (pool, templates, catálogo, requisições sintéticas) antes de aceitar conexões"""
+    # Sem preload_app, a aplicação só é carregada depois do post_fork: aqui ela já existe
+    from aquecimento import aquecer
+    estado = aquecer(worker.wsgi)
+    print(f"🔥 Worker {worker.pid} aquecido: {estado['etapas_ms']}")
+
 def post_fork(server, worker):
     """Configurações após fork do worker"""
     print(f"✨ Worker {worker.pid} iniciado")
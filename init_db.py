@@ -1,85 +1,42 @@
 # init_db.py - Atualização segura de presentes
-from app import create_app
+import argparse
+from flask import has_app_context
 from database import db
-from models.presente import Presente
+from models.lista import LISTA_PADRAO_ID
+from services.catalogo_service import carregar_catalogo, sincronizar_catalogo
 
-def init_sample_data():
+def init_sample_data(caminho=None, lista_id=LISTA_PADRAO_ID):
+    # Reaproveita o contexto da aplicação se já estiver dentro de um
+    if has_app_context():
+        return _sincronizar(caminho, lista_id)
+
+    from app import create_app
     app = create_app()
-    
     with app.app_context():
-        # Cria as tabelas se não existirem
-        db.create_all()
-        
-        # Dados de exemplo atualizados
-        sample_presentes = [
-            {
-                "nome": "Só para dizer que não dei nada",
-                "descricao": "",
-                "valor_total": 59.90,
-                "ativo": True,
-                "imagem_url": "/static/images/julios.png"
-            },
-            {
-                "nome": "Para o noivo estar coberto de razão",
-                "descricao": "",
-                "valor_total": 69.90,
-                "ativo": True,
-                "imagem_url": "/static/images/cobertor.png"
-            },
-            {
-                "nome": "Dei o MELHOR presente",
-                "descricao": "",
-                "valor_total": 299.90,
-                "ativo": True,
-                "imagem_url": "/static/images/melhor.png"
-            },
-            {
-                "nome": "Ajude a pagar o Casamento",
-                "descricao": "",
-                "valor_total": 199.90,
-                "ativo": True,
-                "imagem_url": "/static/images/ajude.png"
-            },
-            {
-                "nome": "Pagar a paciência da noiva",
-                "descricao": "",
-                "valor_total": 69.90,
-                "ativo": True,
-                "imagem_url": "/static/images/paciencia.png"
-            },
-            {
-                "nome": "Deus tocou seu coração",
-                "descricao": "",
-                "valor_total": 99.90,
-                "ativo": True,
-                "imagem_url": "/static/images/sourica.png"
-            },
-            {
-                "nome": "Taxa para não jogar o buquê para o seu par",
-                "descricao": "",
-                "valor_total": 79.90,
-                "ativo": True,
-                "imagem_url": "/static/images/buque.png"
-            }
-        ]
-        
-        atualizados = 0
-        adicionados = 0
+        return _sincronizar(caminho, lista_id)
+
+def _sincronizar(caminho, lista_id):
+    # Cria as tabelas se não existirem
+    db.create_all()
+
+    # Catálogo lido de data/presentes.json (ou do arquivo informado)
+    resultado = sincronizar_catalogo(carregar_catalogo(caminho), lista_id=lista_id)
+    print(f"✅ Atualizados: {resultado['atualizados']}, Adicionados: {resultado['adicionados']}")
+    return resultado
 
-        for p_data in sample_presentes:
-            presente = Presente.query.filter_by(nome=p_data['nome']).first()
-            if presente:
-                # Atualiza os campos existentes
-                presente.descricao = p_data['descricao']
-                presente.valor_total = p_data['valor_total']
-                presente.ativo = p_data['ativo']
-                presente.imagem_url = p_data['imagem_url']
-                atualizados += 1
-            else:
-                # Cria novo presente
-                novo_presente = Presente(**p_data)
-                db.session.add(novo_presente)
-                adicionados += 1
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sincroniza o catálogo de presentes')
+    parser.add_argument('arquivo', nargs='?', help='JSON do catálogo (padrão: data/presentes.json)')
+    parser.add_argument('--lista', help='slug da lista (padrão: lista principal)')
+    args = parser.parse_args()
 
-        db.session.commit()
-        print(f"✅ Atualizados: {atualizados}, Adicionados: {adicionados}")
+    if args.lista:
+        from app import app
+        from services.lista_service import lista_por_slug
+        with app.app_context():
+            lista = lista_por_slug(args.lista)
+            if lista is None:
+                raise SystemExit(f"❌ Lista '{args.lista}' não encontrada")
+            init_sample_data(args.arquivo, lista.id)
+    else:
+        init_sample_data(args.arquivo)
@@ -0,0 +1,40 @@
+"""
+Cache de bytecode dos templates Jinja em disco (FileSystemBytecodeCache):
+cada worker, depois de cada reinício, carrega o código já compilado em vez de
+fazer parse e compilação de base.html/index.html de novo. A pasta é
+preenchida no build (python jinja_cache.py, no Dockerfile) e completada pelos
+workers. O Jinja confere o checksum do fonte e grava com temporário + rename,
+então template editado é recompilado e vários workers podem compartilhar a pasta.
+"""
+import os
+from jinja2 import FileSystemBytecodeCache
+from config import Config
+
+
+def init_jinja_cache(app):
+    """Liga o cache de bytecode em JINJA_CACHE_DIR (vazio desliga)"""
+    pasta = Config.JINJA_CACHE_DIR
+    if not pasta:
+        return app
+    try:
+        os.makedirs(pasta, exist_ok=True)
+    except OSError:
+        return app  # disco só leitura: compila em memória, como antes
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(pasta)
+    return app
+
+
+def precompilar(app):
+    """Compila todos os templates para o cache em disco; retorna os nomes"""
+    nomes = app.jinja_env.list_templates(extensions=('html',))
+    for nome in nomes:
+        app.jinja_env.get_template(nome)
+    return nomes
+
+
+if __name__ == '__main__':
+    # O bytecode depende do ambiente Jinja da aplicação (autoescape, extensões): compila
+    # com a aplicação de verdade (no build, com DATABASE_URL=sqlite:// para não criar um .db)
+    from app import app
+    nomes = precompilar(app)
+    print(f"✅ {len(nomes)} templates compilados em {Config.JINJA_CACHE_DIR}")
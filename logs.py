@@ -0,0 +1,236 @@
+"""
+Pipeline de logs sem bloqueio: os eventos do structlog e do logging padrão
+vão para uma fila limitada (QueueHandler) e são redigidos, formatados e
+escritos por uma thread própria (QueueListener). Na thread da requisição
+sobram só a amostragem e o enfileiramento.
+"""
+import atexit
+import functools
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import structlog
+from config import Config
+from metrics import metrics
+from tracing import ids_trace
+
+# Campos com dados pessoais: mascarados antes de escrever o log
+CAMPOS_PII = frozenset({
+    'email', 'cpf', 'telefone', 'nome',
+    'email_contribuinte', 'cpf_contribuinte', 'telefone_contribuinte', 'nome_contribuinte',
+    'payer', 'remote_addr'
+})
+
+# Profundidade máxima de dicts/listas aninhados num evento
+MAX_PROFUNDIDADE = 3
+
+
+def _mascarar(campo, valor):
+    """Mantém só o suficiente para correlacionar (domínio do e-mail, fim do CPF)"""
+    texto = str(valor)
+    if 'email' in campo and '@' in texto:
+        return '***@' + texto.rsplit('@', 1)[1]
+    if 'cpf' in campo or 'telefone' in campo:
+        digitos = ''.join(c for c in texto if c.isdigit())
+        return '***' + digitos[-2:] if len(digitos) > 2 else '***'
+    if campo == 'remote_addr':
+        # IPv4 sem o último octeto
+        partes = texto.split('.')
+        return '.'.join(partes[:3] + ['x']) if len(partes) == 4 else '***'
+    return '***'
+
+
+def _limitar(valor, profundidade=0):
+    """Trunca textos longos e coleções grandes, redigindo PII aninhada"""
+    if isinstance(valor, str):
+        if len(valor) > Config.LOG_MAX_TEXTO:
+            return valor[:Config.LOG_MAX_TEXTO] + f'…(+{len(valor) - Config.LOG_MAX_TEXTO})'
+        return valor
+    if isinstance(valor, dict):
+        if profundidade >= MAX_PROFUNDIDADE:
+            return f'<dict {len(valor)} chaves>'
+        itens = list(valor.items())[:Config.LOG_MAX_ITENS]
+        return {
+            k: _mascarar(k, v) if k in CAMPOS_PII and v else _limitar(v, profundidade + 1)
+            for k, v in itens
+        }
+    if isinstance(valor, (list, tuple, set)):
+        if profundidade >= MAX_PROFUNDIDADE:
+            return f'<{type(valor).__name__} {len(valor)} itens>'
+        return [_limitar(v, profundidade + 1) for v in list(valor)[:Config.LOG_MAX_ITENS]]
+    return valor
+
+
+def redigir(logger, metodo, evento):
+    """Processor: mascara PII e limita o tamanho dos campos (roda na thread do listener)"""
+    for campo, valor in list(evento.items()):
+        if campo in ('level', 'timestamp', 'logger', 'exc_info', 'stack_info'):
+            continue
+        if campo in CAMPOS_PII and valor:
+            evento[campo] = _mascarar(campo, valor)
+        else:
+            evento[campo] = _limitar(valor)
+    return evento
+
+
+def amostrar(logger, metodo, evento):
+    """Processor: descarta eventos info/debug conforme Config.LOG_SAMPLE_RATES (avisos e erros sempre passam)"""
+    taxa = Config.LOG_SAMPLE_RATES.get(evento.get('event'))
+    if taxa is not None and metodo in ('debug', 'info') and random.random() >= taxa:
+        metrics.incr('logs.amostrados_fora')
+        raise structlog.DropEvent
+    return evento
+
+
+def _capturar_excecao(logger, metodo, evento):
+    """Resolve exc_info=True na thread de origem (no listener sys.exc_info() já não vale)"""
+    if evento.get('exc_info') is True or (metodo == 'exception' and 'exc_info' not in evento):
+        evento['exc_info'] = sys.exc_info()
+    return evento
+
+
+def _timestamp_do_registro(logger, metodo, evento):
+    """Usa o instante em que o evento foi emitido (o listener formata depois)"""
+    registro = evento.get('_record')
+    momento = registro.created if registro is not None else time.time()
+    evento['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(momento)) + f'.{int(momento % 1 * 1000):03d}Z'
+    return evento
+
+
+def criar_formatador(formato='console'):
+    """Formatter dos handlers: renderiza eventos do structlog e registros do logging padrão"""
+    if formato == 'json':
+        renderizacao = [structlog.processors.format_exc_info, structlog.processors.JSONRenderer()]
+    else:
+        renderizacao = [structlog.dev.ConsoleRenderer(colors=False, exception_formatter=structlog.dev.plain_traceback)]
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[structlog.stdlib.add_log_level, structlog.stdlib.add_logger_name],
+        processors=[
+            _timestamp_do_registro,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            redigir,
+            *renderizacao,
+        ]
+    )
+
+
+class FilaHandler(logging.handlers.QueueHandler):
+    """QueueHandler que não formata na thread de origem e descarta quando a fila enche"""
+
+    def prepare(self, record):
+        # O padrão formata a mensagem aqui; o ProcessorFormatter do listener precisa do evento original
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr('logs.descartados')
+
+
+_NIVEIS = {
+    'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING, 'warn': logging.WARNING,
+    'error': logging.ERROR, 'exception': logging.ERROR, 'critical': logging.CRITICAL, 'fatal': logging.CRITICAL,
+    'msg': logging.INFO,
+}
+
+
+class FilaLogger:
+    """
+    Logger final do structlog: enfileira o evento já processado. O LogRecord é
+    montado no listener; na origem não há busca do chamador na pilha nem lock de handler.
+    """
+
+    def __init__(self, nome='app'):
+        self.name = nome
+
+    def _enfileirar(self, nivel, /, **evento):
+        try:
+            _Pipeline.handler.queue.put_nowait((self.name, nivel, time.time(), evento))
+        except queue.Full:
+            metrics.incr('logs.descartados')
+
+
+for _metodo in _NIVEIS:
+    setattr(FilaLogger, _metodo, functools.partialmethod(FilaLogger._enfileirar, _metodo))
+
+
+class FilaListener(logging.handlers.QueueListener):
+    def prepare(self, item):
+        if isinstance(item, logging.LogRecord):
+            return item
+        # Evento do structlog: vira LogRecord aqui, para os handlers do logging padrão
+        nome, metodo, criado, evento = item
+        record = logging.LogRecord(nome, _NIVEIS[metodo], '', 0, evento, (), None)
+        record.created = criado
+        record.msecs = criado % 1 * 1000
+        record._logger = None
+        record._name = metodo
+        return record
+
+    def enqueue_sentinel(self):
+        # Com a fila cheia o put_nowait padrão falharia; na parada pode esperar
+        self.queue.put(self._sentinel)
+
+
+class _Pipeline:
+    handler = None
+    listener = None
+
+
+def _iniciar_listener(handlers):
+    fila = queue.Queue(maxsize=Config.LOG_QUEUE_MAX)
+    _Pipeline.handler.queue = fila
+    _Pipeline.listener = FilaListener(fila, *handlers, respect_handler_level=True)
+    _Pipeline.listener.start()
+
+
+def _reiniciar_apos_fork():
+    # A thread do listener não sobrevive ao fork (ex.: gunicorn com preload_app)
+    if _Pipeline.listener is not None:
+        _iniciar_listener(_Pipeline.listener.handlers)
+
+
+def parar_logging():
+    """Esvazia a fila e para o listener (chamado na saída do processo)"""
+    if _Pipeline.listener is not None and _Pipeline.listener._thread is not None:
+        _Pipeline.listener.stop()
+
+
+def configurar_logging():
+    """Aplica Config.LOGGING_CONFIG atrás de uma fila e liga o structlog ao logging padrão"""
+    if _Pipeline.handler is not None:
+        return
+
+    logging.config.dictConfig(Config.LOGGING_CONFIG)
+    raiz = logging.getLogger()
+    handlers = list(raiz.handlers)
+    for handler in handlers:
+        raiz.removeHandler(handler)
+
+    _Pipeline.handler = FilaHandler(None)
+    _iniciar_listener(handlers)
+    raiz.addHandler(_Pipeline.handler)
+    metrics.registrar_fonte('logs', lambda: {'fila': _Pipeline.handler.queue.qsize()})
+
+    # Na thread de origem: filtro de nível, amostragem, ids do trace e enfileiramento do dict do evento
+    structlog.configure(
+        processors=[
+            amostrar,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            ids_trace,
+            _capturar_excecao,
+        ],
+        logger_factory=FilaLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(raiz.getEffectiveLevel()),
+        cache_logger_on_first_use=True,
+    )
+
+    atexit.register(parar_logging)
+    os.register_at_fork(after_in_child=_reiniciar_apos_fork)
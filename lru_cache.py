@@ -0,0 +1,93 @@
+"""
+Cache LRU em memória, thread-safe, limitado por número de itens e/ou bytes,
+com expiração opcional por TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, max_itens=None, max_bytes=None, ttl=None, tamanho=len):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.tamanho = tamanho
+        self._dados = OrderedDict()  # chave -> (valor, bytes, expira_em)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.despejos = 0
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                self.misses += 1
+                return padrao
+            valor, _, expira_em = item
+            if expira_em is not None and expira_em <= time.monotonic():
+                self._remover(chave)
+                self.misses += 1
+                return padrao
+            self._dados.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def set(self, chave, valor, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        tamanho = self.tamanho(valor) if self.max_bytes else 0
+        if self.max_bytes and tamanho > self.max_bytes:
+            return False  # maior que o cache inteiro: não guarda
+        expira_em = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if chave in self._dados:
+                self._remover(chave)
+            self._dados[chave] = (valor, tamanho, expira_em)
+            self._bytes += tamanho
+            self._despejar()
+        return True
+
+    def add(self, chave, valor, ttl=None):
+        """Guarda apenas se a chave não existir (ou tiver expirado); retorna se guardou"""
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is not None and (item[2] is None or item[2] > time.monotonic()):
+                return False
+        return self.set(chave, valor, ttl)
+
+    def delete(self, chave):
+        with self._lock:
+            if chave in self._dados:
+                self._remover(chave)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._dados)
+
+    def _remover(self, chave):
+        _, tamanho, _ = self._dados.pop(chave)
+        self._bytes -= tamanho
+
+    def _despejar(self):
+        while self._dados and (
+            (self.max_itens and len(self._dados) > self.max_itens) or
+            (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            chave = next(iter(self._dados))
+            self._remover(chave)
+            self.despejos += 1
+
+    def stats(self):
+        return {
+            'itens': len(self._dados),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'despejos': self.despejos
+        }
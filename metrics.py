@@ -0,0 +1,47 @@
+"""
+Métricas simples em memória (por worker): contadores e durações agregadas.
+"""
+import threading
+from collections import defaultdict
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores = defaultdict(float)
+        self._duracoes = {}  # nome -> [quantidade, soma, máximo]
+        self._fontes = {}  # nome -> callable que devolve um dict de estado
+
+    def incr(self, nome, valor=1):
+        with self._lock:
+            self._contadores[nome] += valor
+
+    def observe(self, nome, valor):
+        with self._lock:
+            atual = self._duracoes.get(nome)
+            if atual is None:
+                self._duracoes[nome] = [1, valor, valor]
+            else:
+                atual[0] += 1
+                atual[1] += valor
+                atual[2] = max(atual[2], valor)
+
+    def registrar_fonte(self, nome, funcao):
+        """Registra uma função chamada a cada snapshot (ex.: stats de um cache)"""
+        self._fontes[nome] = funcao
+
+    def snapshot(self):
+        with self._lock:
+            dados = {
+                'contadores': dict(self._contadores),
+                'duracoes': {
+                    nome: {'quantidade': q, 'media': soma / q, 'max': maximo}
+                    for nome, (q, soma, maximo) in self._duracoes.items()
+                }
+            }
+        for nome, funcao in self._fontes.items():
+            dados[nome] = funcao()
+        return dados
+
+
+metrics = Metrics()
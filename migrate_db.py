@@ -30,10 +30,10 @@ def migrate_database():
                 print("📦 Criando dados de exemplo...")
                 # Adiciona dados se estiver vazio
                 sample_presentes = [
-                    Presente(nome="Lua de Mel", descricao="Nossa viagem dos sonhos", valor_total=10000, valor_arrecadado=3500),
-                    Presente(nome="Móveis", descricao="Sofá para nossa casa", valor_total=2500, valor_arrecadado=1200),
-                    Presente(nome="Eletrodomésticos", descricao="Geladeira nova", valor_total=3000, valor_arrecadado=0),
-                    Presente(nome="Jantar", descricao="Jantar romântico", valor_total=500, valor_arrecadado=500),
+                    Presente(nome="Lua de Mel", descricao="Nossa viagem dos sonhos", valor_total_centavos=1000000, valor_arrecadado_centavos=350000),
+                    Presente(nome="Móveis", descricao="Sofá para nossa casa", valor_total_centavos=250000, valor_arrecadado_centavos=120000),
+                    Presente(nome="Eletrodomésticos", descricao="Geladeira nova", valor_total_centavos=300000, valor_arrecadado_centavos=0),
+                    Presente(nome="Jantar", descricao="Jantar romântico", valor_total_centavos=50000, valor_arrecadado_centavos=50000),
                 ]
                 for item in sample_presentes:
                     db.session.add(item)
@@ -0,0 +1,32 @@
+"""
+Migration: unique index on presentes.nome (required by the catalog upsert)
+Usage: python migrations/002_unique_nome_presente.py
+Works on SQLite and PostgreSQL through the app's configured database.
+"""
+from sqlalchemy import text
+from banco import colunas, conectar
+
+
+def main():
+    with conectar().begin() as conn:
+        if 'lista_id' in colunas(conn, 'presentes'):
+            print("ℹ️ Banco já no modo multi-lista (004): o índice único é uq_presentes_lista_nome.")
+            return
+
+        duplicados = conn.execute(text(
+            "SELECT nome, COUNT(*) FROM presentes GROUP BY nome HAVING COUNT(*) > 1"
+        )).fetchall()
+        if duplicados:
+            print("❌ Existem presentes com nome duplicado. Corrija antes de migrar:")
+            for nome, total in duplicados:
+                print(f"   {nome} ({total}x)")
+            return
+
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_presentes_nome ON presentes (nome)"
+        ))
+    print("✅ Índice único uq_presentes_nome garantido.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+"""
+Migration: indexes on presentes for cursor pagination and the ?ativo= /
+?completo= filters on /api/presentes
+Usage: python migrations/003_indices_presentes.py
+Works on SQLite and PostgreSQL through the app's configured database.
+"""
+from sqlalchemy import text
+from banco import colunas, conectar
+
+INDICES = (
+    ('ix_presentes_ativo_id', "CREATE INDEX IF NOT EXISTS ix_presentes_ativo_id ON presentes (ativo, id)"),
+    ('ix_presentes_ativo_completo_id', "CREATE INDEX IF NOT EXISTS ix_presentes_ativo_completo_id "
+                                       "ON presentes (ativo, (valor_arrecadado >= valor_total), id)"),
+)
+
+
+def main():
+    with conectar().begin() as conn:
+        if 'lista_id' in colunas(conn, 'presentes'):
+            print("ℹ️ Banco já no modo multi-lista (004): os índices são os por lista.")
+            return
+        for nome, sql in INDICES:
+            conn.execute(text(sql))
+            print(f"✅ Índice {nome} garantido.")
+
+
+if __name__ == '__main__':
+    main()
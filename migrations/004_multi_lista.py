@@ -0,0 +1,105 @@
+"""
+Migration: multi-lista mode (listas table, presentes.lista_id and tenant-scoped indexes)
+Usage: python migrations/004_multi_lista.py
+Existing gifts are assigned to the default list (id 1, built from Config).
+Works on SQLite and PostgreSQL through the app's configured database.
+"""
+from sqlalchemy import text
+from banco import colunas, conectar, indices, tabelas
+from config import Config
+
+LISTA_PADRAO_ID = 1
+
+LISTAS = {
+    'sqlite': """
+        CREATE TABLE IF NOT EXISTS listas (
+            id INTEGER NOT NULL PRIMARY KEY,
+            slug VARCHAR(60) NOT NULL UNIQUE,
+            dominio VARCHAR(200) UNIQUE,
+            noivo_nome VARCHAR(100) NOT NULL,
+            data_casamento VARCHAR(60) NOT NULL,
+            chave_pix VARCHAR(100),
+            ativo BOOLEAN,
+            created_at DATETIME
+        )""",
+    'postgresql': """
+        CREATE TABLE IF NOT EXISTS listas (
+            id SERIAL PRIMARY KEY,
+            slug VARCHAR(60) NOT NULL UNIQUE,
+            dominio VARCHAR(200) UNIQUE,
+            noivo_nome VARCHAR(100) NOT NULL,
+            data_casamento VARCHAR(60) NOT NULL,
+            chave_pix VARCHAR(100),
+            ativo BOOLEAN,
+            created_at TIMESTAMP WITHOUT TIME ZONE
+        )""",
+}
+
+# Índices globais de 002/003, substituídos pelos equivalentes por lista
+INDICES = (
+    ('uq_presentes_lista_nome', "CREATE UNIQUE INDEX uq_presentes_lista_nome ON presentes (lista_id, nome)"),
+    ('ix_presentes_lista_ativo_id', "CREATE INDEX ix_presentes_lista_ativo_id ON presentes (lista_id, ativo, id)"),
+    ('ix_presentes_lista_ativo_completo_id', "CREATE INDEX ix_presentes_lista_ativo_completo_id "
+                                             "ON presentes (lista_id, ativo, (valor_arrecadado >= valor_total), id)"),
+)
+
+
+def main():
+    with conectar().begin() as conn:
+        postgres = conn.dialect.name == 'postgresql'
+        if 'listas' not in tabelas(conn):
+            conn.execute(text(LISTAS[conn.dialect.name]))
+            print("✅ Tabela listas criada.")
+        if conn.execute(text("SELECT 1 FROM listas WHERE id = :id"), {'id': LISTA_PADRAO_ID}).first() is None:
+            conn.execute(text(
+                "INSERT INTO listas (id, slug, noivo_nome, data_casamento, chave_pix, ativo, created_at) "
+                "VALUES (:id, 'padrao', :noivo_nome, :data_casamento, :chave_pix, :ativo, CURRENT_TIMESTAMP)"
+            ), {'id': LISTA_PADRAO_ID, 'noivo_nome': Config.NOIVO_NOME, 'data_casamento': Config.DATA_CASAMENTO,
+                'chave_pix': Config.PIX_CHAVE, 'ativo': True})
+            if postgres:
+                conn.execute(text("SELECT setval('listas_id_seq', (SELECT MAX(id) FROM listas))"))
+            print("✅ Lista padrão criada.")
+
+        if 'lista_id' not in colunas(conn, 'presentes'):
+            conn.execute(text(
+                f"ALTER TABLE presentes ADD COLUMN lista_id INTEGER NOT NULL DEFAULT {LISTA_PADRAO_ID}"
+            ))
+            if postgres:
+                conn.execute(text(
+                    "ALTER TABLE presentes ADD CONSTRAINT fk_presentes_lista "
+                    "FOREIGN KEY (lista_id) REFERENCES listas (id)"
+                ))
+            print("✅ Coluna presentes.lista_id adicionada.")
+
+        # No PostgreSQL, uq_presentes_nome pode ser constraint (create_all) ou índice (002):
+        # a constraint sai primeiro, senão o DROP INDEX falha por ela depender do índice
+        if postgres:
+            conn.execute(text("ALTER TABLE presentes DROP CONSTRAINT IF EXISTS uq_presentes_nome"))
+        for antigo in ('uq_presentes_nome', 'ix_presentes_ativo_id', 'ix_presentes_ativo_completo_id'):
+            conn.execute(text(f"DROP INDEX IF EXISTS {antigo}"))
+
+        # Pelo nome: numa nova execução depois de 007 as colunas de valor já foram renomeadas,
+        # e o índice de ?completo= já foi trocado pelo de 008
+        existentes = indices(conn, 'presentes')
+        ja_em_centavos = 'valor_arrecadado' not in colunas(conn, 'presentes')
+        for nome, sql in INDICES:
+            if nome == 'ix_presentes_lista_ativo_completo_id' and ja_em_centavos:
+                continue
+            if nome not in existentes:
+                conn.execute(text(sql))
+            print(f"✅ Índice {nome} garantido.")
+
+        if not postgres:
+            # UNIQUE (nome) declarado na tabela (create_all antes de 004) só sai recriando a tabela
+            unicos = conn.execute(text(
+                "SELECT il.name FROM pragma_index_list('presentes') il "
+                "WHERE il.origin = 'u' AND (SELECT COUNT(*) FROM pragma_index_info(il.name)) = 1 "
+                "AND (SELECT name FROM pragma_index_info(il.name)) = 'nome'"
+            )).fetchall()
+            if unicos:
+                print("⚠️ presentes.nome tem UNIQUE na própria tabela: o mesmo nome em duas listas vai falhar "
+                      "até a tabela ser recriada (db.create_all num banco novo + cópia dos dados).")
+
+
+if __name__ == '__main__':
+    main()
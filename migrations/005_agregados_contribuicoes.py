@@ -0,0 +1,97 @@
+"""
+Migration: dashboard aggregate table (agregados_contribuicoes) and backfill
+from the existing contributions
+Usage: python migrations/005_agregados_contribuicoes.py [--lista <slug>]
+Safe to re-run: the buckets are rebuilt from scratch. New contributions keep
+the aggregates up to date on their own after this. Requires 004 (lista_id).
+"""
+import argparse
+from sqlalchemy import text
+from banco import colunas, conectar
+
+TABELA = {
+    'sqlite': """
+        CREATE TABLE IF NOT EXISTS agregados_contribuicoes (
+            id INTEGER NOT NULL PRIMARY KEY,
+            lista_id INTEGER NOT NULL REFERENCES listas (id),
+            granularidade VARCHAR(4) NOT NULL,
+            inicio DATETIME NOT NULL,
+            presente_id INTEGER NOT NULL REFERENCES presentes (id) ON DELETE CASCADE,
+            metodo_pagamento VARCHAR(20) NOT NULL,
+            quantidade INTEGER NOT NULL,
+            valor NUMERIC(12, 2) NOT NULL,
+            CONSTRAINT uq_agregados_bucket UNIQUE (lista_id, granularidade, inicio, presente_id, metodo_pagamento)
+        )""",
+    'postgresql': """
+        CREATE TABLE IF NOT EXISTS agregados_contribuicoes (
+            id SERIAL PRIMARY KEY,
+            lista_id INTEGER NOT NULL REFERENCES listas (id),
+            granularidade VARCHAR(4) NOT NULL,
+            inicio TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            presente_id INTEGER NOT NULL REFERENCES presentes (id) ON DELETE CASCADE,
+            metodo_pagamento VARCHAR(20) NOT NULL,
+            quantidade INTEGER NOT NULL,
+            valor NUMERIC(12, 2) NOT NULL,
+            CONSTRAINT uq_agregados_bucket UNIQUE (lista_id, granularidade, inicio, presente_id, metodo_pagamento)
+        )""",
+}
+
+# Início do bucket no mesmo formato que a aplicação grava (o upsert incremental precisa casar);
+# os dois-pontos vão escapados, senão text() os leria como parâmetros
+INICIO = {
+    'sqlite': {
+        'hora': "strftime('%Y-%m-%d %H\\:00\\:00.000000', COALESCE(c.created_at, CURRENT_TIMESTAMP))",
+        'dia': "strftime('%Y-%m-%d 00\\:00\\:00.000000', COALESCE(c.created_at, CURRENT_TIMESTAMP))",
+    },
+    'postgresql': {
+        'hora': "date_trunc('hour', COALESCE(c.created_at, now() AT TIME ZONE 'utc'))",
+        'dia': "date_trunc('day', COALESCE(c.created_at, now() AT TIME ZONE 'utc'))",
+    },
+}
+
+
+def _coluna_valor(conn):
+    """Colunas de valor (destino, origem): em reais neste ponto, em centavos se 007 já rodou"""
+    if 'valor_centavos' not in colunas(conn, 'agregados_contribuicoes'):
+        return 'valor', 'SUM(c.valor)'
+    if 'valor_centavos' in colunas(conn, 'contribuicoes'):
+        return 'valor_centavos', 'SUM(c.valor_centavos)'
+    # Tabela criada pela aplicação nova antes desta migração
+    return 'valor_centavos', 'SUM(CAST(ROUND(c.valor * 100) AS INTEGER))'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lista', help='slug da lista (padrão: todas)')
+    args = parser.parse_args()
+
+    with conectar().begin() as conn:
+        dialeto = conn.dialect.name
+        conn.execute(text(TABELA[dialeto]))
+
+        apagar, filtro, parametros = "DELETE FROM agregados_contribuicoes", '', {}
+        if args.lista:
+            lista_id = conn.execute(text("SELECT id FROM listas WHERE slug = :slug"), {'slug': args.lista}).scalar()
+            if lista_id is None:
+                raise SystemExit(f"❌ Lista '{args.lista}' não encontrada")
+            apagar += " WHERE lista_id = :lista_id"
+            filtro, parametros = " AND p.lista_id = :lista_id", {'lista_id': lista_id}
+
+        destino, soma = _coluna_valor(conn)
+        conn.execute(text(apagar), parametros)
+        buckets = 0
+        for granularidade, inicio in INICIO[dialeto].items():
+            buckets += conn.execute(text(f"""
+                INSERT INTO agregados_contribuicoes
+                    (lista_id, granularidade, inicio, presente_id, metodo_pagamento, quantidade, {destino})
+                SELECT p.lista_id, :granularidade, {inicio}, c.presente_id,
+                       COALESCE(c.metodo_pagamento, 'desconhecido'), COUNT(*), {soma}
+                FROM contribuicoes c JOIN presentes p ON p.id = c.presente_id
+                WHERE c.status IN ('aprovado', 'approved'){filtro}
+                GROUP BY p.lista_id, {inicio}, c.presente_id, COALESCE(c.metodo_pagamento, 'desconhecido')
+            """), dict(parametros, granularidade=granularidade)).rowcount
+    print(f"✅ Agregados recalculados: {buckets} buckets.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+"""
+Migration: create the (status, id) index on contribuicoes used by the
+pending-payment reconciliation (reconciliar_pagamentos.py)
+Usage: python migrations/006_indice_reconciliacao.py
+Works on SQLite and PostgreSQL through the app's configured database.
+"""
+from sqlalchemy import text
+from banco import conectar
+
+
+def main():
+    with conectar().begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_contribuicoes_status_id ON contribuicoes (status, id)"))
+    print("✅ Índice ix_contribuicoes_status_id garantido.")
+
+
+if __name__ == '__main__':
+    main()
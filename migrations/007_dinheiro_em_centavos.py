@@ -0,0 +1,42 @@
+"""
+Migration: money columns as integer cents
+(presentes.valor_total/valor_arrecadado, contribuicoes.valor,
+agregados_contribuicoes.valor -> *_centavos)
+Usage: python migrations/007_dinheiro_em_centavos.py
+Each column is renamed and its values multiplied by 100 in the same
+transaction, so it is safe to re-run: columns already named *_centavos are
+skipped. Indexes and triggers follow the rename (SQLite >= 3.25 and
+PostgreSQL). On PostgreSQL the type also becomes BIGINT; SQLite keeps the
+declared NUMERIC, which stores the integers as-is.
+"""
+from sqlalchemy import text
+from banco import colunas, conectar
+
+COLUNAS = (
+    ('presentes', 'valor_total', 'valor_total_centavos'),
+    ('presentes', 'valor_arrecadado', 'valor_arrecadado_centavos'),
+    ('contribuicoes', 'valor', 'valor_centavos'),
+    ('agregados_contribuicoes', 'valor', 'valor_centavos'),
+)
+
+
+def main():
+    with conectar().begin() as conn:
+        postgres = conn.dialect.name == 'postgresql'
+        for tabela, antiga, nova in COLUNAS:
+            existentes = colunas(conn, tabela)
+            if nova in existentes or antiga not in existentes:
+                print(f"ℹ️ {tabela}.{nova} já existe. Nada a fazer.")
+                continue
+            conn.execute(text(f"ALTER TABLE {tabela} RENAME COLUMN {antiga} TO {nova}"))
+            if postgres:
+                conn.execute(text(
+                    f"ALTER TABLE {tabela} ALTER COLUMN {nova} TYPE BIGINT USING ROUND({nova} * 100)::BIGINT"
+                ))
+            else:
+                conn.execute(text(f"UPDATE {tabela} SET {nova} = CAST(ROUND({nova} * 100) AS INTEGER)"))
+            print(f"✅ {tabela}.{antiga} -> {nova} (centavos)")
+
+
+if __name__ == '__main__':
+    main()
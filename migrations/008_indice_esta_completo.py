@@ -0,0 +1,30 @@
+"""
+Migration: replace the ?completo= index on presentes with one whose
+expression treats a NULL valor_arrecadado_centavos as 0, like the
+esta_completo field (ix_presentes_lista_ativo_completo_id ->
+ix_presentes_lista_ativo_esta_completo_id)
+Usage: python migrations/008_indice_esta_completo.py
+Safe to re-run. Requires 007 (money columns in cents).
+"""
+from sqlalchemy import text
+from banco import colunas, conectar, indices
+
+ANTIGO = 'ix_presentes_lista_ativo_completo_id'
+NOVO = 'ix_presentes_lista_ativo_esta_completo_id'
+
+
+def main():
+    with conectar().begin() as conn:
+        if 'valor_arrecadado_centavos' not in colunas(conn, 'presentes'):
+            raise SystemExit("❌ presentes.valor_arrecadado_centavos não existe: rode a 007 antes")
+        conn.execute(text(f"DROP INDEX IF EXISTS {ANTIGO}"))
+        if NOVO not in indices(conn, 'presentes'):
+            conn.execute(text(
+                f"CREATE INDEX {NOVO} ON presentes "
+                "(lista_id, ativo, (coalesce(valor_arrecadado_centavos, 0) >= valor_total_centavos), id)"
+            ))
+    print(f"✅ Índice {NOVO} garantido.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+Migration: listas.chave_pix_tipo (cpf, cnpj, telefone, email, aleatoria)
+Usage: python migrations/009_tipo_chave_pix.py
+Safe to re-run. A key with only digits is ambiguous (CPF or mobile phone):
+lists like that stay without PIX until their type is set, e.g.
+UPDATE listas SET chave_pix_tipo = 'telefone' WHERE slug = '...'.
+The default list (id 1) falls back to PIX_TIPO_CHAVE.
+"""
+import re
+from sqlalchemy import text
+from banco import colunas, conectar
+
+
+def main():
+    with conectar().begin() as conn:
+        if 'chave_pix_tipo' not in colunas(conn, 'listas'):
+            conn.execute(text("ALTER TABLE listas ADD COLUMN chave_pix_tipo VARCHAR(10)"))
+            print("✅ Coluna listas.chave_pix_tipo adicionada.")
+        else:
+            print("ℹ️ listas.chave_pix_tipo já existe.")
+
+        pendentes = conn.execute(text(
+            "SELECT slug, chave_pix FROM listas WHERE chave_pix_tipo IS NULL AND id <> 1"
+        )).fetchall()
+        for slug, chave in pendentes:
+            if chave and re.fullmatch(r'[\d.\-/() ]+', chave.strip()) and len(re.sub(r'\D', '', chave)) != 14:
+                print(f"⚠️ Lista '{slug}': chave só com dígitos, defina chave_pix_tipo (cpf ou telefone)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Migration: full-text search index for /api/presentes/search
+(FTS5 table + triggers on SQLite; unaccent, f_unaccent() and a GIN index on
+PostgreSQL)
+Usage: python migrations/010_indice_busca.py
+Safe to re-run. Needs privileges to CREATE EXTENSION on PostgreSQL, which is
+why it runs here once and not at every worker start. Workers pick the index up
+on their next start; until then the search falls back to LIKE.
+"""
+from sqlalchemy import text
+from banco import conectar, tabelas
+
+DDL_SQLITE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS presentes_fts USING fts5(
+        nome, descricao, content='presentes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS presentes_fts_ai AFTER INSERT ON presentes BEGIN
+        INSERT INTO presentes_fts(rowid, nome, descricao) VALUES (new.id, new.nome, new.descricao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS presentes_fts_ad AFTER DELETE ON presentes BEGIN
+        INSERT INTO presentes_fts(presentes_fts, rowid, nome, descricao) VALUES ('delete', old.id, old.nome, old.descricao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS presentes_fts_au AFTER UPDATE OF nome, descricao ON presentes BEGIN
+        INSERT INTO presentes_fts(presentes_fts, rowid, nome, descricao) VALUES ('delete', old.id, old.nome, old.descricao);
+        INSERT INTO presentes_fts(rowid, nome, descricao) VALUES (new.id, new.nome, new.descricao);
+    END""",
+]
+
+# A expressão do índice é a mesma de busca_service.TSVECTOR_PG (a consulta precisa casar)
+DDL_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() não é IMMUTABLE; o wrapper permite usá-la num índice
+    """CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent', $1) $$""",
+    "CREATE INDEX IF NOT EXISTS ix_presentes_busca ON presentes USING GIN "
+    "(to_tsvector('portuguese', f_unaccent(coalesce(nome, '') || ' ' || coalesce(descricao, ''))))",
+]
+
+
+def main():
+    with conectar().begin() as conn:
+        dialeto = conn.dialect.name
+        if dialeto == 'sqlite':
+            existia = 'presentes_fts' in tabelas(conn)
+            for ddl in DDL_SQLITE:
+                conn.execute(text(ddl))
+            if not existia:
+                conn.execute(text("INSERT INTO presentes_fts(presentes_fts) VALUES ('rebuild')"))
+                print("✅ presentes_fts criada e indexada.")
+        elif dialeto == 'postgresql':
+            for ddl in DDL_POSTGRES:
+                conn.execute(text(ddl))
+        else:
+            raise SystemExit(f"❌ Sem índice de busca para o dialeto {dialeto}")
+    print("✅ Índice de busca garantido.")
+
+
+if __name__ == '__main__':
+    main()
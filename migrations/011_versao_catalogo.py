@@ -0,0 +1,21 @@
+"""
+Migration: listas.catalogo_versao, the catalog version behind the cached
+pages, kept in the database so a sync in one worker reaches all of them
+Usage: python migrations/011_versao_catalogo.py
+Safe to re-run. Requires 004 (listas).
+"""
+from sqlalchemy import text
+from banco import colunas, conectar
+
+
+def main():
+    with conectar().begin() as conn:
+        if 'catalogo_versao' in colunas(conn, 'listas'):
+            print("ℹ️ listas.catalogo_versao já existe. Nada a fazer.")
+            return
+        conn.execute(text("ALTER TABLE listas ADD COLUMN catalogo_versao INTEGER NOT NULL DEFAULT 0"))
+    print("✅ Coluna listas.catalogo_versao adicionada.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Conexão usada pelas migrações: um engine direto de SQLALCHEMY_DATABASE_URI,
+sem create_app(). O db.create_all() da aplicação criaria as tabelas no formato
+dos modelos de hoje; cada migração escreve SQL literal para o esquema do seu
+ponto na história, então as migrações rodam em ordem num banco antigo.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, inspect, text
+from config import Config
+
+
+def conectar():
+    return create_engine(Config.SQLALCHEMY_DATABASE_URI, **Config.SQLALCHEMY_ENGINE_OPTIONS)
+
+
+def tabelas(conn):
+    return set(inspect(conn).get_table_names())
+
+
+def colunas(conn, tabela):
+    return {c['name'] for c in inspect(conn).get_columns(tabela)}
+
+
+def indices(conn, tabela):
+    """Nomes dos índices da tabela, inclusive os de expressão (que o inspector não lista)"""
+    if conn.dialect.name == 'sqlite':
+        sql = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :tabela"
+    else:
+        sql = "SELECT indexname FROM pg_indexes WHERE tablename = :tabela"
+    return {nome for (nome,) in conn.execute(text(sql), {'tabela': tabela})}
@@ -1,2 +1,4 @@
+from .lista import Lista
 from .presente import Presente
-from .contribuicao import Contribuicao
\ No newline at end of file
+from .contribuicao import Contribuicao
+from .agregado import AgregadoContribuicao
\ No newline at end of file
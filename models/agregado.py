@@ -0,0 +1,34 @@
+from database import db
+from dinheiro import Centavos, em_reais
+
+# Granularidades dos buckets de tempo (início truncado na hora ou no dia, UTC)
+GRANULARIDADES = ('hora', 'dia')
+
+class AgregadoContribuicao(db.Model):
+    """Total de contribuições confirmadas por bucket de tempo, presente e método de pagamento"""
+    __tablename__ = 'agregados_contribuicoes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    lista_id = db.Column(db.Integer, db.ForeignKey('listas.id'), nullable=False)
+    granularidade = db.Column(db.String(4), nullable=False)
+    inicio = db.Column(db.DateTime, nullable=False)
+    presente_id = db.Column(db.Integer, db.ForeignKey('presentes.id', ondelete='CASCADE'), nullable=False)
+    metodo_pagamento = db.Column(db.String(20), nullable=False)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    valor_centavos = db.Column(Centavos, nullable=False, default=0)
+
+    __table_args__ = (
+        # Alvo do upsert incremental e índice das consultas do painel (lista, granularidade, período)
+        db.UniqueConstraint('lista_id', 'granularidade', 'inicio', 'presente_id', 'metodo_pagamento',
+                            name='uq_agregados_bucket'),
+    )
+
+    def to_dict(self):
+        return {
+            'granularidade': self.granularidade,
+            'inicio': self.inicio.isoformat(),
+            'presente_id': self.presente_id,
+            'metodo_pagamento': self.metodo_pagamento,
+            'quantidade': self.quantidade,
+            'valor': em_reais(self.valor_centavos)
+        }
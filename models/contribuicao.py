@@ -1,29 +1,36 @@
 from database import db
+from dinheiro import Centavos, em_reais
 from datetime import datetime
 
 class Contribuicao(db.Model):
     __tablename__ = 'contribuicoes'
     
     id = db.Column(db.Integer, primary_key=True)
-    presente_id = db.Column(db.Integer, db.ForeignKey('presentes.id'), nullable=False)
+    # active_history: os agregados do painel precisam do valor anterior mesmo com o objeto expirado
+    presente_id = db.column_property(db.Column(db.Integer, db.ForeignKey('presentes.id'), nullable=False), active_history=True)
     nome_contribuinte = db.Column(db.String(100), nullable=False)
     email_contribuinte = db.Column(db.String(100), nullable=False)
     # Novos campos para CPF e Telefone
     cpf_contribuinte = db.Column(db.String(20))
     telefone_contribuinte = db.Column(db.String(30))
-    valor = db.Column(db.Numeric(10, 2), nullable=False)
+    valor_centavos = db.column_property(db.Column(Centavos, nullable=False), active_history=True)
     mensagem = db.Column(db.Text)
-    status = db.Column(db.String(20), default='pendente')
+    status = db.column_property(db.Column(db.String(20), default='pendente'), active_history=True)
     payment_id = db.Column(db.String(100))
-    metodo_pagamento = db.Column(db.String(20), default='cartao')
+    metodo_pagamento = db.column_property(db.Column(db.String(20), default='cartao'), active_history=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Reconciliação: pendentes em ordem de id (keyset)
+        db.Index('ix_contribuicoes_status_id', 'status', 'id'),
+    )
     
     def to_dict(self):
         return {
             'id': self.id,
             'presente_id': self.presente_id,
             'nome_contribuinte': self.nome_contribuinte,
-            'valor': float(self.valor),
+            'valor': em_reais(self.valor_centavos),
             'mensagem': self.mensagem,
             'status': self.status,
             'metodo_pagamento': self.metodo_pagamento,
@@ -0,0 +1,34 @@
+from database import db
+from datetime import datetime
+
+# Lista criada a partir da Config (modo de um casal só e dados legados)
+LISTA_PADRAO_ID = 1
+
+class Lista(db.Model):
+    __tablename__ = 'listas'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(60), nullable=False, unique=True)
+    dominio = db.Column(db.String(200), unique=True)
+    noivo_nome = db.Column(db.String(100), nullable=False)
+    data_casamento = db.Column(db.String(60), nullable=False)
+    chave_pix = db.Column(db.String(100))
+    # cpf, cnpj, telefone, email ou aleatoria (services/pix_service.TIPOS_CHAVE);
+    # obrigatório quando a chave tem só dígitos
+    chave_pix_tipo = db.Column(db.String(10))
+    ativo = db.Column(db.Boolean, default=True)
+    # Versão do catálogo (chave das páginas cacheadas): no banco, para valer em todos os workers
+    catalogo_versao = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    presentes = db.relationship('Presente', backref='lista', lazy=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'slug': self.slug,
+            'dominio': self.dominio,
+            'noivo_nome': self.noivo_nome,
+            'data_casamento': self.data_casamento,
+            'ativo': self.ativo
+        }
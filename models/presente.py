@@ -1,37 +1,51 @@
 from database import db
+from dinheiro import Centavos, em_reais
 from datetime import datetime
+from models.lista import LISTA_PADRAO_ID
 
 class Presente(db.Model):
     __tablename__ = 'presentes'
     
     id = db.Column(db.Integer, primary_key=True)
+    lista_id = db.Column(db.Integer, db.ForeignKey('listas.id'), nullable=False, default=LISTA_PADRAO_ID)
     nome = db.Column(db.String(100), nullable=False)
     descricao = db.Column(db.String(500), nullable=False) 
-    valor_total = db.Column(db.Numeric(10, 2), nullable=False)  
-    valor_arrecadado = db.Column(db.Numeric(10, 2), default=0.0)  
+    # Dinheiro em centavos inteiros (ver dinheiro.py)
+    valor_total_centavos = db.Column(Centavos, nullable=False)
+    valor_arrecadado_centavos = db.Column(Centavos, default=0)
     ativo = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     imagem_url = db.Column(db.String(300), default='/static/images/gift-default.jpg')
     
     contribuicoes = db.relationship('Contribuicao', backref='presente', lazy=True, cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Chave natural do catálogo dentro da lista (alvo do ON CONFLICT na sincronização)
+        db.UniqueConstraint('lista_id', 'nome', name='uq_presentes_lista_nome'),
+        # Paginação por cursor (id) com filtros ?ativo= e ?completo=, sempre por lista
+        db.Index('ix_presentes_lista_ativo_id', lista_id, ativo, id),
+        # Mesma expressão de catalogo_service.expressao_completo (arrecadado NULL conta como 0)
+        db.Index('ix_presentes_lista_ativo_esta_completo_id', lista_id, ativo,
+                 db.func.coalesce(valor_arrecadado_centavos, db.literal_column('0')) >= valor_total_centavos, id),
+    )
+    
     @property
     def progresso_porcentagem(self):
-        if self.valor_total == 0:
+        if self.valor_total_centavos == 0:
             return 0
-        return min(100, (float(self.valor_arrecadado) / float(self.valor_total)) * 100)
+        return min(100, (self.valor_arrecadado_centavos or 0) * 100 / self.valor_total_centavos)
     
     @property
     def esta_completo(self):
-        return float(self.valor_arrecadado) >= float(self.valor_total)
+        return (self.valor_arrecadado_centavos or 0) >= self.valor_total_centavos
     
     def to_dict(self):
         return {
             'id': self.id,
             'nome': self.nome,
             'descricao': self.descricao,
-            'valor_total': float(self.valor_total),
-            'valor_arrecadado': float(self.valor_arrecadado),
+            'valor_total': em_reais(self.valor_total_centavos),
+            'valor_arrecadado': em_reais(self.valor_arrecadado_centavos),
             'progresso_porcentagem': self.progresso_porcentagem,
             'esta_completo': self.esta_completo,
             'imagem_url': self.imagem_url
@@ -6,12 +6,89 @@ from flask import request, current_app
 from flask_compress import Compress
 from werkzeug.middleware.proxy_fix import ProxyFix
 import functools
+import gzip
+import hashlib
+import zlib
 import bleach
 import time
+from config import Config
+from lru_cache import LRUCache
+from metrics import metrics
 from security import logger
 
+
+class CachedCompress(Compress):
+    """
+    Flask-Compress com cache da representação comprimida.
+    A chave é (ETag ou hash do corpo, algoritmo, nível), então corpos idênticos
+    (index cacheado, JSON do catálogo) são comprimidos uma única vez.
+    """
+    def __init__(self, app=None):
+        self.cache_comprimidos = LRUCache(max_bytes=Config.COMPRESS_CACHE_MAX_BYTES,
+                                         tamanho=lambda item: len(item[0]))
+        super().__init__(app)
+
+    # Mesmo tipo com nomes diferentes: o mimetypes do Python (e portanto o
+    # send_file do Flask) devolve text/javascript ou application/javascript
+    # conforme a versão, e o COMPRESS_NIVEIS usa um nome só
+    APELIDOS_MIMETYPE = {
+        'text/javascript': 'application/javascript',
+        'application/x-javascript': 'application/javascript',
+    }
+
+    def _nivel(self, app, mimetype, algorithm):
+        mimetype = self.APELIDOS_MIMETYPE.get(mimetype, mimetype)
+        niveis = Config.COMPRESS_NIVEIS.get(mimetype, {})
+        if algorithm in niveis:
+            return niveis[algorithm]
+        return {
+            'gzip': app.config['COMPRESS_LEVEL'],
+            'br': app.config['COMPRESS_BR_LEVEL'],
+            'deflate': app.config['COMPRESS_DEFLATE_LEVEL']
+        }[algorithm]
+
+    def compress(self, app, response, algorithm):
+        nivel = self._nivel(app, response.mimetype, algorithm)
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            base = etag
+        else:
+            base = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+        chave = (base, algorithm, nivel)
+
+        item = self.cache_comprimidos.get(chave)
+        if item is not None:
+            dados, custo = item
+            metrics.incr('compressao.hits')
+            metrics.incr('compressao.cpu_ms_economizado', custo)
+            return dados
+
+        # thread_time: só a CPU desta thread; process_time somaria os outros workers
+        inicio = time.thread_time()
+        dados = self._comprimir(app, response.get_data(), algorithm, nivel)
+        custo = (time.thread_time() - inicio) * 1000
+        self.cache_comprimidos.set(chave, (dados, custo))
+        metrics.incr('compressao.misses')
+        metrics.incr('compressao.cpu_ms_gasto', custo)
+        return dados
+
+    def _comprimir(self, app, dados, algorithm, nivel):
+        if algorithm == 'gzip':
+            return gzip.compress(dados, compresslevel=nivel, mtime=0)
+        elif algorithm == 'deflate':
+            return zlib.compress(dados, nivel)
+        elif algorithm == 'br':
+            import brotli
+            return brotli.compress(dados,
+                                   mode=app.config['COMPRESS_BR_MODE'],
+                                   quality=nivel,
+                                   lgwin=app.config['COMPRESS_BR_WINDOW'],
+                                   lgblock=app.config['COMPRESS_BR_BLOCK'])
+
+
 # Configuração de compressão
-compress = Compress()
+compress = CachedCompress()
+metrics.registrar_fonte('compressao_cache', lambda: compress.cache_comprimidos.stats())
 
 def init_production(app):
     """Inicializa configurações de produção"""
@@ -0,0 +1,195 @@
+"""
+Profiler sob demanda: perfila uma requisição inteira quando ela traz um
+cabeçalho X-Profile assinado com o ADMIN_TOKEN ou cai na amostragem de
+PROFILE_SAMPLE_RATE. Os perfis (HTML ou speedscope do pyinstrument; pstats
+do cProfile na falta dele) ficam num buffer circular em disco. O middleware
+fica instalado sempre que há ADMIN_TOKEN (ou amostragem), para ligar o perfil
+num worker em produção sem reiniciar; nas outras requisições custa só a
+leitura do cabeçalho e o sorteio. PROFILING=0 desinstala.
+"""
+import cProfile
+import hashlib
+import hmac
+import marshal
+import os
+import random
+import re
+import threading
+import time
+from config import Config
+from metrics import metrics
+from security import logger
+
+# Só um perfil por vez por processo: limita o custo mesmo com amostragem alta
+_perfilando = threading.Lock()
+
+NOME_RE = re.compile(r'^[0-9]+-[A-Z]+-[a-z0-9_-]*-[0-9]+ms\.(html|speedscope\.json|prof)$')
+
+EXTENSOES = {'html': 'html', 'speedscope': 'speedscope.json', 'cprofile': 'prof'}
+
+
+def _assinatura(expira):
+    return hmac.new(Config.ADMIN_TOKEN.encode(), f'profile:{expira}'.encode(), hashlib.sha256).hexdigest()
+
+
+def gerar_token(minutos=10):
+    """Valor do cabeçalho X-Profile válido por alguns minutos (sem expor o ADMIN_TOKEN)"""
+    expira = int(time.time()) + minutos * 60
+    return f'{expira}.{_assinatura(expira)}'
+
+
+def token_valido(valor):
+    if not valor or not Config.ADMIN_TOKEN or '.' not in valor:
+        return False
+    expira, assinatura = valor.split('.', 1)
+    if not expira.isdigit() or int(expira) < time.time():
+        return False
+    return hmac.compare_digest(assinatura, _assinatura(int(expira)))
+
+
+def _profiler():
+    """(iniciar, parar -> (conteúdo, formato)) com pyinstrument se instalado, senão cProfile"""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        perfil = cProfile.Profile()
+
+        def parar():
+            perfil.disable()
+            perfil.create_stats()
+            # Mesmo formato de Profile.dump_stats (abre com pstats/snakeviz)
+            return marshal.dumps(perfil.stats), 'cprofile'
+        return perfil.enable, parar
+
+    perfil = Profiler(interval=Config.PROFILE_INTERVALO, async_mode='disabled')
+
+    def parar():
+        perfil.stop()
+        if Config.PROFILE_FORMATO == 'speedscope':
+            from pyinstrument.renderers import SpeedscopeRenderer
+            return perfil.output(SpeedscopeRenderer()).encode('utf-8'), 'speedscope'
+        return perfil.output_html().encode('utf-8'), 'html'
+    return perfil.start, parar
+
+
+def _gravar(conteudo, formato, metodo, caminho, duracao_ms):
+    """Grava o perfil e apaga os mais antigos além de PROFILE_MAX_ARQUIVOS"""
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    rota = re.sub(r'[^a-z0-9]+', '-', caminho.lower()).strip('-')[:60]
+    nome = f'{time.time_ns()}-{metodo}-{rota}-{int(duracao_ms)}ms.{EXTENSOES[formato]}'
+    destino = os.path.join(Config.PROFILE_DIR, nome)
+    temporario = destino + '.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(conteudo)
+    os.replace(temporario, destino)
+
+    arquivos = sorted(a for a in os.listdir(Config.PROFILE_DIR) if NOME_RE.match(a))
+    for antigo in arquivos[:-Config.PROFILE_MAX_ARQUIVOS]:
+        try:
+            os.remove(os.path.join(Config.PROFILE_DIR, antigo))
+        except OSError:
+            pass
+    return nome
+
+
+def listar_perfis():
+    """Perfis guardados, do mais recente ao mais antigo"""
+    if not os.path.isdir(Config.PROFILE_DIR):
+        return []
+    perfis = []
+    for nome in sorted((a for a in os.listdir(Config.PROFILE_DIR) if NOME_RE.match(a)), reverse=True):
+        criado_ns, metodo, resto = nome.split('-', 2)
+        rota, duracao = resto.rsplit('-', 1)
+        perfis.append({
+            'nome': nome,
+            'criado_em': int(criado_ns) / 1e9,
+            'metodo': metodo,
+            'rota': rota,
+            'duracao_ms': int(duracao.split('ms', 1)[0]),
+            'bytes': os.path.getsize(os.path.join(Config.PROFILE_DIR, nome))
+        })
+    return perfis
+
+
+def nome_valido(nome):
+    return bool(NOME_RE.match(nome or ''))
+
+
+class _RespostaPerfilada:
+    """
+    Corpo da resposta perfilada: o perfil só termina no close(), depois que o
+    servidor consumiu o corpo, então respostas em streaming (exportações)
+    continuam em streaming e a geração delas entra no perfil.
+    """
+
+    def __init__(self, resposta, encerrar):
+        self._resposta = resposta
+        self._encerrar = encerrar
+
+    def __iter__(self):
+        return iter(self._resposta)
+
+    def close(self):
+        try:
+            if hasattr(self._resposta, 'close'):
+                self._resposta.close()
+        finally:
+            self._encerrar()
+
+
+class ProfilingMiddleware:
+    """Perfila a requisição selecionada (cabeçalho assinado ou amostragem), uma por vez"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        pedido = environ.get('HTTP_X_PROFILE')
+        if pedido is not None:
+            if not token_valido(pedido):
+                return self.wsgi_app(environ, start_response)
+        elif not (Config.PROFILE_SAMPLE_RATE and random.random() < Config.PROFILE_SAMPLE_RATE):
+            return self.wsgi_app(environ, start_response)
+
+        if not _perfilando.acquire(blocking=False):
+            metrics.incr('profiling.ocupado')
+            return self.wsgi_app(environ, start_response)
+
+        encerrado = []
+
+        def encerrar():
+            if encerrado:
+                return
+            encerrado.append(True)
+            try:
+                conteudo, formato = parar()
+                duracao_ms = (time.perf_counter() - inicio) * 1000
+                arquivo = _gravar(conteudo, formato, environ.get('REQUEST_METHOD', 'GET'),
+                                  environ.get('PATH_INFO', '/'), duracao_ms)
+                metrics.incr('profiling.perfis')
+                logger.info("request_profiled", arquivo=arquivo, duracao_ms=round(duracao_ms, 1),
+                            path=environ.get('PATH_INFO'))
+            finally:
+                _perfilando.release()
+
+        try:
+            iniciar, parar = _profiler()
+            inicio = time.perf_counter()
+            iniciar()
+        except BaseException:
+            _perfilando.release()
+            raise
+        try:
+            return _RespostaPerfilada(self.wsgi_app(environ, start_response), encerrar)
+        except BaseException:
+            encerrar()
+            raise
+
+
+def init_profiling(app):
+    """Instala o middleware se houver ADMIN_TOKEN (cabeçalho assinado) ou amostragem"""
+    if not Config.PROFILING or not (Config.ADMIN_TOKEN or Config.PROFILE_SAMPLE_RATE):
+        return app
+    app.wsgi_app = ProfilingMiddleware(app.wsgi_app)
+    logger.info("profiling_ativado", sample_rate=Config.PROFILE_SAMPLE_RATE, dir=Config.PROFILE_DIR)
+    return app
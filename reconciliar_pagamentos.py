@@ -0,0 +1,34 @@
+# reconciliar_pagamentos.py - Atualiza contribuições pendentes consultando o Mercado Pago (webhooks perdidos)
+import argparse
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconcilia contribuições pendentes com o Mercado Pago')
+    parser.add_argument('--lote', type=int, help='contribuições por lote/transação')
+    parser.add_argument('--threads', type=int, help='consultas simultâneas ao provedor')
+    parser.add_argument('--taxa', type=float, help='consultas por segundo ao provedor (0 = sem limite)')
+    parser.add_argument('--idade-minima', type=int, help='ignora pendentes mais novas que N segundos')
+    parser.add_argument('--intervalo', type=int, help='roda continuamente, a cada N segundos')
+    args = parser.parse_args()
+
+    from app import create_app
+    from services.reconciliacao_service import limite_do_provedor, reconciliar
+
+    app = create_app()
+    limite = limite_do_provedor(taxa=args.taxa)
+    while True:
+        with app.app_context():
+            relatorio = reconciliar(lote=args.lote, threads=args.threads,
+                                    idade_minima=args.idade_minima, limite=limite)
+        lotes = relatorio['ms_por_lote']
+        print(f"🔄 {relatorio['consultadas']} pendentes consultadas em {relatorio['lotes']} lotes "
+              f"({relatorio['segundos']:.1f}s, {relatorio['consultadas'] / max(relatorio['segundos'], 1e-9):.0f}/s"
+              f"{f', {sum(lotes) / len(lotes):.0f}ms por lote' if lotes else ''})")
+        print(f"✅ {relatorio['atualizadas']} atualizadas ({relatorio['aprovadas']} aprovadas), "
+              f"{relatorio['sem_pagamento']} sem pagamento, {relatorio['erros']} erros")
+        if not args.intervalo:
+            break
+        time.sleep(args.intervalo)
+
+if __name__ == '__main__':
+    main()
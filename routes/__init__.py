@@ -1,6 +1,8 @@
 from .present_routes import present_bp
 from .payment_routes import present_bp as payment_bp
+from .admin_routes import admin_bp
 
 def register_routes(app):
     app.register_blueprint(present_bp)
-    app.register_blueprint(payment_bp)
\ No newline at end of file
+    app.register_blueprint(payment_bp)
+    app.register_blueprint(admin_bp)
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+from flask import Blueprint, Response, abort, jsonify, request, send_from_directory, stream_with_context
+from config import Config
+from metrics import metrics
+from security import admin_required, logger
+from profiling import gerar_token, listar_perfis, nome_valido
+from services.agregados_service import resumo, serie
+from services.exportacao_service import (
+    FORMATOS, consulta_exportacao, gerar_linhas, gzip_stream, parse_data
+)
+from services.lista_service import lista_atual
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+# --- Métricas do worker ---
+@admin_bp.route('/api/metricas', methods=['GET'])
+@admin_required
+def obter_metricas():
+    return jsonify({
+        'success': True,
+        'metricas': metrics.snapshot()
+    })
+
+
+# --- Exportação de contribuições (CSV/JSONL em streaming) ---
+@admin_bp.route('/api/contribuicoes/export', methods=['GET'])
+@admin_required
+def exportar_contribuicoes():
+    formato = request.args.get('formato', 'csv')
+    comprimir = request.args.get('gzip') in ('1', 'true')
+    try:
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato inválido: use {' ou '.join(FORMATOS)}")
+        query = consulta_exportacao(
+            lista_atual().id,
+            desde=parse_data(request.args.get('desde')),
+            ate=parse_data(request.args.get('ate')),
+            presente_id=request.args.get('presente_id', type=int),
+            status=request.args.get('status')
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    logger.info("contribuicoes_export", formato=formato, gzip=comprimir, filtros=request.args.to_dict())
+
+    corpo = gerar_linhas(query, formato)
+    nome = f'contribuicoes.{formato}'
+    mimetype = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    headers = {}
+    if comprimir:
+        corpo = gzip_stream(corpo)
+        nome += '.gz'
+        mimetype = 'application/gzip'
+    headers['Content-Disposition'] = f'attachment; filename="{nome}"'
+
+    return Response(stream_with_context(corpo), mimetype=mimetype, headers=headers)
+
+
+# --- Painel: totais pré-agregados por hora/dia, presente e método ---
+@admin_bp.route('/api/dashboard/resumo', methods=['GET'])
+@admin_required
+def dashboard_resumo():
+    try:
+        dados = resumo(
+            lista_atual().id,
+            desde=parse_data(request.args.get('desde')),
+            ate=parse_data(request.args.get('ate'))
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    return jsonify({
+        'success': True,
+        'resumo': dados
+    })
+
+
+@admin_bp.route('/api/dashboard/serie', methods=['GET'])
+@admin_required
+def dashboard_serie():
+    try:
+        pontos = serie(
+            lista_atual().id,
+            granularidade=request.args.get('granularidade', 'hora'),
+            desde=parse_data(request.args.get('desde')),
+            ate=parse_data(request.args.get('ate')),
+            presente_id=request.args.get('presente_id', type=int),
+            metodo=request.args.get('metodo')
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    return jsonify({
+        'success': True,
+        'serie': pontos
+    })
+
+
+# --- Profiling sob demanda ---
+@admin_bp.route('/api/profiles', methods=['GET'])
+@admin_required
+def perfis():
+    return jsonify({
+        'success': True,
+        'ativo': Config.PROFILING,
+        'perfis': listar_perfis()
+    })
+
+
+@admin_bp.route('/api/profiles/token', methods=['POST'])
+@admin_required
+def token_perfil():
+    """Valor do cabeçalho X-Profile para perfilar requisições nos próximos minutos"""
+    minutos = min(request.args.get('minutos', 10, type=int), 60)
+    return jsonify({
+        'success': True,
+        'header': 'X-Profile',
+        'valor': gerar_token(minutos),
+        'expira_em_minutos': minutos
+    })
+
+
+@admin_bp.route('/api/profiles/<nome>', methods=['GET'])
+@admin_required
+def baixar_perfil(nome):
+    if not nome_valido(nome):
+        abort(404)
+    return send_from_directory(os.path.abspath(Config.PROFILE_DIR), nome, as_attachment=not nome.endswith('.html'))
@@ -1,13 +1,16 @@
-from flask import Blueprint, jsonify, request, render_template
-from database import db
+from flask import Blueprint, jsonify, request, render_template, abort, url_for, Response
+from database import db, iniciar_escrita
 from models.presente import Presente
 from models.contribuicao import Contribuicao
 from security import limiter, logger
 from config import Config
+from services.lista_service import lista_atual
+from tracing import span
+from antiabuso import registrar_tentativa
+from dinheiro import para_centavos, reais_texto
+from services import pix_service
 import hmac
 import hashlib
-import time
-import functools
 
 present_bp = Blueprint('present', __name__)
 
@@ -25,35 +28,6 @@ def verify_webhook_signature(data, signature):
     
     return hmac.compare_digest(calculated, signature)
 
-def with_retry(max_retries=3, delay=1):
-    """Decorator para adicionar retry em funções"""
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            last_error = None
-            for attempt in range(max_retries):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    last_error = e
-                    logger.warning(
-                        "retry_attempt",
-                        function=func.__name__,
-                        attempt=attempt + 1,
-                        max_retries=max_retries,
-                        error=str(e)
-                    )
-                    if attempt < max_retries - 1:
-                        time.sleep(delay * (attempt + 1))
-            logger.error(
-                "max_retries_reached",
-                function=func.__name__,
-                error=str(last_error)
-            )
-            raise last_error
-        return wrapper
-    return decorator
-
 # Serviço de validação simplificado
 class ValidationService:
     @staticmethod
@@ -72,11 +46,10 @@ class ValidationService:
             
         # Valida valor (APENAS valor positivo)
         try:
-            valor_float = float(str(valor).replace(',', '.'))
-            if valor_float <= 0:
+            if para_centavos(valor) <= 0:
                 errors.append('Valor deve ser maior que zero')
             # REMOVIDO: Verificação de valor máximo
-        except (ValueError, TypeError):
+        except ValueError:
             errors.append('Valor inválido')
             
         # Valida email básico
@@ -97,50 +70,29 @@ class ValidationService:
             
         return True, None
     
+    @staticmethod
+    def verificar_tentativas(email, cpf, ip):
+        """Dimensão (email, cpf, ip) que passou do limite de tentativas, ou None"""
+        return registrar_tentativa(email=email, cpf=cpf, ip=ip)
+    
     @staticmethod
     def verificar_valor_maximo_diario(email):
         """Verifica limite diário por email"""
         # Implementação simplificada - sempre retorna False (sem limite)
         return False
 
-@present_bp.route('/')
-def index():
-    """Página principal com lista de presentes"""
-    from config import Config
-    presentes = Presente.query.filter_by(ativo=True).all()
-    return render_template('index.html', 
-                         presentes=presentes,
-                         noivo_nome=Config.NOIVO_NOME,
-                         data_casamento=Config.DATA_CASAMENTO)
-
-
-@present_bp.route('/api/presentes')
-def get_presents():
-    """API para obter lista de presentes"""
-    try:
-        presents = Presente.query.filter_by(ativo=True).all()
-        presents_data = []
-        for presente in presentes:
-            presents_data.append({
-                'id': presente.id,
-                'nome': presente.nome,
-                'descricao': presente.descricao,
-                'valor_total': float(presente.valor_total),
-                'imagem_url': presente.imagem_url,
-                'ativo': presente.ativo  # CORRIGIDO: active → ativo
-            })
-        return jsonify({'success': True, 'presents': presents_data})
-    except Exception as e:
-        logger.error("error_getting_presents", error=str(e))
-        return jsonify({'success': False, 'error': str(e)}), 500
-
 @present_bp.route('/api/contribuir', methods=['POST'])
 @limiter.limit("10/minute")
 def criar_contribuicao():
     """Processa contribuição via PIX"""
     try:
-        data = request.get_json()
-        logger.info("contribution_request_received", data=data)
+        with span('json'):
+            data = request.get_json()
+        # Só um resumo: o corpo tem dados pessoais (nome, e-mail, CPF, telefone)
+        logger.info("contribution_request_received",
+                   presente_id=data.get('presente_id') if isinstance(data, dict) else None,
+                   valor=data.get('valor') if isinstance(data, dict) else None,
+                   campos=sorted(data) if isinstance(data, dict) else None)
         
         # Validações básicas
         if not data or not all(k in data for k in ['presente_id', 'nome', 'email', 'valor', 'cpf']):
@@ -148,13 +100,22 @@ def criar_contribuicao():
                 'success': False,
                 'error': 'Dados incompletos'
             }), 400
+
+        # Sem chave PIX não há como receber: nada é gravado
+        if not lista_atual().chave_pix:
+            logger.error("contribution_sem_chave_pix", lista_id=lista_atual().id)
+            return jsonify({
+                'success': False,
+                'error': 'PIX indisponível para esta lista'
+            }), 503
             
         # Validações de negócio
-        validation_errors = ValidationService.validar_contribuicao(
-            data['presente_id'],
-            data['valor'],
-            data['email']
-        )
+        with span('validacao'):
+            validation_errors = ValidationService.validar_contribuicao(
+                data['presente_id'],
+                data['valor'],
+                data['email']
+            )
         
         if validation_errors:
             logger.warning("contribution_validation_failed", 
@@ -167,7 +128,9 @@ def criar_contribuicao():
             }), 422
             
         # Verifica limite diário
-        if ValidationService.verificar_valor_maximo_diario(data['email']):
+        with span('limite_diario'):
+            limite_excedido = ValidationService.verificar_valor_maximo_diario(data['email'])
+        if limite_excedido:
             logger.warning("daily_limit_exceeded", email=data['email'])
             return jsonify({
                 'success': False,
@@ -175,7 +138,8 @@ def criar_contribuicao():
             }), 429
             
         # Verifica disponibilidade do presente
-        disponivel, erro = ValidationService.validar_presente_disponivel(data['presente_id'])
+        with span('presente_disponivel'):
+            disponivel, erro = ValidationService.validar_presente_disponivel(data['presente_id'])
         if not disponivel:
             logger.warning("present_unavailable", 
                          presente_id=data['presente_id'],
@@ -186,35 +150,50 @@ def criar_contribuicao():
             }), 400
 
         presente = Presente.query.get(data['presente_id'])
-        if not presente:
+        if not presente or presente.lista_id != lista_atual().id:
             return jsonify({
                 'success': False,
                 'error': 'Presente não encontrado'
             }), 404
 
         try:
-            # Trata valor com vírgula ou ponto
-            valor_str = str(data['valor']).replace(',', '.')
-            valor_contribuicao = float(valor_str)
-        except (ValueError, TypeError):
+            # Trata valor com vírgula ou ponto; daqui em diante, centavos inteiros
+            valor_centavos = para_centavos(data['valor'])
+        except ValueError:
             return jsonify({
                 'success': False,
                 'error': 'Valor inválido'
             }), 400
 
         # Verifica se o valor é válido
-        if valor_contribuicao <= 0:
+        if valor_centavos <= 0:
             return jsonify({
                 'success': False,
                 'error': 'Valor deve ser maior que zero'
             }), 400
 
+        # Limite de tentativas por e-mail, CPF e IP (contadores em memória ou Redis, sem ir ao banco).
+        # Fica depois de todas as validações: só conta a tentativa que de fato seguiria
+        with span('antiabuso'):
+            excedido = ValidationService.verificar_tentativas(data['email'], data['cpf'], request.remote_addr)
+        if excedido:
+            logger.warning("contribution_throttled", dimensao=excedido)
+            return jsonify({
+                'success': False,
+                'error': 'Muitas tentativas em um curto período. Tente novamente em alguns minutos'
+            }), 429
+
         # Prepara dados pessoais
         cpf_raw = data.get('cpf', '')
         if isinstance(cpf_raw, str):
             cpf_raw = cpf_raw.replace('.', '').replace('-', '').strip()
         telefone_raw = data.get('telefone', '')
 
+        # Trava de escrita (BEGIN IMMEDIATE no SQLite, compartilhada por todos os workers) só
+        # depois de todos os retornos antecipados: requisição recusada não segura a trava.
+        # A soma de valor_arrecadado é feita no próprio UPDATE, sem atualização perdida
+        iniciar_escrita()
+
         # Cria a contribuição
         contribuicao = Contribuicao(
             presente_id=presente.id,
@@ -222,7 +201,7 @@ def criar_contribuicao():
             email_contribuinte=data['email'],
             cpf_contribuinte=cpf_raw,
             telefone_contribuinte=telefone_raw,
-            valor=valor_contribuicao,
+            valor_centavos=valor_centavos,
             mensagem=data.get('mensagem', ''),
             status='aprovado',  # PIX é aprovado automaticamente
             metodo_pagamento='pix'
@@ -230,20 +209,35 @@ def criar_contribuicao():
 
         db.session.add(contribuicao)
         
-        # Atualiza valor arrecadado do presente
-        presente.valor_arrecadado = float(presente.valor_arrecadado or 0) + valor_contribuicao
+        # Atualiza valor arrecadado do presente (soma inteira no próprio UPDATE)
+        presente.valor_arrecadado_centavos = db.func.coalesce(Presente.valor_arrecadado_centavos, 0) + valor_centavos
         
-        db.session.commit()
+        with span('commit'):
+            db.session.commit()
         
         logger.info("contribution_created", 
                    contribuicao_id=contribuicao.id,
-                   valor=valor_contribuicao,
+                   valor_centavos=valor_centavos,
                    metodo='pix')
         
+        # PIX "copia e cola" com valor e txid: o cliente mostra na hora, sem digitar nada
+        lista = lista_atual()
+        txid = pix_service.txid_contribuicao(contribuicao.id)
+        assinatura = pix_service.assinatura_qr(lista.id, valor_centavos, txid)
         return jsonify({
             'success': True,
             'contribuicao_id': contribuicao.id,
-            'message': 'Contribuição registrada com sucesso via PIX!'
+            'message': 'Contribuição registrada com sucesso via PIX!',
+            'pix': {
+                'copia_e_cola': pix_service.payload_lista(lista, valor_centavos, txid),
+                'valor': reais_texto(valor_centavos),
+                'txid': txid,
+                'qr_code': {
+                    formato: url_for('present.qr_code_pix', formato=formato, valor=valor_centavos,
+                                     txid=txid, assinatura=assinatura)
+                    for formato in pix_service.formatos_qr()
+                }
+            }
         })
         
     except Exception as e:
@@ -254,63 +248,33 @@ def criar_contribuicao():
             'error': 'Erro interno do servidor'
         }), 500
 
+@present_bp.route('/api/pix/qr.<formato>')
+@limiter.limit("60/minute")
+def qr_code_pix(formato):
+    """QR Code do PIX de uma contribuição (URL assinada devolvida por /api/contribuir)"""
+    valor_centavos = request.args.get('valor', type=int)
+    txid = request.args.get('txid', '')
+    lista = lista_atual()
+    if (formato not in pix_service.formatos_qr() or not valor_centavos
+            or not pix_service.assinatura_valida(lista.id, valor_centavos, txid, request.args.get('assinatura'))):
+        abort(404)
+    if not lista.chave_pix:
+        abort(503)
+    payload = pix_service.payload_lista(lista, valor_centavos, txid)
+    with span('qr_code'):
+        imagem = pix_service.renderizar_qr(payload, formato)
+    response = Response(imagem, mimetype=pix_service.MIMETYPES[formato])
+    # A URL identifica a imagem (valor, txid e assinatura): o navegador pode guardar
+    response.cache_control.private = True
+    response.cache_control.max_age = 86400
+    return response
+
 @present_bp.route('/obrigado')
 def obrigado():
     """Página de agradecimento"""
-    contribuicao_id = request.args.get('contribuicao_id', '')
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Obrigado!</title>
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-        <style>
-            body {{ background: linear-gradient(135deg, #ff6b6b, #4ecdc4); min-height: 100vh; display: flex; align-items: center; }}
-        </style>
-    </head>
-    <body>
-        <div class="container text-center text-white">
-            <div class="row justify-content-center">
-                <div class="col-md-6">
-                    <div class="bg-dark bg-opacity-50 rounded p-5">
-                        <h1 class="display-4">🎉 Obrigado!</h1>
-                        <p class="lead">Sua contribuição foi processada com sucesso.</p>
-                        <p>Muito obrigado por fazer parte do nosso sonho!</p>
-                        <a href="/" class="btn btn-primary btn-lg mt-3">Voltar para a Lista de Presentes</a>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return render_template('obrigado.html')
 
 @present_bp.route('/erro')
 def erro():
     """Página de erro"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Erro no Pagamento</title>
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-        <style>
-            body {{ background: linear-gradient(135deg, #ff6b6b, #dc3545); min-height: 100vh; display: flex; align-items: center; }}
-        </style>
-    </head>
-    <body>
-        <div class="container text-center text-white">
-            <div class="row justify-content-center">
-                <div class="col-md-6">
-                    <div class="bg-dark bg-opacity-50 rounded p-5">
-                        <h1 class="display-4">❌ Erro no Pagamento</h1>
-                        <p class="lead">Houve um problema ao processar seu pagamento.</p>
-                        <p>Por favor, tente novamente ou entre em contato conosco.</p>
-                        <a href="/" class="btn btn-primary btn-lg mt-3">Tentar Novamente</a>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
\ No newline at end of file
+    return render_template('erro.html')
@@ -2,17 +2,94 @@ from flask import Blueprint, jsonify, request
 from database import db
 from models.presente import Presente
 from models.contribuicao import Contribuicao
+from security import eh_admin
+from services.lista_service import lista_atual
+from services.busca_service import buscar_presentes
+from services.catalogo_service import (
+    CAMPOS_PUBLICOS, LIMITE_MAXIMO, LIMITE_PADRAO, pagina_presentes, presente_leitura
+)
 
 present_bp = Blueprint('presentes', __name__)
 
-# --- Listar todos os presentes ---
+def _parse_bool(valor):
+    """Converte ?ativo=/?completo= em bool (None se ausente); ValueError se inválido"""
+    if valor is None:
+        return None
+    valor = valor.strip().lower()
+    if valor in ('true', '1', 'sim'):
+        return True
+    if valor in ('false', '0', 'nao', 'não'):
+        return False
+    raise ValueError(f'Valor booleano inválido: {valor}')
+
+
+# --- Listar presentes (paginação por cursor, ?fields=, ?ativo=, ?completo=) ---
 @present_bp.route('/api/presentes', methods=['GET'])
 def listar_presentes():
     try:
-        presentes = Presente.query.filter_by(ativo=True).all()
+        campos = None
+        if request.args.get('fields'):
+            campos = [c.strip() for c in request.args['fields'].split(',') if c.strip()]
+            invalidos = [c for c in campos if c not in CAMPOS_PUBLICOS]
+            if invalidos:
+                raise ValueError(f"Campos inválidos: {', '.join(invalidos)}")
+
+        limite = request.args.get('limit', LIMITE_PADRAO, type=int)
+        if limite < 1 or limite > LIMITE_MAXIMO:
+            raise ValueError(f'limit deve estar entre 1 e {LIMITE_MAXIMO}')
+
+        ativo = _parse_bool(request.args.get('ativo'))
+        # Presentes desativados saíram do catálogo público: só a administração os lista
+        if ativo is False and not eh_admin():
+            return jsonify({
+                'success': False,
+                'error': 'ativo=false exige o token de administração'
+            }), 403
+        presentes, proximo_cursor = pagina_presentes(
+            campos=campos,
+            limite=limite,
+            cursor=request.args.get('cursor'),
+            ativo=True if ativo is None else ativo,
+            completo=_parse_bool(request.args.get('completo')),
+            lista_id=lista_atual().id
+        )
+        return jsonify({
+            'success': True,
+            'presentes': presentes,
+            'proximo_cursor': proximo_cursor
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# --- Busca textual (sem acento, por relevância) ---
+@present_bp.route('/api/presentes/search', methods=['GET'])
+def buscar():
+    consulta = request.args.get('q', '').strip()
+    limite = request.args.get('limit', 20, type=int)
+    if not consulta:
+        return jsonify({
+            'success': False,
+            'error': 'Informe o termo de busca em ?q='
+        }), 400
+    if limite < 1 or limite > LIMITE_MAXIMO:
+        return jsonify({
+            'success': False,
+            'error': f'limit deve estar entre 1 e {LIMITE_MAXIMO}'
+        }), 400
+
+    try:
         return jsonify({
             'success': True,
-            'presentes': [p.to_dict() for p in presentes]
+            'presentes': buscar_presentes(consulta, lista_atual().id, limite)
         })
     except Exception as e:
         return jsonify({
@@ -25,7 +102,12 @@ def listar_presentes():
 @present_bp.route('/api/presentes/<int:presente_id>', methods=['GET'])
 def obter_presente(presente_id):
     try:
-        presente = Presente.query.get_or_404(presente_id)
+        presente = presente_leitura(presente_id, lista_atual().id)
+        if presente is None:
+            return jsonify({
+                'success': False,
+                'error': 'Presente não encontrado'
+            }), 404
         return jsonify({
             'success': True,
             'presente': presente.to_dict()
@@ -34,4 +116,4 @@ def obter_presente(presente_id):
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 404
\ No newline at end of file
+        }), 500
\ No newline at end of file
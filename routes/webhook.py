@@ -20,15 +20,10 @@ webhook_bp = Blueprint("webhook", __name__, url_prefix="/webhook")
 MERCADOPAGO_WEBHOOK_SECRET = None
 STRIPE_WEBHOOK_SECRET = None
 
+# Sem handler próprio: propaga para o logger raiz, que escreve fora da thread da requisição (logs.py)
 logger = logging.getLogger("routes.webhook")
 logger.setLevel(logging.INFO)
 
-# 🔹 Correção: garantir que exista handler de logs (evita erro no Render)
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-    logger.addHandler(handler)
-
 # Webhooks desativados: sem avisos sobre tokens ausentes
 
 # ==========================================================
@@ -195,8 +190,8 @@ def process_mercadopago_webhook_data(data):
         if status == "approved":
             presente = Presente.query.get(contribuicao.presente_id)
             if presente:
-                presente.valor_arrecadado = float(presente.valor_arrecadado or 0) + float(contribuicao.valor)
-                logger.info(f"💰 Valor arrecadado atualizado para {presente.valor_arrecadado}")
+                presente.valor_arrecadado_centavos = (presente.valor_arrecadado_centavos or 0) + contribuicao.valor_centavos
+                logger.info(f"💰 Valor arrecadado atualizado para {presente.valor_arrecadado_centavos} centavos")
 
         db.session.commit()
         logger.info(f"✅ Contribuição {contribuicao.id} atualizada para '{status}'")
@@ -277,8 +272,8 @@ def stripe_webhook():
         if status == "approved":
             presente = Presente.query.get(contribuicao.presente_id)
             if presente:
-                presente.valor_arrecadado = float(presente.valor_arrecadado or 0) + float(contribuicao.valor)
-                logger.info(f"💰 Valor arrecadado atualizado para {presente.valor_arrecadado}")
+                presente.valor_arrecadado_centavos = (presente.valor_arrecadado_centavos or 0) + contribuicao.valor_centavos
+                logger.info(f"💰 Valor arrecadado atualizado para {presente.valor_arrecadado_centavos} centavos")
                 
         db.session.commit()
         logger.info(f"✅ Contribuição {contribuicao.id} atualizada para '{status}'")
@@ -0,0 +1,81 @@
+"""
+Benchmark do limite de tentativas por e-mail: o COUNT(*) em contribuicoes
+(e-mail + últimos 5 minutos, a cada contribuição) contra os contadores de
+janela deslizante de antiabuso.py, em memória e, com --redis, no Redis.
+Usage: python scripts/bench_antiabuso.py [--contribuicoes 100000] [--verificacoes 2000] [--redis redis://localhost:6379/15]
+Usa um SQLite temporário; não toca no banco configurado.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--contribuicoes', type=int, default=100000)
+    parser.add_argument('--verificacoes', type=int, default=2000)
+    parser.add_argument('--emails', type=int, default=20000)
+    parser.add_argument('--redis', help='URL de um Redis descartável para medir o contador compartilhado')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+    os.chdir(pasta)
+    from datetime import datetime, timedelta
+    from app import app
+    from antiabuso import ContadorMemoria, ContadorRedis
+    from database import db
+    from models.contribuicao import Contribuicao
+    from services.catalogo_service import sincronizar_catalogo
+
+    agora = datetime.utcnow()
+    with app.app_context():
+        sincronizar_catalogo([{'nome': 'Presente', 'valor_total': 10**6}])
+        db.session.execute(db.insert(Contribuicao), [
+            {'presente_id': 1, 'nome_contribuinte': 'Bench', 'email_contribuinte': f'bench{i % args.emails}@example.com',
+             'valor_centavos': 1000, 'status': 'approved', 'created_at': agora - timedelta(seconds=random.randint(0, 86400))}
+            for i in range(args.contribuicoes)
+        ])
+        db.session.commit()
+
+        emails = [f'bench{random.randrange(args.emails)}@example.com' for _ in range(args.verificacoes)]
+
+        def por_count(email):
+            return Contribuicao.query.filter(
+                Contribuicao.email_contribuinte == email,
+                Contribuicao.created_at >= datetime.utcnow() - timedelta(minutes=5)
+            ).count() >= 5
+
+        modos = [('COUNT(*) no banco', por_count)]
+        memoria = ContadorMemoria(max_chaves=100000)
+        modos.append(('janela em memória', lambda email: not memoria.registrar(email, 5, 300)))
+        if args.redis:
+            redis_contador = ContadorRedis(args.redis, prefixo=f'bench{os.getpid()}')
+            modos.append(('janela no Redis', lambda email: not redis_contador.registrar(email, 5, 300)))
+
+        print(f"📦 {args.contribuicoes} contribuições no banco, {args.verificacoes} verificações")
+        for nome, verificar in modos:
+            latencias = []
+            inicio = time.perf_counter()
+            for email in emails:
+                t0 = time.perf_counter()
+                verificar(email)
+                latencias.append((time.perf_counter() - t0) * 1000)
+            total = time.perf_counter() - inicio
+            print(f"⏱️  {nome:20s}: {args.verificacoes / total:9.0f} verificações/s  "
+                  f"p50={percentil(latencias, 0.5):7.3f}ms  p99={percentil(latencias, 0.99):7.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
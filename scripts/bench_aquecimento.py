@@ -0,0 +1,94 @@
+"""
+Benchmark da primeira requisição num worker novo do Gunicorn, com e sem o
+aquecimento de aquecimento.py (AQUECIMENTO=1/0). Sobe o Gunicorn de verdade
+(gunicorn.conf.py, 1 worker), espera o worker subir e mede as primeiras
+requisições a / e /api/presentes contra as seguintes, já quentes.
+Usage: python scripts/bench_aquecimento.py [--rodadas 5] [--espera 3]
+Usa um SQLite temporário; não toca no banco configurado.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROTAS = ('/', '/api/presentes')
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def esperar_porta(porta, limite=30):
+    fim = time.time() + limite
+    while time.time() < fim:
+        try:
+            socket.create_connection(('127.0.0.1', porta), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError('Gunicorn não subiu')
+
+
+def rodada(env, espera):
+    """Latências (ms) da 1ª requisição de cada rota e a mediana das 20 seguintes"""
+    porta = porta_livre()
+    env = dict(env, PORT=str(porta))
+    processo = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--workers', '1', 'app:app'],
+        cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        esperar_porta(porta)
+        time.sleep(espera)  # o worker já subiu e (com AQUECIMENTO=1) já aqueceu
+        sessao = requests.Session()
+        resultado = {}
+        for rota in ROTAS:
+            t0 = time.perf_counter()
+            sessao.get(f'http://127.0.0.1:{porta}{rota}', timeout=30).raise_for_status()
+            primeira = (time.perf_counter() - t0) * 1000
+            seguintes = []
+            for _ in range(20):
+                t0 = time.perf_counter()
+                sessao.get(f'http://127.0.0.1:{porta}{rota}', timeout=30)
+                seguintes.append((time.perf_counter() - t0) * 1000)
+            resultado[rota] = (primeira, statistics.median(seguintes))
+        return resultado
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rodadas', type=int, default=5)
+    parser.add_argument('--espera', type=float, default=3.0, help='segundos entre o bind e a 1ª requisição')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(pasta, 'bench.db')}",
+               RATE_LIMIT_APP='1000000/hour')
+    subprocess.run([sys.executable, '-c', 'from app import app\nfrom init_db import init_sample_data\n'
+                    'with app.app_context(): init_sample_data()'],
+                   cwd=RAIZ, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    print(f"📦 {args.rodadas} subidas do Gunicorn por modo (1 worker)")
+    for nome, valor in (('sem aquecimento', '0'), ('com aquecimento', '1')):
+        rodadas = [rodada(dict(env, AQUECIMENTO=valor), args.espera) for _ in range(args.rodadas)]
+        for rota in ROTAS:
+            primeiras = [r[rota][0] for r in rodadas]
+            quentes = [r[rota][1] for r in rodadas]
+            print(f"⏱️  {nome:16s} {rota:15s}: 1ª requisição mediana {statistics.median(primeiras):7.1f}ms "
+                  f"(máx {max(primeiras):7.1f}ms), já quente {statistics.median(quentes):6.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark da busca textual (/api/presentes/search) com 10k e 100k presentes,
+comparada a uma varredura LIKE '%termo%'.
+Usage: python scripts/bench_busca.py [--tamanhos 10000 100000] [--consultas 300]
+Usa um SQLite temporário; não toca no banco configurado.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Vocabulário sintético com acentos (~4 mil palavras), para termos com seletividade realista
+SILABAS = ['ca', 'ção', 'pa', 'ci', 'ên', 'no', 'va', 'mé', 'lu', 'ma', 'rá', 'té', 'bu', 'quê',
+           'so', 'fá', 'pã', 'lo', 'ri', 'gê', 'da', 'zê', 'mú', 'si']
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def rodar(tamanho, consultas):
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+    os.environ['RATE_LIMIT_APP'] = '1000000/hour'
+
+    # Cada tamanho roda num processo novo (Config lê o ambiente na importação).
+    # O índice vem da migração 010, depois de o app criar as tabelas; init_busca de novo para enxergá-lo
+    from app import app
+    from services.busca_service import init_busca
+    subprocess.run([sys.executable, os.path.join(RAIZ, 'migrations', '010_indice_busca.py')],
+                   check=True, capture_output=True)
+    init_busca(app)
+    from database import db
+    from models.lista import LISTA_PADRAO_ID
+    from models.presente import Presente
+    from services.catalogo_service import sincronizar_catalogo
+
+    random.seed(tamanho)
+    palavras = sorted({''.join(random.choices(SILABAS, k=3)) for _ in range(5000)})
+    catalogo = [
+        {'nome': f"{' '.join(random.sample(palavras, 3))} {i}",
+         'descricao': ' '.join(random.sample(palavras, 6)),
+         'valor_total': random.randint(10, 1000)}
+        for i in range(tamanho)
+    ]
+    inicio = time.perf_counter()
+    with app.app_context():
+        sincronizar_catalogo(catalogo)
+    print(f"📦 {tamanho} presentes indexados em {time.perf_counter() - inicio:.1f}s")
+
+    client = app.test_client()
+    # Consultas digitadas sem acento, como faz a maioria dos convidados
+    sem_acento = str.maketrans('çãáéêúç', 'caaeeuc')
+    termos = [random.choice(palavras).translate(sem_acento) for _ in range(consultas)]
+
+    latencias = []
+    for termo in termos:
+        t0 = time.perf_counter()
+        resposta = client.get(f'/api/presentes/search?q={termo}&limit=20')
+        latencias.append((time.perf_counter() - t0) * 1000)
+        assert resposta.status_code == 200, termo
+
+    # Referência: LIKE '%termo%' varre a tabela (e, sem acento, não encontra as palavras acentuadas)
+    varredura, encontrados_like = [], 0
+    with app.app_context():
+        for termo in termos[:50]:
+            t0 = time.perf_counter()
+            encontrados_like += bool(db.session.query(Presente.id).filter(
+                Presente.lista_id == LISTA_PADRAO_ID,
+                db.or_(Presente.nome.like(f'%{termo}%'), Presente.descricao.like(f'%{termo}%'))
+            ).limit(20).all())
+            varredura.append((time.perf_counter() - t0) * 1000)
+
+    print(f"⏱️  FTS  ({tamanho}): p50={percentil(latencias, 0.5):.2f}ms p95={percentil(latencias, 0.95):.2f}ms "
+          f"(HTTP completo)")
+    print(f"⏱️  LIKE ({tamanho}): p50={percentil(varredura, 0.5):.2f}ms p95={percentil(varredura, 0.95):.2f}ms "
+          f"(só a query; achou resultado em {encontrados_like}/50 consultas)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--consultas', type=int, default=300)
+    parser.add_argument('--tamanho', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.tamanho:
+        rodar(args.tamanho, args.consultas)
+        return
+    import subprocess
+    for tamanho in args.tamanhos:
+        subprocess.run([sys.executable, __file__, '--tamanho', str(tamanho), '--consultas', str(args.consultas)],
+                       check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark do cliente HTTP do Mercado Pago contra o stub local: uma conexão
+nova por chamada (requests.get, como antes) contra a sessão compartilhada do
+processo (keep-alive), e o cache curto das consultas por id numa rajada de
+webhooks (cada pagamento consultado 3 vezes dentro do TTL).
+O stub é HTTP puro: em produção cada conexão nova ainda paga o handshake TLS.
+Usage: python scripts/bench_cliente_mercadopago.py [--consultas 2000] [--threads 4] [--latencia-ms 2]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PORTA = 8098
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--consultas', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--latencia-ms', type=float, default=2)
+    args = parser.parse_args()
+
+    os.environ['MERCADOPAGO_API_URL'] = f'http://127.0.0.1:{PORTA}'
+    import requests
+    from mercadopago_stub import criar_servidor
+    from metrics import metrics
+    from services.mercado_pago_service import MercadoPagoService, estatisticas_pool
+
+    servidor, estado = criar_servidor(PORTA, args.latencia_ms)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    servico = MercadoPagoService()
+
+    def sem_pool(payment_id):
+        return requests.get(f'http://127.0.0.1:{PORTA}/v1/payments/{payment_id}', timeout=(3.05, 10)).json()
+
+    def com_pool(payment_id):
+        return servico.consultar_pagamento(payment_id, cache=False)
+
+    def com_cache(payment_id):
+        return servico.consultar_pagamento(payment_id)
+
+    # Rajadas de webhooks: cada pagamento volta a ser consultado 3 vezes dentro do TTL
+    ids_unicos = [str(1 + i) for i in range(args.consultas)]
+    ids_rajada = [str(1 + i % (args.consultas // 3)) for i in range(args.consultas)]
+
+    print(f"📦 {args.consultas} consultas, {args.threads} threads, stub com {args.latencia_ms:.0f}ms de latência")
+    for nome, funcao, ids in (('conexão nova por chamada', sem_pool, ids_unicos),
+                              ('sessão compartilhada', com_pool, ids_unicos),
+                              ('sessão + cache (rajada)', com_cache, ids_rajada)):
+        conexoes, requisicoes = estado.conexoes, estado.requisicoes
+        latencias = []
+
+        def medir(payment_id):
+            t0 = time.perf_counter()
+            funcao(payment_id)
+            latencias.append((time.perf_counter() - t0) * 1000)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(medir, ids))
+        total = time.perf_counter() - inicio
+        print(f"⏱️  {nome:26s}: {len(ids) / total:7.0f} consultas/s  p50={percentil(latencias, 0.5):6.2f}ms  "
+              f"p99={percentil(latencias, 0.99):6.2f}ms  {estado.requisicoes - requisicoes:5d} requisições e "
+              f"{estado.conexoes - conexoes:5d} conexões TCP no stub")
+
+    estatisticas = estatisticas_pool()
+    latencia = metrics.snapshot()['duracoes']['mercadopago.latencia_ms']
+    print(f"📊 pool: reuso {estatisticas['reuso']:.1%} ({estatisticas['conexoes_abertas']} conexões para "
+          f"{estatisticas['requisicoes']} requisições), cache {estatisticas['cache']['hits']} hits / "
+          f"{estatisticas['cache']['misses']} misses, latência média {latencia['media']:.2f}ms (máx {latencia['max']:.1f}ms)")
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
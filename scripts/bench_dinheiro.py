@@ -0,0 +1,99 @@
+"""
+Benchmark de dinheiro em Numeric(10,2)/Decimal (como antes) contra centavos
+inteiros (dinheiro.py), nos caminhos quentes:
+  - agregação: SUM agrupado por presente no SQLite e a soma incremental em
+    Python (como os agregados do painel e a reconciliação)
+  - serialização: linhas -> dicts -> JSON (to_dict, /api/presentes)
+  - deriva: valor_arrecadado acumulado em float, como a rota fazia
+Usage: python scripts/bench_dinheiro.py [--linhas 200000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from sqlalchemy import Column, Integer, MetaData, Numeric, Table, create_engine, func, select  # noqa: E402
+from dinheiro import Centavos, em_reais  # noqa: E402
+
+
+def medir(funcao, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, default=200000)
+    parser.add_argument('--presentes', type=int, default=100)
+    args = parser.parse_args()
+
+    centavos = [random.randint(500, 50000) for _ in range(args.linhas)]
+    presentes = [random.randint(1, args.presentes) for _ in range(args.linhas)]
+
+    engine = create_engine('sqlite://')
+    metadata = MetaData()
+    decimal = Table('decimal', metadata, Column('presente_id', Integer), Column('valor', Numeric(10, 2)))
+    inteiro = Table('centavos', metadata, Column('presente_id', Integer), Column('valor', Centavos))
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(decimal.insert(), [{'presente_id': p, 'valor': Decimal(c) / 100} for p, c in zip(presentes, centavos)])
+        conn.execute(inteiro.insert(), [{'presente_id': p, 'valor': c} for p, c in zip(presentes, centavos)])
+
+    print(f"📦 {args.linhas} contribuições em {args.presentes} presentes")
+    with engine.connect() as conn:
+        linhas = {nome: conn.execute(select(tabela.c.presente_id, tabela.c.valor)).all()
+                  for nome, tabela in (('Decimal', decimal), ('centavos', inteiro))}
+
+        for nome, tabela in (('Decimal', decimal), ('centavos', inteiro)):
+            consulta = select(tabela.c.presente_id, func.sum(tabela.c.valor)).group_by(tabela.c.presente_id)
+            ms, _ = medir(lambda: conn.execute(consulta).all())
+            print(f"⏱️  SUM agrupado no SQL   {nome:9s}: {ms:8.1f}ms")
+
+    def somar_decimal():
+        totais = {}
+        for presente_id, valor in linhas['Decimal']:
+            totais[presente_id] = totais.get(presente_id, Decimal('0')) + Decimal(str(valor))
+        return totais
+
+    def somar_centavos():
+        totais = {}
+        for presente_id, valor in linhas['centavos']:
+            totais[presente_id] = totais.get(presente_id, 0) + valor
+        return totais
+
+    for nome, funcao in (('Decimal', somar_decimal), ('centavos', somar_centavos)):
+        ms, totais = medir(funcao)
+        print(f"⏱️  soma em Python         {nome:9s}: {ms:8.1f}ms")
+
+    def serializar_decimal():
+        return json.dumps([{'presente_id': p, 'valor': float(v)} for p, v in linhas['Decimal']])
+
+    def serializar_centavos():
+        return json.dumps([{'presente_id': p, 'valor': em_reais(v)} for p, v in linhas['centavos']])
+
+    ms_decimal, json_decimal = medir(serializar_decimal)
+    ms_centavos, json_centavos = medir(serializar_centavos)
+    print(f"⏱️  dicts + JSON           Decimal  : {ms_decimal:8.1f}ms")
+    print(f"⏱️  dicts + JSON           centavos : {ms_centavos:8.1f}ms  (mesmo JSON: {json_decimal == json_centavos})")
+
+    # Deriva: valor_arrecadado += float(valor), como a rota fazia a cada contribuição
+    arrecadado_float = 0.0
+    for c in centavos:
+        arrecadado_float += float(Decimal(c) / 100)
+    esperado = sum(centavos)
+    print(f"💰 valor_arrecadado exato {esperado / 100:.2f}; acumulado em float {arrecadado_float!r} "
+          f"(erro de {abs(arrecadado_float * 100 - esperado):.6f} centavos); em centavos: {esperado}")
+
+
+if __name__ == '__main__':
+    main()
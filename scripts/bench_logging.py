@@ -0,0 +1,107 @@
+"""
+Benchmark do custo de log por requisição na thread da requisição: pipeline
+síncrono antigo (structlog renderizando JSON e escrevendo direto no arquivo)
+contra a fila (logs.py), com e sem amostragem.
+Cada requisição simulada emite request_started, contribution_request_received
+e request_finished, como um POST /api/contribuir em produção. O laço não
+tem pausas de I/O, então é o pior caso para a disputa do GIL com o listener;
+com mais requisições do que o listener consegue escrever, a fila enche e os
+excedentes são descartados (e contados em logs.descartados).
+Usage: python scripts/bench_logging.py [--requisicoes 5000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+CORPO = {
+    'presente_id': 3, 'nome': 'Maria da Silva', 'email': 'maria@example.com', 'valor': '150,00',
+    'cpf': '529.982.247-25', 'telefone': '(83) 99999-0000', 'mensagem': 'Felicidades ao casal! ' * 20
+}
+
+
+def requisicao(logger, detalhado):
+    logger.info("request_started", path='/api/contribuir', method='POST', remote_addr='203.0.113.7')
+    if detalhado:
+        # Comportamento antigo: o corpo inteiro no log
+        logger.info("contribution_request_received", data=CORPO)
+    else:
+        logger.info("contribution_request_received", presente_id=3, valor='150,00', campos=sorted(CORPO))
+    logger.info("request_finished", path='/api/contribuir', method='POST', status=200)
+
+
+def rodar(modo, requisicoes):
+    arquivo = os.path.join(tempfile.mkdtemp(), 'bench.log')
+    import structlog
+
+    if modo == 'sincrono':
+        saida = open(arquivo, 'w')
+        structlog.configure(
+            processors=[structlog.processors.add_log_level, structlog.processors.TimeStamper(fmt='iso'),
+                        structlog.processors.JSONRenderer()],
+            logger_factory=structlog.PrintLoggerFactory(saida),
+            cache_logger_on_first_use=True,
+        )
+    else:
+        os.environ['LOG_SAMPLE_RATES'] = 'request_started=0,request_finished=0.1' if modo == 'amostrado' else ''
+        from config import Config
+        Config.LOGGING_CONFIG = {
+            'version': 1,
+            'disable_existing_loggers': False,
+            'formatters': {'json': {'()': 'logs.criar_formatador', 'formato': 'json'}},
+            'handlers': {'arquivo': {'class': 'logging.FileHandler', 'filename': arquivo, 'formatter': 'json'}},
+            'root': {'level': 'INFO', 'handlers': ['arquivo']},
+        }
+        from logs import configurar_logging, parar_logging
+        configurar_logging()
+
+    logger = structlog.get_logger()
+    for _ in range(200):  # aquecimento
+        requisicao(logger, modo == 'sincrono')
+
+    latencias = []
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        t0 = time.perf_counter()
+        requisicao(logger, modo == 'sincrono')
+        latencias.append((time.perf_counter() - t0) * 1e6)
+    total = time.perf_counter() - inicio
+
+    drenagem, descartados = 0.0, 0
+    if modo != 'sincrono':
+        from metrics import metrics
+        descartados = int(metrics.snapshot()['contadores'].get('logs.descartados', 0))
+        t0 = time.perf_counter()
+        parar_logging()
+        drenagem = time.perf_counter() - t0
+
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2]
+    p99 = latencias[int(len(latencias) * 0.99)]
+    print(f"⏱️  {modo:10s}: {total / requisicoes * 1e6:7.1f}µs/req  p50={p50:6.1f}µs  p99={p99:7.1f}µs  "
+          f"(listener ainda escrevia por {drenagem * 1000:.0f}ms; {os.path.getsize(arquivo) // 1024}KB escritos; "
+          f"{descartados} descartados com a fila cheia)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requisicoes', type=int, default=5000)
+    parser.add_argument('--modo', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        rodar(args.modo, args.requisicoes)
+        return
+    # Cada modo num processo novo (a configuração do structlog e do logging é global)
+    for modo in ('sincrono', 'fila', 'amostrado'):
+        subprocess.run([sys.executable, __file__, '--modo', modo, '--requisicoes', str(args.requisicoes)],
+                       check=True)
+
+
+if __name__ == '__main__':
+    main()
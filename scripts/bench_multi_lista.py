@@ -0,0 +1,80 @@
+"""
+Benchmark do modo multi-lista: isolamento e latência com 1.000 listas.
+Usage: python scripts/bench_multi_lista.py [--listas 1000] [--presentes 20] [--requisicoes 2000]
+Usa um SQLite temporário; não toca no banco configurado.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--listas', type=int, default=1000)
+    parser.add_argument('--presentes', type=int, default=20)
+    parser.add_argument('--requisicoes', type=int, default=2000)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+    os.environ['MULTI_LISTA'] = '1'
+    os.environ['RATE_LIMIT_APP'] = '1000000/hour'
+
+    from app import app
+    from database import db
+    from models.lista import Lista
+    from services.catalogo_service import sincronizar_catalogo
+
+    inicio = time.perf_counter()
+    with app.app_context():
+        listas = [
+            Lista(slug=f'casal-{i}', noivo_nome=f'Casal {i}', data_casamento='1 de Janeiro', chave_pix=f'pix-{i}')
+            for i in range(args.listas)
+        ]
+        db.session.add_all(listas)
+        db.session.commit()
+        for lista in listas:
+            sincronizar_catalogo(
+                [{'nome': f'{lista.slug} presente {j}', 'valor_total': 10 + j} for j in range(args.presentes)],
+                lista_id=lista.id
+            )
+        slugs = [lista.slug for lista in listas]
+    print(f"📦 {args.listas} listas x {args.presentes} presentes criados em {time.perf_counter() - inicio:.1f}s")
+
+    client = app.test_client()
+    latencias_api, latencias_pagina, violacoes = [], [], 0
+    for _ in range(args.requisicoes):
+        slug = random.choice(slugs)
+
+        t0 = time.perf_counter()
+        resposta = client.get(f'/l/{slug}/api/presentes?fields=id,nome&limit=50')
+        latencias_api.append((time.perf_counter() - t0) * 1000)
+        nomes = [p['nome'] for p in resposta.get_json()['presentes']]
+        if len(nomes) != args.presentes or any(not n.startswith(f'{slug} ') for n in nomes):
+            violacoes += 1
+
+        t0 = time.perf_counter()
+        pagina = client.get(f'/l/{slug}/')
+        latencias_pagina.append((time.perf_counter() - t0) * 1000)
+        if f'pix-{slug.split("-")[1]}'.encode() not in pagina.data:
+            violacoes += 1
+
+    for nome, valores in (('/l/<slug>/api/presentes', latencias_api), ('/l/<slug>/', latencias_pagina)):
+        print(f"⏱️  {nome}: p50={percentil(valores, 0.5):.2f}ms p95={percentil(valores, 0.95):.2f}ms "
+              f"p99={percentil(valores, 0.99):.2f}ms")
+    print(f"{'✅' if violacoes == 0 else '❌'} Violações de isolamento: {violacoes}")
+    print(f"🔎 Lista desconhecida: HTTP {client.get('/l/nao-existe/').status_code}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark do QR Code do PIX por requisição: desenhar a cada pedido contra o
+LRU de services/pix_service.py. Cada contribuição pede a imagem algumas vezes
+(modal aberto, reaberto, página recarregada), como no uso real.
+Usage: python scripts/bench_pix.py [--contribuicoes 200] [--pedidos-por-contribuicao 4] [--formato svg|png]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from services import pix_service  # noqa: E402
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--contribuicoes', type=int, default=200)
+    parser.add_argument('--pedidos-por-contribuicao', type=int, default=4)
+    parser.add_argument('--formato', choices=('svg', 'png'), default='svg')
+    args = parser.parse_args()
+
+    if args.formato not in pix_service.formatos_qr():
+        sys.exit(f"❌ Formato {args.formato} indisponível (instale qrcode e Pillow)")
+
+    contribuicoes = [(random.randint(500, 50000), str(i + 1)) for i in range(args.contribuicoes)]
+    pedidos = contribuicoes * args.pedidos_por_contribuicao
+    random.shuffle(pedidos)
+
+    inicio = time.perf_counter()
+    for valor, txid in contribuicoes:
+        pix_service.gerar_payload('83991314075', valor, txid, 'Junior & Karol', 'Joao Pessoa', 'telefone')
+    payload_us = (time.perf_counter() - inicio) / len(contribuicoes) * 1e6
+    print(f"📦 {len(pedidos)} pedidos de QR ({args.formato}) para {args.contribuicoes} contribuições")
+    print(f"⏱️  só o payload copia e cola: {payload_us:.1f}µs")
+
+    for nome, usar_cache in (('sem cache', False), ('com cache LRU', True)):
+        pix_service._imagens.clear()
+        latencias = []
+        inicio = time.perf_counter()
+        for valor, txid in pedidos:
+            t0 = time.perf_counter()
+            payload = pix_service.gerar_payload('83991314075', valor, txid, 'Junior & Karol', 'Joao Pessoa', 'telefone')
+            pix_service.renderizar_qr(payload, args.formato, usar_cache=usar_cache)
+            latencias.append((time.perf_counter() - t0) * 1000)
+        total = time.perf_counter() - inicio
+        print(f"⏱️  {nome:14s}: {len(pedidos) / total:8.0f} QR/s  "
+              f"p50={percentil(latencias, 0.5):7.3f}ms  p99={percentil(latencias, 0.99):7.3f}ms")
+    print(f"📊 cache: {pix_service._imagens.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark do caminho de leitura do catálogo com 10k presentes: objetos do ORM
+(Presente.query ... .all() + to_dict) contra os modelos de leitura
+(presentes_ativos: SELECT do Core com progresso calculado no SQL).
+Usage: python scripts/bench_read_models.py [--presentes 10000] [--repeticoes 20]
+Usa um SQLite temporário; não toca no banco configurado.
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def medir(app, db, carregar, repeticoes):
+    """(mediana em ms, memória retida em KB, pico em KB) de carregar() numa sessão nova"""
+    tempos = []
+    with app.app_context():
+        for _ in range(repeticoes):
+            db.session.remove()
+            gc.collect()
+            t0 = time.perf_counter()
+            carregar()
+            tempos.append((time.perf_counter() - t0) * 1000)
+
+        db.session.remove()
+        gc.collect()
+        tracemalloc.start()
+        resultado = carregar()
+        retido, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del resultado
+    return statistics.median(tempos), retido / 1024, pico / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--presentes', type=int, default=10000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+
+    from app import app
+    from database import db
+    from models.lista import LISTA_PADRAO_ID
+    from models.presente import Presente
+    from services.catalogo_service import presentes_ativos, sincronizar_catalogo
+
+    with app.app_context():
+        sincronizar_catalogo([
+            {'nome': f'Presente {i}', 'descricao': f'Descrição do presente {i}', 'valor_total': 50 + i % 950}
+            for i in range(args.presentes)
+        ])
+        db.session.execute(db.update(Presente).values(valor_arrecadado_centavos=Presente.valor_total_centavos // 3))
+        db.session.commit()
+
+    def orm():
+        return Presente.query.filter_by(lista_id=LISTA_PADRAO_ID, ativo=True).all()
+
+    def orm_dict():
+        return [p.to_dict() for p in orm()]
+
+    def leitura():
+        return presentes_ativos(LISTA_PADRAO_ID)
+
+    def leitura_dict():
+        return [p.to_dict() for p in leitura()]
+
+    print(f"📦 {args.presentes} presentes; mediana de {args.repeticoes} execuções, sessão nova a cada uma")
+    for nome, funcao in (('ORM .all()', orm), ('leitura', leitura),
+                         ('ORM .all() + to_dict', orm_dict), ('leitura + to_dict', leitura_dict)):
+        mediana, retido, pico = medir(app, db, funcao, args.repeticoes)
+        print(f"⏱️  {nome:22s} {mediana:8.2f}ms   memória retida {retido:8.0f}KB   pico {pico:8.0f}KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark da reconciliação de pendentes contra o stub local do Mercado Pago:
+vazão (contribuições/s) e tempo por lote para vários tamanhos de lote.
+Metade das pendentes tem payment_id (GET /v1/payments/<id>), metade não
+(busca por external_reference).
+Usage: python scripts/bench_reconciliacao.py [--pendentes 3000] [--lotes 10,50,200,1000] [--threads 8] [--latencia-ms 20] [--taxa 0]
+Usa um SQLite temporário; não toca no banco configurado.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PORTA = 8099
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pendentes', type=int, default=3000)
+    parser.add_argument('--lotes', default='10,50,200,1000')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latencia-ms', type=float, default=20)
+    parser.add_argument('--taxa', type=float, default=0, help='orçamento de consultas/s (0 = sem limite)')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+    os.environ['MERCADOPAGO_API_URL'] = f'http://127.0.0.1:{PORTA}'
+
+    from mercadopago_stub import criar_servidor
+    from app import app
+    from database import db
+    from models.contribuicao import Contribuicao
+    from models.presente import Presente
+    from services.agregados_service import STATUS_CONFIRMADOS
+    from services.catalogo_service import sincronizar_catalogo
+    from services.reconciliacao_service import LimiteTaxa, reconciliar
+
+    servidor, estado = criar_servidor(PORTA, args.latencia_ms)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    antigo = datetime.utcnow() - timedelta(days=1)
+    with app.app_context():
+        sincronizar_catalogo([{'nome': f'Presente {i}', 'valor_total': 10**7} for i in range(50)])
+        db.session.execute(db.insert(Contribuicao), [
+            {'presente_id': 1 + i % 50, 'nome_contribuinte': 'Bench', 'email_contribuinte': 'bench@example.com',
+             'valor_centavos': 10000, 'status': 'pendente', 'metodo_pagamento': 'cartao', 'created_at': antigo}
+            for i in range(args.pendentes)
+        ])
+        db.session.commit()
+
+    print(f"📦 {args.pendentes} pendentes, {args.threads} threads, stub com {args.latencia_ms:.0f}ms de latência, "
+          f"orçamento {args.taxa or 'ilimitado'} consultas/s")
+    for lote in (int(x) for x in args.lotes.split(',')):
+        with app.app_context():
+            # Estado inicial: tudo pendente, metade com payment_id (ids terminados em 0 dão 404 no stub)
+            db.session.execute(db.update(Contribuicao).values(
+                status='pendente',
+                payment_id=db.case((Contribuicao.id % 2 == 0, db.cast(Contribuicao.id + 1000, db.String)), else_=None)
+            ))
+            db.session.execute(db.update(Presente).values(valor_arrecadado_centavos=0))
+            db.session.execute(db.text('DELETE FROM agregados_contribuicoes'))
+            db.session.commit()
+
+            requisicoes = estado.requisicoes
+            relatorio = reconciliar(lote=lote, threads=args.threads, idade_minima=0, limite=LimiteTaxa(args.taxa))
+
+            arrecadado = db.session.execute(db.select(db.func.sum(Presente.valor_arrecadado_centavos))).scalar() or 0
+            aprovado = db.session.execute(
+                db.select(db.func.sum(Contribuicao.valor_centavos)).where(Contribuicao.status.in_(STATUS_CONFIRMADOS))
+            ).scalar() or 0
+
+        ms = relatorio['ms_por_lote']
+        print(f"⏱️  lote {lote:5d}: {relatorio['consultadas'] / relatorio['segundos']:7.0f} contribuições/s  "
+              f"{sum(ms) / len(ms):8.1f}ms por lote ({len(ms)} lotes)  "
+              f"{estado.requisicoes - requisicoes} consultas ao stub  "
+              f"{relatorio['atualizadas']} atualizadas, {relatorio['sem_pagamento']} sem pagamento, "
+              f"{relatorio['erros']} erros  {'✅' if arrecadado == aprovado else '❌'} valor_arrecadado")
+
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
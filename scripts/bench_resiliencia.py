@@ -0,0 +1,134 @@
+"""
+Injeção de falha no Mercado Pago: quanto o app continua servindo com a API
+fora. Cada modo roda num processo com o app em modo produção e 2 threads
+(como um worker gthread), numa mistura de 1 /healthz (que consulta o Mercado
+Pago) para 4 GET /api/presentes/<id>, contra o stub local:
+  saudável              stub respondendo em 2ms
+  fora, sem disjuntor   stub pendurado (ou 503), DISJUNTOR_FALHAS=0
+  fora, com disjuntor   stub pendurado (ou 503), disjuntor padrão
+No modo com disjuntor, também enfileira consultas adiadas durante a queda e
+mede quanto tempo a fila leva para esvaziar depois que a API volta.
+Usage: python scripts/bench_resiliencia.py [--segundos 10] [--threads 2] [--falha lenta|503]
+Usa um SQLite temporário; não toca no banco configurado.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PORTA = 8097
+PRESENTES = 100
+ADIADAS = 50
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else 0
+
+
+def rodar_modo(modo, args, resultados):
+    # Prints e logs do processo filho vão para o nada (os handlers guardam a referência do stream)
+    sys.stdout = sys.stderr = open(os.devnull, 'w')
+    pasta = tempfile.mkdtemp()
+    os.chdir(pasta)  # app.log do processo fica na pasta temporária
+    os.environ.update({
+        'FLASK_ENV': 'production', 'SECRET_KEY': 'bench', 'MERCADOPAGO_ACCESS_TOKEN': 'bench',
+        'MERCADOPAGO_WEBHOOK_SECRET': 'bench', 'MERCADOPAGO_WEBHOOK_URL': 'http://localhost/webhook',
+        'DATABASE_URL': f"sqlite:///{os.path.join(pasta, 'bench.db')}",
+        'RATE_LIMIT_APP': '100000000/hour',
+        'MERCADOPAGO_API_URL': f'http://127.0.0.1:{PORTA}',
+        'MERCADOPAGO_READ_TIMEOUT': '2',
+        'DISJUNTOR_FALHAS': '0' if modo == 'fora, sem disjuntor' else '5',
+        'DISJUNTOR_ABERTO_SEGUNDOS': '2',
+    })
+    from mercadopago_stub import criar_servidor
+    from app import app
+    from services.catalogo_service import sincronizar_catalogo
+    from services.mercado_pago_service import MercadoPagoService
+    from services.resiliencia import adiar, fila_retentativas
+    from metrics import metrics
+
+    with app.app_context():
+        sincronizar_catalogo([{'nome': f'Presente {i}', 'valor_total': 10**6} for i in range(PRESENTES)])
+
+    servidor, estado = criar_servidor(PORTA, 2)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    if modo != 'saudável':
+        if args.falha == 'lenta':
+            estado.latencia = 30  # bem acima do timeout de leitura
+        else:
+            estado.falha = 503
+
+    latencias = {'catalogo': [], 'healthz': []}
+    fim = time.monotonic() + args.segundos
+
+    def trabalhador():
+        client = app.test_client()
+        contador = 0
+        while time.monotonic() < fim:
+            contador += 1
+            tipo = 'healthz' if contador % 5 == 0 else 'catalogo'
+            t0 = time.perf_counter()
+            resposta = client.get('/healthz' if tipo == 'healthz' else f'/api/presentes/{random.randint(1, PRESENTES)}')
+            resposta.close()
+            latencias[tipo].append((time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=trabalhador) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    chamadas = estado.requisicoes
+    recuperacao = None
+    if modo == 'fora, com disjuntor':
+        servico = MercadoPagoService()
+        with app.app_context():
+            for i in range(ADIADAS):
+                adiar(servico.consultar_pagamento, str(1001 + i), cache=False, base=0.5, teto=5)
+        time.sleep(1)
+        estado.latencia, estado.falha = 0.002, 0  # API volta
+        volta = time.monotonic()
+        while len(fila_retentativas) and time.monotonic() - volta < 30:
+            time.sleep(0.05)
+        recuperacao = (time.monotonic() - volta, metrics.snapshot()['contadores'].get('retry.adiadas_concluidas', 0))
+
+    resultados.put((modo, latencias, chamadas, recuperacao))
+    servidor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--segundos', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=2)
+    parser.add_argument('--falha', choices=('lenta', '503'), default='lenta')
+    args = parser.parse_args()
+
+    print(f"📦 {args.threads} threads por {args.segundos}s, 1 /healthz para 4 leituras do catálogo; "
+          f"falha injetada: {'API pendurada (timeout de leitura 2s)' if args.falha == 'lenta' else 'HTTP 503'}")
+    contexto = multiprocessing.get_context('spawn')
+    for modo in ('saudável', 'fora, sem disjuntor', 'fora, com disjuntor'):
+        resultados = contexto.Queue()
+        processo = contexto.Process(target=rodar_modo, args=(modo, args, resultados))
+        processo.start()
+        modo, latencias, chamadas, recuperacao = resultados.get()
+        processo.join()
+
+        catalogo, healthz = latencias['catalogo'], latencias['healthz']
+        print(f"⏱️  {modo:20s}: catálogo {len(catalogo) / args.segundos:7.1f} req/s (p99 {percentil(catalogo, 0.99):7.1f}ms)  "
+              f"healthz {len(healthz):4d} (p50 {percentil(healthz, 0.5):7.1f}ms)  {chamadas:4d} chamadas ao provedor")
+        if recuperacao:
+            segundos, concluidas = recuperacao
+            print(f"🔁 {ADIADAS} consultas adiadas durante a queda: {concluidas:.0f} concluídas {segundos:.1f}s depois da volta da API")
+
+
+if __name__ == '__main__':
+    main()
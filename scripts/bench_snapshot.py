@@ -0,0 +1,83 @@
+"""
+Benchmark da página pública (/) em requisições/s: Flask sem cache (cada
+requisição renderiza), Flask com o cache da view (como hoje) e o snapshot
+estático servido pelo SnapshotMiddleware (snapshot.py), chamando a pilha WSGI
+direto, sem servidor HTTP no meio.
+Usage: python scripts/bench_snapshot.py [--presentes 50] [--requisicoes 2000]
+Usa um SQLite e uma pasta de snapshots temporários; não toca no banco configurado.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--presentes', type=int, default=50)
+    parser.add_argument('--requisicoes', type=int, default=2000)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+    os.environ['RATE_LIMIT_APP'] = '1000000/hour'
+
+    from werkzeug.test import EnvironBuilder
+    from app import app
+    from config import Config
+    from security import cache
+    from services.catalogo_service import sincronizar_catalogo
+    from snapshot import SnapshotMiddleware, gerar_snapshot
+
+    with app.app_context():
+        sincronizar_catalogo([{'nome': f'Presente {i}', 'descricao': 'Bench', 'valor_total': 100 + i}
+                              for i in range(args.presentes)])
+    Config.SNAPSHOT_DIR = os.path.join(pasta, 'snapshots')
+    gerar_snapshot(app, forcar=True)
+
+    def limpar_cache():
+        with app.app_context():
+            cache.clear()
+
+    modos = (
+        ('Flask, sem cache', app.wsgi_app, limpar_cache),
+        ('Flask, cache da view', app.wsgi_app, None),
+        ('snapshot estático', SnapshotMiddleware(app.wsgi_app, Config.SNAPSHOT_DIR), None),
+    )
+    environ = EnvironBuilder(path='/', headers={'Accept-Encoding': 'gzip'}).get_environ()
+
+    def iniciar(status, headers, exc_info=None):
+        iniciar.status = status
+
+    print(f"📦 {args.presentes} presentes, {args.requisicoes} GET / por modo")
+    for nome, wsgi, antes in modos:
+        latencias = []
+        total = 0.0
+        bytes_resposta = 0
+        for _ in range(args.requisicoes):
+            if antes:
+                antes()
+            t0 = time.perf_counter()
+            resposta = wsgi(dict(environ), iniciar)
+            try:
+                bytes_resposta = sum(len(parte) for parte in resposta)
+            finally:
+                if hasattr(resposta, 'close'):
+                    resposta.close()
+            decorrido = time.perf_counter() - t0
+            total += decorrido
+            latencias.append(decorrido * 1000)
+        print(f"⏱️  {nome:22s}: {args.requisicoes / total:8.0f} req/s  p50={percentil(latencias, 0.5):7.3f}ms  "
+              f"p99={percentil(latencias, 0.99):7.3f}ms  ({iniciar.status}, {bytes_resposta} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark de escritores e leitores concorrentes no SQLite, como vários workers
+do gunicorn no mesmo arquivo: sem o perfil (journal de rollback, BEGIN
+deferido) contra o perfil de database.py (WAL, busy_timeout, BEGIN IMMEDIATE
+em /api/contribuir).
+Cada processo cria o app e faz requisições pelo test client: escritores em
+POST /api/contribuir, leitores em GET /api/presentes/<id>.
+Usage: python scripts/bench_sqlite_concorrencia.py [--escritores 4] [--leitores 4] [--segundos 10]
+Usa um SQLite temporário por modo; não toca no banco configurado.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+PRESENTES = 100
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else 0
+
+
+def preparar_ambiente(pasta, perfil):
+    # Prints e logs dos processos filhos vão para o nada (os handlers guardam a referência do stream)
+    sys.stdout = sys.stderr = open(os.devnull, 'w')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+    os.environ['SQLITE_PERFIL'] = '1' if perfil else '0'
+    os.environ['RATE_LIMIT_APP'] = '100000000/hour'
+    os.environ['ANTIABUSO_LIMITES'] = ''  # mesmo CPF em todas as requisições
+    os.chdir(pasta)  # app.log do processo fica na pasta temporária
+
+
+def trabalhador(papel, pasta, perfil, segundos, inicio, resultados):
+    preparar_ambiente(pasta, perfil)
+    from app import app
+    client = app.test_client()
+    inicio.wait()
+    latencias, erros = [], 0
+    fim = time.monotonic() + segundos
+    while time.monotonic() < fim:
+        presente_id = random.randint(1, PRESENTES)
+        t0 = time.perf_counter()
+        if papel == 'escritor':
+            resposta = client.post('/api/contribuir', json={
+                'presente_id': presente_id, 'nome': 'Bench', 'email': f'bench{random.randint(1, 10**6)}@example.com',
+                'valor': '1,00', 'cpf': '52998224725'
+            }, environ_base={'REMOTE_ADDR': f'10.0.{random.randint(0, 255)}.{random.randint(0, 255)}'})
+        else:
+            resposta = client.get(f'/api/presentes/{presente_id}')
+        resposta.close()
+        latencias.append((time.perf_counter() - t0) * 1000)
+        erros += resposta.status_code != 200
+    resultados.put((papel, latencias, erros))
+
+
+def rodar(modo, args):
+    pasta = tempfile.mkdtemp()
+    perfil = modo == 'perfil'
+    contexto = multiprocessing.get_context('spawn')
+
+    # Banco semeado num processo à parte (a configuração do app é lida na importação)
+    semeador = contexto.Process(target=semear, args=(pasta, perfil))
+    semeador.start()
+    semeador.join()
+
+    inicio, resultados = contexto.Event(), contexto.Queue()
+    processos = [
+        contexto.Process(target=trabalhador, args=(papel, pasta, perfil, args.segundos, inicio, resultados))
+        for papel in ['escritor'] * args.escritores + ['leitor'] * args.leitores
+    ]
+    for processo in processos:
+        processo.start()
+    time.sleep(3)  # importação do app em cada processo
+    inicio.set()
+    coletados = [resultados.get() for _ in processos]
+    for processo in processos:
+        processo.join()
+
+    for papel in ('escritor', 'leitor'):
+        latencias = [l for p, ls, _ in coletados if p == papel for l in ls]
+        erros = sum(e for p, _, e in coletados if p == papel)
+        print(f"⏱️  {modo:7s} {papel:9s}: {len(latencias) / args.segundos:7.1f} req/s  "
+              f"p50={percentil(latencias, 0.5):7.1f}ms  p99={percentil(latencias, 0.99):7.1f}ms  "
+              f"erros={erros} ({erros / max(len(latencias), 1):.1%})")
+
+    # A soma de valor_arrecadado tem de bater com a das contribuições gravadas (centavos)
+    conexao = sqlite3.connect(os.path.join(pasta, 'bench.db'))
+    arrecadado = conexao.execute('SELECT COALESCE(SUM(valor_arrecadado_centavos), 0) FROM presentes').fetchone()[0]
+    contribuido = conexao.execute('SELECT COALESCE(SUM(valor_centavos), 0) FROM contribuicoes').fetchone()[0]
+    conexao.close()
+    print(f"   {modo:7s} contribuições somam {contribuido / 100:.2f}, valor_arrecadado soma {arrecadado / 100:.2f} "
+          f"({(contribuido - arrecadado) / 100:.2f} perdidos)")
+
+
+def semear(pasta, perfil):
+    preparar_ambiente(pasta, perfil)
+    from app import app
+    from services.catalogo_service import sincronizar_catalogo
+    with app.app_context():
+        sincronizar_catalogo([{'nome': f'Presente {i}', 'valor_total': 10**6} for i in range(PRESENTES)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--escritores', type=int, default=4)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--segundos', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"📦 {args.escritores} escritores + {args.leitores} leitores por {args.segundos}s, um processo cada")
+    for modo in ('padrao', 'perfil'):
+        rodar(modo, args)
+
+
+if __name__ == '__main__':
+    main()
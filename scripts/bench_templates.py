@@ -0,0 +1,96 @@
+"""
+Benchmark dos templates Jinja: compilação de todos os templates num processo
+novo (como um worker depois do fork ou de um reinício) sem cache de bytecode,
+com o cache frio e com o cache preenchido (jinja_cache.py), e o tempo de
+render de cada página depois de compilada.
+Usage: python scripts/bench_templates.py [--processos 5] [--presentes 50] [--renders 500]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Roda num processo novo: subida da aplicação, compilação dos templates e 1º render da página
+FILHO = """
+import json, time
+inicio = time.perf_counter()
+from app import app
+from jinja_cache import precompilar
+subida = time.perf_counter()
+precompilar(app)
+compilacao = time.perf_counter()
+with app.test_request_context('/'):
+    from flask import render_template
+    render_template('index.html', presentes=[], noivo_nome='Bench', data_casamento='-', chave_pix='-')
+fim = time.perf_counter()
+print(json.dumps({'subida_ms': (subida - inicio) * 1000, 'compilacao_ms': (compilacao - subida) * 1000,
+                  'total_ms': (fim - inicio) * 1000}))
+"""
+
+
+def processo(env):
+    saida = subprocess.run([sys.executable, '-c', FILHO], cwd=RAIZ, env=env, check=True,
+                           capture_output=True, text=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processos', type=int, default=5)
+    parser.add_argument('--presentes', type=int, default=50)
+    parser.add_argument('--renders', type=int, default=500)
+    args = parser.parse_args()
+
+    env = dict(os.environ, DATABASE_URL='sqlite://', AQUECIMENTO='0', SNAPSHOT='0')
+    pasta = tempfile.mkdtemp()
+
+    print(f"📦 {args.processos} processos novos por modo")
+    modos = (
+        ('sem cache de bytecode', dict(env, JINJA_CACHE_DIR=''), None),
+        ('cache frio (1º worker)', dict(env, JINJA_CACHE_DIR=os.path.join(pasta, 'frio')), 'limpar'),
+        ('cache preenchido', dict(env, JINJA_CACHE_DIR=os.path.join(pasta, 'quente')), None),
+    )
+    processo(modos[2][1])  # preenche o cache, como o build faz
+    for nome, env_modo, limpar in modos:
+        resultados = []
+        for _ in range(args.processos):
+            if limpar:
+                shutil.rmtree(env_modo['JINJA_CACHE_DIR'], ignore_errors=True)
+            resultados.append(processo(env_modo))
+        compilacao = statistics.median(r['compilacao_ms'] for r in resultados)
+        total = statistics.median(r['total_ms'] for r in resultados)
+        print(f"⏱️  {nome:24s}: compilar templates {compilacao:7.1f}ms, subida + 1º render {total:7.1f}ms")
+
+    # Render já compilado (igual nos três modos): o custo que sobra por requisição
+    os.environ.update(env)
+    from flask import render_template
+    from app import app
+    from services.catalogo_service import PresenteLeitura
+
+    presentes = [PresenteLeitura(i, f'Presente {i}', 'Descrição do presente', 100.0 + i, 0.0, 0.0, False, None)
+                 for i in range(args.presentes)]
+    paginas = (
+        ('index.html', dict(presentes=presentes, noivo_nome='Bench', data_casamento='-', chave_pix='-')),
+        ('obrigado.html', {}),
+        ('erro.html', {}),
+    )
+    with app.test_request_context('/'):
+        for template, contexto in paginas:
+            render_template(template, **contexto)
+            inicio = time.perf_counter()
+            for _ in range(args.renders):
+                render_template(template, **contexto)
+            ms = (time.perf_counter() - inicio) / args.renders * 1000
+            print(f"⏱️  render {template:14s}: {ms:6.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
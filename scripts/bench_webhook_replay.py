@@ -0,0 +1,152 @@
+"""
+Benchmark de uma enxurrada de webhooks duplicados do Mercado Pago: cada
+entrega assinada passa pelo processamento (consulta ao provedor, no stub
+local, e busca da contribuição no banco) contra o antireplay.py na frente,
+que recusa as repetidas em O(1). O processamento é o que o handler de
+pagamento (desativado em routes/webhook.py) faz: consultar_pagamento +
+Contribuicao por payment_id + UPDATE, depois da mesma checagem de assinatura.
+Usage: python scripts/bench_webhook_replay.py [--eventos 50] [--repeticoes 40] [--latencia-ms 30]
+Usa um SQLite temporário e o stub na porta 8098; não toca no banco configurado.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PORTA = 8098
+SEGREDO = 'bench'
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--eventos', type=int, default=50)
+    parser.add_argument('--repeticoes', type=int, default=40, help='entregas de cada evento na enxurrada')
+    parser.add_argument('--latencia-ms', type=float, default=30, help='latência do stub do Mercado Pago')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    os.chdir(pasta)
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(pasta, 'bench.db')}",
+        'MERCADOPAGO_API_URL': f'http://127.0.0.1:{PORTA}',
+        'MERCADOPAGO_ACCESS_TOKEN': 'bench',
+    })
+    from flask import jsonify, request
+    from mercadopago_stub import criar_servidor
+    from antireplay import esquecer_evento, verificar_evento
+    from app import app
+    from database import db
+    from models.contribuicao import Contribuicao
+    from routes import webhook
+    from services.catalogo_service import sincronizar_catalogo
+    from services import mercado_pago_service
+    from services.mercado_pago_service import MercadoPagoService
+
+    logging.disable(logging.INFO)  # uma linha de log por entrega encobriria o resultado
+
+    servidor, estado = criar_servidor(PORTA, args.latencia_ms)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    with app.app_context():
+        sincronizar_catalogo([{'nome': 'Presente', 'valor_total': 10**6}])
+        db.session.execute(db.insert(Contribuicao), [
+            {'presente_id': 1, 'nome_contribuinte': 'Bench', 'email_contribuinte': f'bench{i}@example.com',
+             'valor_centavos': 1000, 'status': 'pendente', 'payment_id': str(1001 + i)}
+            for i in range(args.eventos)
+        ])
+        db.session.commit()
+
+    processados = {'total': 0}
+
+    def processar(data):
+        """Trabalho de uma entrega: provedor + banco (como handle_mercadopago_payment)"""
+        processados['total'] += 1
+        payment_id = data['data']['id']
+        pagamento = MercadoPagoService().consultar_pagamento(payment_id)['response']
+        contribuicao = Contribuicao.query.filter_by(payment_id=str(payment_id)).first()
+        if contribuicao and pagamento.get('status') and contribuicao.status != pagamento['status']:
+            contribuicao.status = pagamento['status']
+            db.session.commit()
+        return jsonify({'status': 'ok'}), 200
+
+    webhook.MERCADOPAGO_WEBHOOK_SECRET = SEGREDO
+
+    def entrega(evento_id, payment_id, criado_em):
+        corpo = json.dumps({'id': evento_id, 'type': 'payment', 'action': 'payment.updated',
+                            'date_created': criado_em.isoformat(), 'data': {'id': str(payment_id)}}).encode()
+        assinatura = hmac.new(SEGREDO.encode(), corpo, hashlib.sha256).hexdigest()
+        return corpo, {'X-Hub-Signature': f'sha256={assinatura}', 'Content-Type': 'application/json'}
+
+    agora = datetime.now(timezone.utc)
+    enxurrada = [entrega(f'evt-{i}', 1001 + i, agora) for i in range(args.eventos)] * args.repeticoes
+    random.shuffle(enxurrada)
+
+    def sem_protecao(corpo):
+        data = json.loads(corpo)
+        if not webhook.verify_mercadopago_webhook_signature(corpo, data):
+            return jsonify({'status': 'invalid signature'}), 403
+        return processar(data)
+
+    def com_antireplay(corpo):
+        data = json.loads(corpo)
+        if not webhook.verify_mercadopago_webhook_signature(corpo, data):
+            return jsonify({'status': 'invalid signature'}), 403
+        motivo, chave = verificar_evento('mercadopago', evento_id=data.get('id'),
+                                         assinatura=request.headers.get('X-Hub-Signature'),
+                                         corpo=corpo, instante=data.get('date_created'))
+        if motivo:
+            return jsonify({'status': motivo}), 200
+        try:
+            return processar(data)
+        except Exception:
+            esquecer_evento(chave)
+            raise
+
+    print(f"📦 {len(enxurrada)} entregas: {args.eventos} eventos x {args.repeticoes}, "
+          f"stub com {args.latencia_ms:.0f}ms de latência")
+    for nome, tratar in (('sem proteção', sem_protecao), ('com antireplay', com_antireplay)):
+        with app.app_context():
+            db.session.execute(db.update(Contribuicao).values(status='pendente'))
+            db.session.commit()
+        mercado_pago_service._respostas.clear()
+        processados['total'] = 0
+        consultas_antes = estado.requisicoes
+        latencias = []
+        inicio = time.perf_counter()
+        for corpo, cabecalhos in enxurrada:
+            with app.test_request_context('/webhook/mercadopago', method='POST', data=corpo, headers=cabecalhos):
+                t0 = time.perf_counter()
+                tratar(corpo)
+                latencias.append((time.perf_counter() - t0) * 1000)
+        total = time.perf_counter() - inicio
+        print(f"⏱️  {nome:15s}: {len(enxurrada) / total:7.0f} entregas/s  p50={percentil(latencias, 0.5):7.3f}ms  "
+              f"p99={percentil(latencias, 0.99):7.3f}ms  processadas={processados['total']}  "
+              f"consultas ao provedor={estado.requisicoes - consultas_antes}")
+
+    # Replay de uma entrega capturada há uma hora (assinatura válida, evento nunca visto)
+    corpo, cabecalhos = entrega('evt-antigo', 1001, agora - timedelta(hours=1))
+    with app.test_request_context('/webhook/mercadopago', method='POST', data=corpo, headers=cabecalhos):
+        resposta, status = com_antireplay(corpo)
+    print(f"🔁 Replay de 1h atrás: HTTP {status} {resposta.get_json()}")
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
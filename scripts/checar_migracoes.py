@@ -0,0 +1,182 @@
+"""
+Checagem das migrações: cria um SQLite com o esquema do baseline (o que o
+db.create_all() da primeira versão gerava, já com as colunas de 001), roda
+migrations/002 em diante em ordem, roda tudo de novo (precisam ser
+reexecutáveis) e compara o resultado com o esquema dos modelos de hoje:
+colunas, índices, valores em centavos, agregados e a aplicação lendo o banco.
+Usage: python scripts/checar_migracoes.py
+Usa um SQLite temporário; não toca no banco configurado. Sai com 1 se algo falhar.
+"""
+import glob
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE = """
+CREATE TABLE presentes (
+    id INTEGER NOT NULL,
+    nome VARCHAR(100) NOT NULL,
+    descricao VARCHAR(500) NOT NULL,
+    valor_total NUMERIC(10, 2) NOT NULL,
+    valor_arrecadado NUMERIC(10, 2),
+    ativo BOOLEAN,
+    created_at DATETIME,
+    imagem_url VARCHAR(300),
+    PRIMARY KEY (id)
+);
+CREATE TABLE contribuicoes (
+    id INTEGER NOT NULL,
+    presente_id INTEGER NOT NULL,
+    nome_contribuinte VARCHAR(100) NOT NULL,
+    email_contribuinte VARCHAR(100) NOT NULL,
+    cpf_contribuinte VARCHAR(20),
+    telefone_contribuinte VARCHAR(30),
+    valor NUMERIC(10, 2) NOT NULL,
+    mensagem TEXT,
+    status VARCHAR(20),
+    payment_id VARCHAR(100),
+    metodo_pagamento VARCHAR(20),
+    created_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(presente_id) REFERENCES presentes (id)
+);
+INSERT INTO presentes VALUES (1, 'Jogo de Panelas', 'Panelas', 350.50, 100.25, 1, '2025-11-02 10:00:00.000000', NULL);
+INSERT INTO presentes VALUES (2, 'Cafeteira', 'Café', 199.99, 0, 1, '2025-11-02 10:00:00.000000', NULL);
+INSERT INTO presentes VALUES (3, 'Aspirador', 'Casa', 800, NULL, 0, '2025-11-02 10:00:00.000000', NULL);
+INSERT INTO contribuicoes VALUES (1, 1, 'Ana', 'ana@example.com', NULL, NULL, 60.25, 'Felicidades', 'approved', '1001', 'cartao', '2025-12-01 14:35:10.000000');
+INSERT INTO contribuicoes VALUES (2, 1, 'Bia', 'bia@example.com', NULL, NULL, 40, NULL, 'aprovado', NULL, 'pix', '2025-12-01 14:50:00.000000');
+INSERT INTO contribuicoes VALUES (3, 2, 'Caio', 'caio@example.com', NULL, NULL, 19.99, NULL, 'pendente', NULL, 'cartao', '2025-12-02 09:00:00.000000');
+"""
+
+# Valores esperados depois de 007 (centavos)
+CENTAVOS = {
+    'presentes': "SELECT id, valor_total_centavos, valor_arrecadado_centavos FROM presentes ORDER BY id",
+    'contribuicoes': "SELECT id, valor_centavos FROM contribuicoes ORDER BY id",
+}
+ESPERADO = {
+    'presentes': [(1, 35050, 10025), (2, 19999, 0), (3, 80000, None)],
+    'contribuicoes': [(1, 6025), (2, 4000), (3, 1999)],
+}
+
+
+def migracoes():
+    # 001 é o script antigo só para SQLite com caminho fixo; o baseline já tem as colunas dele
+    return [m for m in sorted(glob.glob(os.path.join(RAIZ, 'migrations', '[0-9][0-9][0-9]_*.py')))
+            if not os.path.basename(m).startswith('001_')]
+
+
+def rodar(caminho, env):
+    resultado = subprocess.run([sys.executable, caminho], cwd=RAIZ, env=env, capture_output=True, text=True)
+    saida = (resultado.stdout + resultado.stderr).strip()
+    if resultado.returncode != 0 or '❌' in saida:
+        raise SystemExit(f"❌ {os.path.basename(caminho)} falhou:\n{saida}")
+    print(f"✅ {os.path.basename(caminho)}")
+
+
+def esquema(conn):
+    """Colunas por tabela e índices nomeados (sem os automáticos do SQLite)"""
+    tabelas = ('presentes', 'contribuicoes', 'listas', 'agregados_contribuicoes')
+    colunas = {t: {r[1] for r in conn.execute(f"PRAGMA table_info('{t}')")} for t in tabelas}
+    indices = {t: {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND name NOT LIKE 'sqlite_%'", (t,))}
+        for t in tabelas}
+    unicos = {t: {tuple(i[2] for i in conn.execute(f"PRAGMA index_info('{r[1]}')"))
+                  for r in conn.execute(f"PRAGMA index_list('{t}')") if r[2]} for t in tabelas}
+    return colunas, indices, unicos
+
+
+def main():
+    pasta = tempfile.mkdtemp()
+    banco = os.path.join(pasta, 'baseline.db')
+    novo = os.path.join(pasta, 'novo.db')
+    with sqlite3.connect(banco) as conn:
+        conn.executescript(BASELINE)
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{banco}', AQUECIMENTO='0', SNAPSHOT='0')
+
+    for rodada in ('1ª execução', '2ª execução (reexecução)'):
+        print(f"📦 {rodada}")
+        for caminho in migracoes():
+            rodar(caminho, env)
+
+    # Esquema dos modelos de hoje, num banco novo
+    subprocess.run([sys.executable, '-c', 'from app import app'], cwd=RAIZ, check=True, capture_output=True,
+                   env=dict(env, DATABASE_URL=f'sqlite:///{novo}'))
+
+    erros = []
+    with sqlite3.connect(banco) as migrado, sqlite3.connect(novo) as atual:
+        (col_m, idx_m, uni_m), (col_a, idx_a, uni_a) = esquema(migrado), esquema(atual)
+        for tabela in col_a:
+            if col_m[tabela] != col_a[tabela]:
+                erros.append(f"colunas de {tabela}: migrado {sorted(col_m[tabela])} x modelos {sorted(col_a[tabela])}")
+            if not idx_a[tabela] <= idx_m[tabela]:
+                erros.append(f"índices faltando em {tabela}: {sorted(idx_a[tabela] - idx_m[tabela])}")
+            if not uni_a[tabela] <= uni_m[tabela]:
+                erros.append(f"unicidade faltando em {tabela}: {sorted(uni_a[tabela] - uni_m[tabela])}")
+        if ('nome',) in uni_m['presentes']:
+            erros.append("presentes ainda tem unicidade global em nome (002 não foi substituído)")
+
+        for tabela, sql in CENTAVOS.items():
+            linhas = migrado.execute(sql).fetchall()
+            if linhas != ESPERADO[tabela]:
+                erros.append(f"centavos em {tabela}: {linhas} x {ESPERADO[tabela]}")
+        agregados = migrado.execute(
+            "SELECT granularidade, inicio, presente_id, metodo_pagamento, quantidade, valor_centavos "
+            "FROM agregados_contribuicoes ORDER BY granularidade, metodo_pagamento"
+        ).fetchall()
+        esperado = [
+            ('dia', '2025-12-01 00:00:00.000000', 1, 'cartao', 1, 6025),
+            ('dia', '2025-12-01 00:00:00.000000', 1, 'pix', 1, 4000),
+            ('hora', '2025-12-01 14:00:00.000000', 1, 'cartao', 1, 6025),
+            ('hora', '2025-12-01 14:00:00.000000', 1, 'pix', 1, 4000),
+        ]
+        if agregados != esperado:
+            erros.append(f"agregados: {agregados} x {esperado}")
+
+    # A aplicação de hoje lê e grava no banco migrado (upsert incremental nos mesmos buckets)
+    verificacao = subprocess.run([sys.executable, '-c', """
+from app import app
+from database import db
+from models.contribuicao import Contribuicao
+from datetime import datetime
+with app.test_client() as cliente:
+    resposta = cliente.get('/api/presentes')
+    assert resposta.status_code == 200, resposta.status_code
+    assert len(resposta.get_json()['presentes']) == 2, resposta.get_json()
+    # Desativados só com o token; arrecadado NULL conta como 0 (não completo)
+    assert cliente.get('/api/presentes?ativo=false').status_code == 403
+    resposta = cliente.get('/api/presentes?ativo=false&completo=false', headers={'X-Admin-Token': 'checagem'})
+    assert [(p['id'], p['esta_completo']) for p in resposta.get_json()['presentes']] == [(3, False)], resposta.get_json()
+with app.app_context():
+    from services.catalogo_service import expressao_completo
+    from models.presente import Presente
+    plano = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + str(
+        db.select(Presente.id).where(Presente.lista_id == 1, Presente.ativo == True, expressao_completo() == False)
+        .compile(db.engine, compile_kwargs={'literal_binds': True})))).all()
+    assert 'ix_presentes_lista_ativo_esta_completo_id' in str(plano), plano
+with app.app_context():
+    db.session.add(Contribuicao(presente_id=1, nome_contribuinte='Dani', email_contribuinte='dani@example.com',
+                                valor_centavos=500, status='approved', metodo_pagamento='pix',
+                                created_at=datetime(2025, 12, 1, 14, 59)))
+    db.session.commit()
+    total = db.session.execute(db.text(
+        "SELECT quantidade, valor_centavos FROM agregados_contribuicoes "
+        "WHERE granularidade = 'hora' AND metodo_pagamento = 'pix'")).all()
+    assert total == [(2, 4500)], total
+"""], cwd=RAIZ, env=dict(env, ADMIN_TOKEN='checagem'), capture_output=True, text=True)
+    if verificacao.returncode != 0:
+        erros.append(f"aplicação no banco migrado: {verificacao.stderr.strip().splitlines()[-1]}")
+
+    if erros:
+        print("❌ Banco migrado difere dos modelos:")
+        for erro in erros:
+            print(f"   {erro}")
+        raise SystemExit(1)
+    print("✅ Banco do baseline migrado até o esquema atual.")
+
+
+if __name__ == '__main__':
+    main()
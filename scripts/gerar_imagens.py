@@ -0,0 +1,35 @@
+"""
+Gera as variantes responsivas (WebP/AVIF) das imagens dos presentes.
+Usage: python scripts/gerar_imagens.py
+Roda no build: lê as imagens do catálogo (data/presentes.json) e de static/images.
+"""
+import glob
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.catalogo_service import carregar_catalogo
+from services.imagem_service import STATIC_DIR, relatorio
+
+
+def main():
+    imagens = {p.get('imagem_url') for p in carregar_catalogo() if p.get('imagem_url')}
+    for caminho in glob.glob(os.path.join(STATIC_DIR, 'images', '*')):
+        imagens.add('/static/images/' + os.path.basename(caminho))
+
+    linhas = relatorio(sorted(imagens))
+    if not linhas:
+        print("⚠️  Nenhuma variante gerada (Pillow instalado?)")
+        return
+
+    total_original = sum(l['original_bytes'] for l in linhas)
+    total_variantes = sum(l['variante_bytes'] for l in linhas)
+    for l in linhas:
+        print(f"🖼️  {l['imagem_url']}: {l['original_bytes'] / 1024:.0f} KB → {l['variante_bytes'] / 1024:.0f} KB")
+    print(f"✅ {len(linhas)} imagens: {total_original / 1024:.0f} KB → {total_variantes / 1024:.0f} KB "
+          f"({(total_original - total_variantes) / 1024:.0f} KB economizados)")
+
+
+if __name__ == '__main__':
+    main()
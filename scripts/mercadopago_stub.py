@@ -0,0 +1,153 @@
+"""
+Stub local da API de pagamentos do Mercado Pago para testes e benchmarks.
+Responde GET /v1/payments/<id>, GET /v1/payments/search?external_reference=,
+GET /merchant_orders/<id> e GET /users/me com status determinísticos por id,
+latência configurável e 429 acima de --taxa requisições/s. Com --falha, toda
+requisição responde com esse status HTTP (ex.: 503), para injetar falhas.
+Usage: python scripts/mercadopago_stub.py [--porta 8089] [--latencia-ms 30] [--taxa 0] [--falha 0]
+Depois: MERCADOPAGO_API_URL=http://127.0.0.1:8089 python reconciliar_pagamentos.py
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Distribuição dos status devolvidos (pelo hash do id)
+STATUS = (('approved', 60), ('pending', 15), ('rejected', 15), ('cancelled', 10))
+
+
+def status_do_pagamento(payment_id):
+    ponto = int(hashlib.sha256(str(payment_id).encode()).hexdigest()[:8], 16) % 100
+    for status, peso in STATUS:
+        if ponto < peso:
+            return status
+        ponto -= peso
+    return STATUS[-1][0]
+
+
+def pagamento(payment_id, external_reference=None):
+    return {
+        'id': int(payment_id),
+        'status': status_do_pagamento(payment_id),
+        'status_detail': 'accredited',
+        'external_reference': external_reference,
+        'transaction_amount': 100.0,
+        'payment_method_id': 'pix',
+        'date_created': '2026-01-24T12:00:00.000-03:00',
+    }
+
+
+class EstadoStub:
+    def __init__(self, latencia_ms=30, taxa=0, falha=0):
+        self.latencia = latencia_ms / 1000
+        self.taxa = taxa
+        self.falha = falha  # status HTTP devolvido a tudo (0 = funcionando); pode mudar com o stub no ar
+        self.requisicoes = 0
+        self.conexoes = 0
+        self.limitadas = 0
+        self._janela = (0, 0)  # (segundo, requisições nele)
+        self._lock = threading.Lock()
+
+    def admitir(self):
+        """Contabiliza a requisição; False se passou da taxa deste segundo (429)"""
+        with self._lock:
+            self.requisicoes += 1
+            segundo = int(time.monotonic())
+            inicio, quantidade = self._janela
+            quantidade = quantidade + 1 if inicio == segundo else 1
+            self._janela = (segundo, quantidade)
+            if self.taxa and quantidade > self.taxa:
+                self.limitadas += 1
+                return False
+            return True
+
+
+def criar_handler(estado):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Cabeçalhos e corpo saem em escritas separadas: sem isso o keep-alive esbarra no ACK atrasado
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with estado._lock:
+                estado.conexoes += 1
+
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if not estado.admitir():
+                return self._responder(429, {'message': 'too many requests', 'status': 429})
+            time.sleep(estado.latencia)
+            if estado.falha:
+                return self._responder(estado.falha, {'message': 'injected failure', 'status': estado.falha})
+            url = urlparse(self.path)
+
+            if url.path == '/users/me':
+                return self._responder(200, {'id': 1, 'nickname': 'STUB'})
+
+            encontrado = re.fullmatch(r'/v1/payments/(\d+)', url.path)
+            if encontrado:
+                payment_id = encontrado.group(1)
+                # Ids terminados em 0 não existem no provedor
+                if payment_id.endswith('0'):
+                    return self._responder(404, {'message': 'Payment not found', 'status': 404})
+                return self._responder(200, pagamento(payment_id))
+
+            if url.path == '/v1/payments/search':
+                referencia = (parse_qs(url.query).get('external_reference') or [''])[0]
+                # Um em cada cinco pedidos nunca chegou a gerar pagamento
+                resultados = [] if not referencia.isdigit() or int(referencia) % 5 == 0 else [
+                    pagamento(f'9{referencia}', referencia)
+                ]
+                return self._responder(200, {'results': resultados, 'paging': {'total': len(resultados)}})
+
+            encontrado = re.fullmatch(r'/merchant_orders/(\d+)', url.path)
+            if encontrado:
+                return self._responder(200, {'id': int(encontrado.group(1)),
+                                             'payments': [pagamento(f'7{encontrado.group(1)}')]})
+
+            self._responder(404, {'message': 'not found', 'status': 404})
+
+    return Handler
+
+
+def criar_servidor(porta=8089, latencia_ms=30, taxa=0, falha=0):
+    """Servidor (ainda não iniciado) e seu estado, para uso em benchmarks"""
+    estado = EstadoStub(latencia_ms, taxa, falha)
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), criar_handler(estado))
+    servidor.daemon_threads = True
+    return servidor, estado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--porta', type=int, default=8089)
+    parser.add_argument('--latencia-ms', type=float, default=30)
+    parser.add_argument('--taxa', type=int, default=0, help='requisições/s antes de responder 429 (0 = sem limite)')
+    parser.add_argument('--falha', type=int, default=0, help='status HTTP devolvido a todas as requisições (0 = desligado)')
+    args = parser.parse_args()
+
+    servidor, _ = criar_servidor(args.porta, args.latencia_ms, args.taxa, args.falha)
+    print(f"🧪 Stub do Mercado Pago em http://127.0.0.1:{args.porta} (latência {args.latencia_ms}ms)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -2,17 +2,19 @@
 Configurações de segurança centralizadas para a aplicação.
 Inclui CORS, Rate Limiting e outras medidas de proteção.
 """
-from flask import request
+from flask import request, jsonify
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
+import functools
+import hmac
 import structlog
-import logging.config
 from config import Config
+from logs import configurar_logging
 
-# Configuração de Logging
-logging.config.dictConfig(Config.LOGGING_CONFIG)
+# Configuração de Logging (fila + listener em thread própria, ver logs.py)
+configurar_logging()
 logger = structlog.get_logger()
 
 # Cache
@@ -25,6 +27,27 @@ limiter = Limiter(
     storage_uri="memory://"  # Usando memória local ao invés de Redis
 )
 
+def eh_admin():
+    """Se a requisição atual traz o token de administração (falso sem ADMIN_TOKEN)"""
+    if not Config.ADMIN_TOKEN:
+        return False
+    auth = request.headers.get('Authorization', '')
+    token = auth[len('Bearer '):] if auth.startswith('Bearer ') else request.headers.get('X-Admin-Token', '')
+    return hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode())
+
+def admin_required(f):
+    """Exige o token de administração (desativa a rota se ADMIN_TOKEN não estiver definido)"""
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        if not Config.ADMIN_TOKEN:
+            return jsonify({'success': False, 'error': 'Não encontrado'}), 404
+
+        if not eh_admin():
+            logger.warning("admin_unauthorized", path=request.path, remote_addr=request.remote_addr)
+            return jsonify({'success': False, 'error': 'Não autorizado'}), 401
+        return f(*args, **kwargs)
+    return wrapper
+
 def init_security(app):
     """Inicializa todas as configurações de segurança"""
     # CORS
@@ -65,7 +88,9 @@ def init_security(app):
         
         @app.after_request
         def log_response_info(response):
-            logger.info(
+            # Erros 5xx saem como aviso para nunca caírem na amostragem
+            log = logger.warning if response.status_code >= 500 else logger.info
+            log(
                 "request_finished",
                 path=request.path,
                 method=request.method,
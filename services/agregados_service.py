@@ -0,0 +1,226 @@
+"""
+Agregados do painel administrativo: totais de contribuições confirmadas por
+hora e por dia, presente e método de pagamento. São mantidos de forma
+incremental na mesma transação que grava a contribuição e podem ser
+recalculados do zero; as consultas do painel leem só os buckets.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from database import db
+from dinheiro import em_reais
+from models.agregado import AgregadoContribuicao, GRANULARIDADES
+from models.contribuicao import Contribuicao
+from models.presente import Presente
+from security import logger
+
+# Status que contam como dinheiro recebido (PIX local e Mercado Pago)
+STATUS_CONFIRMADOS = frozenset({'aprovado', 'approved'})
+
+# Campos da contribuição que determinam o bucket e o valor agregado
+CAMPOS = ('presente_id', 'valor_centavos', 'status', 'metodo_pagamento', 'created_at')
+
+# Máximo de buckets devolvidos numa série
+MAX_BUCKETS = 24 * 92
+
+DURACAO = {'hora': timedelta(hours=1), 'dia': timedelta(days=1)}
+
+
+def inicio_bucket(momento, granularidade):
+    """Trunca o momento no início da hora ou do dia"""
+    if granularidade == 'hora':
+        return momento.replace(minute=0, second=0, microsecond=0)
+    return momento.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _acumular(deltas, estado, sinal):
+    """Soma (ou subtrai) uma contribuição confirmada nos seus buckets"""
+    if estado['status'] not in STATUS_CONFIRMADOS or estado['presente_id'] is None:
+        return
+    momento = estado['created_at'] or datetime.utcnow()
+    metodo = estado['metodo_pagamento'] or 'desconhecido'
+    valor = estado['valor_centavos'] or 0
+    for granularidade in GRANULARIDADES:
+        chave = (granularidade, inicio_bucket(momento, granularidade), estado['presente_id'], metodo)
+        deltas[chave][0] += sinal
+        deltas[chave][1] += sinal * valor
+
+
+def _estado(contribuicao, anterior):
+    """Campos da contribuição antes (anterior=True) ou depois do flush"""
+    attrs = inspect(contribuicao).attrs
+    estado = {}
+    for campo in CAMPOS:
+        historico = attrs[campo].history
+        if anterior and historico.deleted:
+            estado[campo] = historico.deleted[0]
+        else:
+            estado[campo] = attrs[campo].value
+    return estado
+
+
+def _upsert(conn, deltas):
+    """Aplica os deltas nos buckets com INSERT ... ON CONFLICT DO UPDATE (soma atômica)"""
+    presentes = {chave[2] for chave in deltas}
+    listas = dict(conn.execute(
+        db.select(Presente.id, Presente.lista_id).where(Presente.id.in_(presentes))
+    ).all())
+
+    linhas = [
+        {'lista_id': listas[presente_id], 'granularidade': granularidade, 'inicio': inicio,
+         'presente_id': presente_id, 'metodo_pagamento': metodo, 'quantidade': quantidade, 'valor_centavos': valor}
+        for (granularidade, inicio, presente_id, metodo), (quantidade, valor) in deltas.items()
+        if (quantidade or valor) and presente_id in listas
+    ]
+    if not linhas:
+        return
+
+    tabela = AgregadoContribuicao.__table__
+    dialeto = conn.dialect.name
+    if dialeto in ('postgresql', 'sqlite'):
+        if dialeto == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(tabela).values(linhas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['lista_id', 'granularidade', 'inicio', 'presente_id', 'metodo_pagamento'],
+            set_={
+                'quantidade': tabela.c.quantidade + stmt.excluded.quantidade,
+                'valor_centavos': tabela.c.valor_centavos + stmt.excluded.valor_centavos
+            }
+        )
+        conn.execute(stmt)
+        return
+
+    # Dialeto sem ON CONFLICT: UPDATE e, se não havia bucket, INSERT
+    for linha in linhas:
+        atualizados = conn.execute(
+            db.update(tabela)
+            .where(*(tabela.c[c] == linha[c] for c in
+                     ('lista_id', 'granularidade', 'inicio', 'presente_id', 'metodo_pagamento')))
+            .values(quantidade=tabela.c.quantidade + linha['quantidade'],
+                    valor_centavos=tabela.c.valor_centavos + linha['valor_centavos'])
+        ).rowcount
+        if not atualizados:
+            conn.execute(db.insert(tabela).values(linha))
+
+
+def _atualizar_agregados(session, flush_context):
+    """after_flush: traduz contribuições novas, alteradas e removidas em deltas nos buckets"""
+    deltas = defaultdict(lambda: [0, 0])
+    for obj in session.new:
+        if isinstance(obj, Contribuicao):
+            _acumular(deltas, _estado(obj, anterior=False), +1)
+    for obj in session.dirty:
+        if isinstance(obj, Contribuicao) and session.is_modified(obj):
+            _acumular(deltas, _estado(obj, anterior=True), -1)
+            _acumular(deltas, _estado(obj, anterior=False), +1)
+    for obj in session.deleted:
+        if isinstance(obj, Contribuicao):
+            _acumular(deltas, _estado(obj, anterior=True), -1)
+    if deltas:
+        _upsert(session.connection(), deltas)
+
+
+def recalcular_agregados(lista_id=None):
+    """Reconstrói os buckets a partir das contribuições (backfill); retorna o número de buckets"""
+    query = (
+        db.select(*(getattr(Contribuicao, c) for c in CAMPOS))
+        .join(Presente, Presente.id == Contribuicao.presente_id)
+        .where(Contribuicao.status.in_(STATUS_CONFIRMADOS))
+        .execution_options(yield_per=1000)
+    )
+    apagar = db.delete(AgregadoContribuicao)
+    if lista_id is not None:
+        query = query.where(Presente.lista_id == lista_id)
+        apagar = apagar.where(AgregadoContribuicao.lista_id == lista_id)
+
+    # Memória proporcional ao número de buckets, não de contribuições
+    deltas = defaultdict(lambda: [0, 0])
+    for row in db.session.execute(query):
+        _acumular(deltas, dict(zip(CAMPOS, row)), +1)
+
+    db.session.execute(apagar)
+    if deltas:
+        _upsert(db.session.connection(), deltas)
+    db.session.commit()
+    logger.info("agregados_recalculados", lista_id=lista_id, buckets=len(deltas))
+    return len(deltas)
+
+
+def _filtros(lista_id, granularidade, desde, ate, presente_id=None, metodo=None):
+    filtros = [
+        AgregadoContribuicao.lista_id == lista_id,
+        AgregadoContribuicao.granularidade == granularidade
+    ]
+    if desde:
+        filtros.append(AgregadoContribuicao.inicio >= desde)
+    if ate:
+        filtros.append(AgregadoContribuicao.inicio < ate)
+    if presente_id:
+        filtros.append(AgregadoContribuicao.presente_id == presente_id)
+    if metodo:
+        filtros.append(AgregadoContribuicao.metodo_pagamento == metodo)
+    return filtros
+
+
+def _totais(filtros, *agrupar):
+    quantidade = db.func.sum(AgregadoContribuicao.quantidade)
+    valor = db.func.sum(AgregadoContribuicao.valor_centavos)
+    query = db.select(*agrupar, quantidade, valor).where(*filtros)
+    if agrupar:
+        query = query.group_by(*agrupar).order_by(*agrupar)
+    return db.session.execute(query).all()
+
+
+def serie(lista_id, granularidade='hora', desde=None, ate=None, presente_id=None, metodo=None):
+    """Série temporal (um ponto por bucket com contribuições)"""
+    if granularidade not in GRANULARIDADES:
+        raise ValueError(f"Granularidade inválida: use {' ou '.join(GRANULARIDADES)}")
+    ate = ate or datetime.utcnow() + DURACAO[granularidade]
+    desde = desde or ate - DURACAO[granularidade] * (48 if granularidade == 'hora' else 30)
+    if (ate - desde) / DURACAO[granularidade] > MAX_BUCKETS:
+        raise ValueError(f'Período longo demais: máximo de {MAX_BUCKETS} buckets')
+
+    filtros = _filtros(lista_id, granularidade, desde, ate, presente_id, metodo)
+    return [
+        {'inicio': inicio.isoformat(), 'quantidade': int(quantidade), 'valor': em_reais(valor)}
+        for inicio, quantidade, valor in _totais(filtros, AgregadoContribuicao.inicio)
+    ]
+
+
+def resumo(lista_id, desde=None, ate=None):
+    """Totais de hoje e do período (padrão: tudo), por presente e por método de pagamento"""
+    hoje = inicio_bucket(datetime.utcnow(), 'dia')
+    filtros = _filtros(lista_id, 'dia', desde, ate)
+
+    def total(linhas):
+        quantidade, valor = linhas[0] if linhas else (0, 0)
+        return {'quantidade': int(quantidade or 0), 'valor': em_reais(valor)}
+
+    nomes = dict(db.session.execute(
+        db.select(Presente.id, Presente.nome).where(Presente.lista_id == lista_id)
+    ).all())
+
+    return {
+        'hoje': total(_totais(_filtros(lista_id, 'dia', hoje, None))),
+        'periodo': total(_totais(filtros)),
+        'por_presente': [
+            {'presente_id': presente_id, 'nome': nomes.get(presente_id),
+             'quantidade': int(quantidade), 'valor': em_reais(valor)}
+            for presente_id, quantidade, valor in _totais(filtros, AgregadoContribuicao.presente_id)
+        ],
+        'por_metodo': [
+            {'metodo_pagamento': metodo, 'quantidade': int(quantidade), 'valor': em_reais(valor)}
+            for metodo, quantidade, valor in _totais(filtros, AgregadoContribuicao.metodo_pagamento)
+        ]
+    }
+
+
+def init_agregados(app):
+    """Mantém os agregados a cada flush que grava contribuições"""
+    if not event.contains(Session, 'after_flush', _atualizar_agregados):
+        event.listen(Session, 'after_flush', _atualizar_agregados)
+    return app
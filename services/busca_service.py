@@ -0,0 +1,104 @@
+"""
+Busca textual de presentes com índice: FTS5 no SQLite e tsvector + GIN no
+PostgreSQL, ambos sem acento ("paciencia" encontra "paciência"). O índice é
+criado por migrations/010_indice_busca.py.
+"""
+import re
+import unicodedata
+from flask import current_app
+from sqlalchemy import text
+from database import db
+from dinheiro import em_reais
+from models.presente import Presente
+from security import logger
+
+# Máximo de termos considerados por busca
+MAX_TERMOS = 8
+
+# Peso do nome em relação à descrição no ranking (SQLite/bm25)
+PESO_NOME = 10.0
+
+# Expressão indexada no PostgreSQL, criada por migrations/010_indice_busca.py
+# (a consulta precisa usar exatamente a mesma)
+TSVECTOR_PG = "to_tsvector('portuguese', f_unaccent(coalesce(nome, '') || ' ' || coalesce(descricao, '')))"
+
+
+def indice_busca_existe():
+    """Se a migração 010 já criou o índice do dialeto (só lê o catálogo, sem DDL)"""
+    dialeto = db.engine.dialect.name
+    with db.engine.connect() as conn:
+        if dialeto == 'sqlite':
+            sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'presentes_fts'"
+        elif dialeto == 'postgresql':
+            sql = "SELECT 1 FROM pg_indexes WHERE tablename = 'presentes' AND indexname = 'ix_presentes_busca'"
+        else:
+            return False
+        return conn.execute(text(sql)).first() is not None
+
+
+def _termos(consulta):
+    """Termos normalizados (minúsculos, sem acento) da consulta"""
+    sem_acento = unicodedata.normalize('NFKD', consulta.lower())
+    sem_acento = ''.join(c for c in sem_acento if not unicodedata.combining(c))
+    return re.findall(r'\w+', sem_acento)[:MAX_TERMOS]
+
+
+def buscar_presentes(consulta, lista_id, limite=20):
+    """Presentes ativos da lista que contêm todos os termos (prefixo), por relevância"""
+    termos = _termos(consulta or '')
+    if not termos:
+        return []
+
+    dialeto = db.engine.dialect.name if current_app.extensions.get('busca_indice') else None
+    colunas = "p.id, p.nome, p.descricao, p.valor_total_centavos, p.imagem_url"
+    params = {'lista_id': lista_id, 'limite': limite}
+
+    if dialeto == 'sqlite':
+        params['q'] = ' '.join(f'"{t}"*' for t in termos)
+        sql = f"""
+            SELECT {colunas} FROM presentes_fts f JOIN presentes p ON p.id = f.rowid
+            WHERE presentes_fts MATCH :q AND p.lista_id = :lista_id AND p.ativo
+            ORDER BY bm25(presentes_fts, {PESO_NOME}, 1.0) LIMIT :limite
+        """
+    elif dialeto == 'postgresql':
+        params['q'] = ' & '.join(f'{t}:*' for t in termos)
+        sql = f"""
+            SELECT {colunas} FROM presentes p, to_tsquery('portuguese', f_unaccent(:q)) q
+            WHERE {TSVECTOR_PG} @@ q AND p.lista_id = :lista_id AND p.ativo
+            ORDER BY ts_rank({TSVECTOR_PG}, q) DESC
+            LIMIT :limite
+        """
+    else:
+        # Sem índice textual (dialeto sem suporte ou 010 ainda não rodou): varredura com LIKE
+        query = Presente.query.filter_by(lista_id=lista_id, ativo=True)
+        for termo in termos:
+            query = query.filter(db.or_(Presente.nome.ilike(f'%{termo}%'), Presente.descricao.ilike(f'%{termo}%')))
+        return [
+            {'id': p.id, 'nome': p.nome, 'descricao': p.descricao,
+             'valor_total': em_reais(p.valor_total_centavos), 'imagem_url': p.imagem_url}
+            for p in query.limit(limite)
+        ]
+
+    return [
+        {'id': row.id, 'nome': row.nome, 'descricao': row.descricao,
+         'valor_total': em_reais(row.valor_total_centavos), 'imagem_url': row.imagem_url}
+        for row in db.session.execute(text(sql), params)
+    ]
+
+
+def init_busca(app):
+    """
+    Verifica se o índice de busca existe. O DDL (extensão, função, triggers) fica
+    em migrations/010_indice_busca.py: roda uma vez, não a cada worker que sobe
+    """
+    with app.app_context():
+        try:
+            existe = indice_busca_existe()
+        except Exception as e:
+            logger.error("busca_indice_erro", error=str(e))
+            existe = False
+        if not existe:
+            logger.warning("busca_sem_indice", dialeto=db.engine.dialect.name,
+                           message="rode migrations/010_indice_busca.py; até lá a busca usa LIKE")
+    app.extensions['busca_indice'] = existe
+    return app
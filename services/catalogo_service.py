@@ -0,0 +1,314 @@
+"""
+Serviço de catálogo de presentes: carga do arquivo de dados, sincronização
+em lote com o banco e versão do cache do catálogo.
+"""
+import base64
+import json
+import os
+from database import db
+from dinheiro import em_reais, para_centavos
+from config import Config
+from lru_cache import LRUCache
+from models.lista import Lista, LISTA_PADRAO_ID
+from models.presente import Presente
+from security import logger
+
+# Arquivo padrão com o catálogo de presentes
+CATALOGO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'presentes.json')
+
+# Versão do catálogo de cada lista (Lista.catalogo_versao, entra na chave das páginas
+# cacheadas), lida do banco no máximo a cada CATALOGO_VERSAO_TTL por worker: o cache
+# 'simple' é de cada processo, então a versão nele não chegaria aos outros workers
+_versoes = LRUCache(max_itens=Config.LISTAS_CACHE_MAX, ttl=Config.CATALOGO_VERSAO_TTL)
+
+# Campos sincronizados a partir do arquivo (nome é a chave natural)
+CAMPOS = ('nome', 'descricao', 'valor_total_centavos', 'ativo', 'imagem_url')
+
+# Chamadas com o lista_id a cada invalidação (ex.: snapshot.py regrava as páginas estáticas)
+_ouvintes_invalidacao = []
+
+# Linhas por INSERT multi-valores (fica abaixo do limite de parâmetros do SQLite)
+TAMANHO_LOTE = 1000
+
+
+def versao_catalogo(lista_id=LISTA_PADRAO_ID):
+    """Retorna a versão atual do catálogo da lista (usada nas chaves de cache)"""
+    versao = _versoes.get(lista_id)
+    if versao is None:
+        versao = db.session.execute(
+            db.select(Lista.catalogo_versao).where(Lista.id == lista_id)
+        ).scalar() or 0
+        _versoes.set(lista_id, versao)
+    return versao
+
+
+def invalidar_catalogo(lista_id=LISTA_PADRAO_ID):
+    """Incrementa a versão do catálogo da lista no banco, invalidando só as páginas dela"""
+    db.session.execute(
+        db.update(Lista).where(Lista.id == lista_id).values(catalogo_versao=Lista.catalogo_versao + 1)
+    )
+    versao = db.session.execute(db.select(Lista.catalogo_versao).where(Lista.id == lista_id)).scalar() or 0
+    db.session.commit()
+    _versoes.set(lista_id, versao)
+    logger.info("catalogo_invalidado", lista_id=lista_id, versao=versao)
+    for ouvinte in _ouvintes_invalidacao:
+        ouvinte(lista_id)
+    return versao
+
+
+def ao_invalidar_catalogo(funcao):
+    """Registra uma função chamada com o lista_id sempre que o catálogo da lista muda"""
+    _ouvintes_invalidacao.append(funcao)
+
+
+def carregar_catalogo(caminho=None):
+    """Lê o catálogo de presentes de um arquivo JSON"""
+    with open(caminho or CATALOGO_PADRAO, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _normalizar(p_data, lista_id):
+    """Normaliza um item do catálogo (valor_total em reais) para comparação com o banco"""
+    return {
+        'lista_id': lista_id,
+        'nome': p_data['nome'],
+        'descricao': p_data.get('descricao', ''),
+        'valor_total_centavos': para_centavos(p_data['valor_total']),
+        'ativo': bool(p_data.get('ativo', True)),
+        'imagem_url': p_data.get('imagem_url') or Presente.__table__.c.imagem_url.default.arg
+    }
+
+
+def _upsert(linhas):
+    """INSERT ... ON CONFLICT (lista_id, nome) DO UPDATE conforme o dialeto do banco"""
+    dialeto = db.engine.dialect.name
+    if dialeto == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialeto == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        # Dialeto sem ON CONFLICT: recorre ao merge do ORM
+        for linha in linhas:
+            existente = Presente.query.filter_by(lista_id=linha['lista_id'], nome=linha['nome']).first()
+            if existente:
+                for campo, valor in linha.items():
+                    setattr(existente, campo, valor)
+            else:
+                db.session.add(Presente(**linha))
+        return
+
+    for inicio in range(0, len(linhas), TAMANHO_LOTE):
+        stmt = insert(Presente.__table__).values(linhas[inicio:inicio + TAMANHO_LOTE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['lista_id', 'nome'],
+            set_={campo: stmt.excluded[campo] for campo in CAMPOS if campo != 'nome'}
+        )
+        db.session.execute(stmt)
+
+
+def sincronizar_catalogo(presentes, desativar_ausentes=False, lista_id=LISTA_PADRAO_ID):
+    """
+    Sincroniza o catálogo de uma lista com o banco: um único SELECT para o
+    diff e upsert em lote apenas das linhas novas ou alteradas.
+    """
+    desejados = {}
+    for p_data in presentes:
+        item = _normalizar(p_data, lista_id)
+        desejados[item['nome']] = item
+
+    existentes = {
+        row.nome: dict(row._mapping)
+        for row in db.session.execute(
+            db.select(*(getattr(Presente, c) for c in CAMPOS)).where(Presente.lista_id == lista_id)
+        )
+    }
+
+    alterados = []
+    adicionados = atualizados = 0
+    for nome, item in desejados.items():
+        atual = existentes.get(nome)
+        if atual is None:
+            adicionados += 1
+            alterados.append(item)
+        elif any(atual[c] != item[c] for c in CAMPOS):
+            atualizados += 1
+            alterados.append(item)
+
+    desativados = 0
+    if desativar_ausentes:
+        ausentes = [nome for nome, atual in existentes.items() if nome not in desejados and atual['ativo']]
+        if ausentes:
+            db.session.execute(
+                db.update(Presente)
+                .where(Presente.lista_id == lista_id, Presente.nome.in_(ausentes))
+                .values(ativo=False)
+            )
+            desativados = len(ausentes)
+
+    if alterados:
+        _upsert(alterados)
+    db.session.commit()
+
+    # Imagens novas ganham as variantes responsivas já na sincronização (antes da nova
+    # versão, para as páginas renderizadas a partir dela já saírem com o srcset)
+    from services.imagem_service import gerar_variantes
+    for imagem_url in {item['imagem_url'] for item in alterados}:
+        gerar_variantes(imagem_url)
+
+    if alterados or desativados:
+        invalidar_catalogo(lista_id)
+
+    resultado = {
+        'adicionados': adicionados,
+        'atualizados': atualizados,
+        'inalterados': len(desejados) - adicionados - atualizados,
+        'desativados': desativados
+    }
+    logger.info("catalogo_sincronizado", lista_id=lista_id, **resultado)
+    return resultado
+
+
+# --- Paginação por cursor e campos esparsos (/api/presentes) ---
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+
+def expressao_completo():
+    """
+    esta_completo em SQL, igual à propriedade do modelo (arrecadado NULL conta
+    como 0). O 0 vai literal, não como parâmetro: é a expressão do índice
+    ix_presentes_lista_ativo_esta_completo_id, e o SQLite só usa um índice de
+    expressão se a consulta tiver exatamente a mesma expressão.
+    """
+    return db.func.coalesce(Presente.valor_arrecadado_centavos, db.literal_column('0')) >= Presente.valor_total_centavos
+
+
+def _expressoes_campos():
+    """Campo público -> expressão SQL (os derivados são calculados no próprio SELECT)"""
+    total = Presente.valor_total_centavos
+    arrecadado = db.func.coalesce(Presente.valor_arrecadado_centavos, 0)
+    return {
+        'id': Presente.id,
+        'nome': Presente.nome,
+        'descricao': Presente.descricao,
+        # Centavos no SELECT; em_reais só na saída
+        'valor_total': total,
+        'valor_arrecadado': arrecadado,
+        'progresso_porcentagem': db.case(
+            (total == 0, 0),
+            (arrecadado >= total, 100),
+            else_=db.cast(arrecadado * 100, db.Float) / total
+        ),
+        'esta_completo': expressao_completo(),
+        'imagem_url': Presente.imagem_url
+    }
+
+
+CAMPOS_PUBLICOS = tuple(_expressoes_campos())
+_CONVERSORES = {
+    'valor_total': em_reais,
+    'valor_arrecadado': em_reais,
+    'progresso_porcentagem': float,
+    'esta_completo': bool
+}
+
+
+def codificar_cursor(ultimo_id):
+    return base64.urlsafe_b64encode(json.dumps({'id': ultimo_id}).encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Retorna o último id visto; ValueError se o cursor for inválido"""
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return int(dados['id'])
+    except Exception:
+        raise ValueError('Cursor inválido')
+
+
+def pagina_presentes(campos=None, limite=LIMITE_PADRAO, cursor=None, ativo=True, completo=None,
+                     lista_id=LISTA_PADRAO_ID):
+    """
+    Uma página do catálogo ordenada por id (keyset): o custo depende do
+    tamanho da página e das colunas pedidas, não do catálogo inteiro.
+    Retorna (itens, proximo_cursor).
+    """
+    expressoes = _expressoes_campos()
+    campos = list(campos or CAMPOS_PUBLICOS)
+    colunas = [expressoes[c].label(c) for c in campos]
+    if 'id' not in campos:
+        colunas.append(Presente.id.label('id'))
+
+    query = (
+        db.select(*colunas)
+        .where(Presente.lista_id == lista_id)
+        .order_by(Presente.id)
+        .limit(limite + 1)
+    )
+    if ativo is not None:
+        query = query.where(Presente.ativo == ativo)
+    if completo is not None:
+        # Mesma expressão do índice ix_presentes_lista_ativo_esta_completo_id
+        query = query.where(expressao_completo() == completo)
+    if cursor:
+        query = query.where(Presente.id > decodificar_cursor(cursor))
+
+    linhas = db.session.execute(query).all()
+    proximo_cursor = codificar_cursor(linhas[limite - 1].id) if len(linhas) > limite else None
+
+    itens = []
+    for linha in linhas[:limite]:
+        mapa = linha._mapping
+        item = {}
+        for campo in campos:
+            valor = mapa[campo]
+            conversor = _CONVERSORES.get(campo)
+            item[campo] = conversor(valor) if conversor and valor is not None else valor
+        itens.append(item)
+    return itens, proximo_cursor
+
+
+# --- Modelos de leitura (página principal e /api/presentes/<id>) ---
+
+class PresenteLeitura:
+    """Presente somente leitura: sem identity map, relacionamentos ou Decimal; derivados vêm do SQL.
+    valor_total e valor_arrecadado em reais (para exibir), a partir dos centavos do banco"""
+    __slots__ = CAMPOS_PUBLICOS
+
+    def __init__(self, id, nome, descricao, valor_total, valor_arrecadado, progresso_porcentagem,
+                 esta_completo, imagem_url):
+        self.id = id
+        self.nome = nome
+        self.descricao = descricao
+        self.valor_total = em_reais(valor_total)
+        self.valor_arrecadado = em_reais(valor_arrecadado)
+        self.progresso_porcentagem = float(progresso_porcentagem)
+        self.esta_completo = bool(esta_completo)
+        self.imagem_url = imagem_url
+
+    def to_dict(self):
+        return {campo: getattr(self, campo) for campo in CAMPOS_PUBLICOS}
+
+
+def _select_leitura():
+    expressoes = _expressoes_campos()
+    return db.select(*(expressoes[c] for c in CAMPOS_PUBLICOS))
+
+
+def presentes_ativos(lista_id=LISTA_PADRAO_ID):
+    """Presentes ativos da lista, em ordem de id, como PresenteLeitura"""
+    query = (
+        _select_leitura()
+        .where(Presente.lista_id == lista_id, Presente.ativo.is_(True))
+        .order_by(Presente.id)
+    )
+    return [PresenteLeitura(*linha) for linha in db.session.execute(query)]
+
+
+def presente_leitura(presente_id, lista_id=LISTA_PADRAO_ID):
+    """Um presente da lista como PresenteLeitura (None se não existir)"""
+    linha = db.session.execute(
+        _select_leitura().where(Presente.id == presente_id, Presente.lista_id == lista_id)
+    ).first()
+    return PresenteLeitura(*linha) if linha else None
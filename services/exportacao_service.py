@@ -0,0 +1,117 @@
+"""
+Exportação de contribuições em CSV ou JSONL por streaming: as linhas vêm do
+banco em lotes (yield_per / cursor no servidor) e nunca ficam todas em memória.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from database import db
+from dinheiro import reais_texto
+from models.contribuicao import Contribuicao
+from models.presente import Presente
+
+FORMATOS = ('csv', 'jsonl')
+
+# Linhas buscadas por vez no cursor do servidor
+LOTE = 1000
+
+CAMPOS = (
+    'id', 'created_at', 'presente_id', 'presente_nome', 'nome_contribuinte',
+    'email_contribuinte', 'cpf_contribuinte', 'telefone_contribuinte',
+    'valor', 'mensagem', 'status', 'metodo_pagamento'
+)
+
+
+def parse_data(valor):
+    """Data ISO (AAAA-MM-DD ou com hora) ou None; ValueError se inválida"""
+    if not valor:
+        return None
+    try:
+        return datetime.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f'Data inválida: {valor}')
+
+
+def consulta_exportacao(lista_id, desde=None, ate=None, presente_id=None, status=None):
+    """SELECT das contribuições com filtros, em streaming"""
+    query = (
+        db.select(
+            Contribuicao.id, Contribuicao.created_at, Contribuicao.presente_id,
+            Presente.nome.label('presente_nome'), Contribuicao.nome_contribuinte,
+            Contribuicao.email_contribuinte, Contribuicao.cpf_contribuinte,
+            Contribuicao.telefone_contribuinte, Contribuicao.valor_centavos, Contribuicao.mensagem,
+            Contribuicao.status, Contribuicao.metodo_pagamento
+        )
+        .join(Presente, Presente.id == Contribuicao.presente_id)
+        .where(Presente.lista_id == lista_id)
+        .order_by(Contribuicao.id)
+        .execution_options(yield_per=LOTE)
+    )
+    if desde:
+        query = query.where(Contribuicao.created_at >= desde)
+    if ate:
+        query = query.where(Contribuicao.created_at < ate)
+    if presente_id:
+        query = query.where(Contribuicao.presente_id == presente_id)
+    if status:
+        query = query.where(Contribuicao.status == status)
+    return query
+
+
+# Início de célula que o Excel/LibreOffice interpretam como fórmula (CSV injection)
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _celula_csv(campo, valor):
+    """Texto digitado pelo contribuinte vai com ' na frente se pudesse virar fórmula"""
+    if isinstance(valor, str) and campo not in ('created_at', 'valor') and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def _valor(campo, valor):
+    if valor is None:
+        return None
+    if campo == 'created_at':
+        return valor.isoformat()
+    if campo == 'valor':
+        return reais_texto(valor)
+    return valor
+
+
+def gerar_linhas(query, formato):
+    """Gera o arquivo em pedaços de texto, um lote de linhas por vez"""
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato inválido: {formato}')
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if formato == 'csv' else None
+    if writer:
+        writer.writerow(CAMPOS)
+
+    for particao in db.session.execute(query).partitions():
+        for row in particao:
+            valores = [_valor(c, v) for c, v in zip(CAMPOS, row)]
+            if writer:
+                writer.writerow([_celula_csv(c, v) for c, v in zip(CAMPOS, valores)])
+            else:
+                buffer.write(json.dumps(dict(zip(CAMPOS, valores)), ensure_ascii=False))
+                buffer.write('\n')
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_stream(pedacos, nivel=6):
+    """Comprime um gerador de texto em gzip sob demanda"""
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)  # wbits=31: cabeçalho gzip
+    for pedaco in pedacos:
+        dados = compressor.compress(pedaco.encode('utf-8'))
+        if dados:
+            yield dados
+    yield compressor.flush()
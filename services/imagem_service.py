@@ -0,0 +1,217 @@
+"""
+Pipeline de imagens dos presentes: variantes redimensionadas em WebP/AVIF
+guardadas num cache em disco endereçado por conteúdo, e srcset para os templates.
+No render, variantes já no disco (do build) são reconhecidas pelo hash sem
+decodificar a imagem; se faltarem, o card sai sem srcset e a geração vai para a
+fila em background (services/resiliencia.adiar), fora da thread da requisição.
+"""
+import hashlib
+import os
+import threading
+import time
+from security import logger
+from services.resiliencia import adiar
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+# Variantes ficam em static/cache/imagens/<hash do original>/<largura>.<formato>
+CACHE_DIR = os.path.join(STATIC_DIR, 'cache', 'imagens')
+CACHE_URL = '/static/cache/imagens'
+
+# Larguras geradas (os cards exibem ~300px; 480 cobre telas 2x no celular)
+LARGURAS = (160, 240, 320, 480)
+
+# Ordem de preferência no <picture>: o navegador usa o primeiro que suportar
+FORMATOS = ('avif', 'webp')
+QUALIDADE = {'avif': 50, 'webp': 75}
+
+# Atributo sizes padrão para os cards (col-12 / col-md-6 / col-lg-4)
+SIZES_CARD = '(min-width: 992px) 300px, (min-width: 768px) 45vw, 90vw'
+
+# Falha na geração (imagem corrompida, erro do Pillow) fica memorizada por este tempo
+# (segundos): sem isso cada render tentaria decodificar a imagem de novo
+FALHA_TTL = 60
+
+_lock = threading.Lock()
+_variantes = {}  # imagem_url -> (mtime, tamanho, {formato: [(largura, url, bytes)]}, expira ou None)
+_agendadas = set()  # imagem_url com geração na fila
+
+
+def _formatos_suportados():
+    """Formatos que o Pillow instalado consegue gravar"""
+    try:
+        from PIL import features
+    except ImportError:
+        return ()
+    return tuple(f for f in FORMATOS if features.check(f))
+
+
+def resolver_origem(imagem_url):
+    """Caminho local da imagem original, ou None se não for um arquivo em /static"""
+    if not imagem_url or not imagem_url.startswith('/static/') or imagem_url.startswith(CACHE_URL):
+        return None
+    caminho = os.path.normpath(os.path.join(STATIC_DIR, imagem_url[len('/static/'):]))
+    if not caminho.startswith(STATIC_DIR + os.sep) or not os.path.isfile(caminho):
+        return None
+    return caminho
+
+
+def _hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(65536), b''):
+            h.update(bloco)
+    return h.hexdigest()[:16]
+
+
+def _gerar(caminho, digest, formatos):
+    """Gera (ou reaproveita do disco) as variantes de uma imagem"""
+    from PIL import Image
+
+    destino = os.path.join(CACHE_DIR, digest)
+    os.makedirs(destino, exist_ok=True)
+    resultado = {formato: [] for formato in formatos}
+
+    with Image.open(caminho) as original:
+        # Os pixels só são decodificados no primeiro resize (se faltar alguma variante)
+        larguras = sorted({min(l, original.width) for l in LARGURAS})
+        for formato in formatos:
+            for largura in larguras:
+                arquivo = os.path.join(destino, f'{largura}.{formato}')
+                if not os.path.exists(arquivo):
+                    altura = max(1, round(original.height * largura / original.width))
+                    variante = original.resize((largura, altura), Image.LANCZOS)
+                    temporario = f'{arquivo}.{os.getpid()}.tmp'
+                    variante.save(temporario, format=formato.upper(), quality=QUALIDADE[formato])
+                    os.replace(temporario, arquivo)
+                resultado[formato].append(
+                    (largura, f'{CACHE_URL}/{digest}/{largura}.{formato}', os.path.getsize(arquivo))
+                )
+    return resultado
+
+
+def _do_disco(caminho, formatos):
+    """
+    Variantes já gravadas no disco (gerar_imagens.py no build, ou outro worker),
+    lendo só o cabeçalho da imagem; None se faltar alguma
+    """
+    from PIL import Image
+
+    digest = _hash_arquivo(caminho)
+    with Image.open(caminho) as original:
+        larguras = sorted({min(l, original.width) for l in LARGURAS})
+    resultado = {}
+    for formato in formatos:
+        resultado[formato] = []
+        for largura in larguras:
+            try:
+                tamanho = os.path.getsize(os.path.join(CACHE_DIR, digest, f'{largura}.{formato}'))
+            except OSError:
+                return None
+            resultado[formato].append((largura, f'{CACHE_URL}/{digest}/{largura}.{formato}', tamanho))
+    return resultado
+
+
+def _memorizadas(imagem_url, stat):
+    """Variantes já geradas para este arquivo ({} se a geração falhou há pouco), ou None"""
+    registro = _variantes.get(imagem_url)
+    if not registro or registro[:2] != (stat.st_mtime, stat.st_size):
+        return None
+    if registro[3] is not None and registro[3] <= time.monotonic():
+        return None
+    return registro[2]
+
+
+def gerar_variantes(imagem_url, gerar=True):
+    """
+    Retorna as variantes de uma imagem, gerando-as sob demanda.
+    Formato: {formato: [(largura, url, bytes), ...]}; vazio se não houver Pillow
+    ou se a imagem não for local. Com gerar=False, None se ainda não foram geradas.
+    """
+    caminho = resolver_origem(imagem_url)
+    formatos = _formatos_suportados()
+    if not caminho or not formatos:
+        return {}
+
+    try:
+        stat = os.stat(caminho)
+    except OSError:
+        return {}  # removida depois de resolver_origem
+    variantes = _memorizadas(imagem_url, stat)
+    if variantes is not None:
+        return variantes
+    if not gerar:
+        # Depois de subir o worker o dicionário está vazio, mas o build já deixou as
+        # variantes no disco: sem isso o primeiro render (e o snapshot/cache dele) sairia sem srcset
+        if imagem_url in _agendadas:
+            return None
+        try:
+            variantes = _do_disco(caminho, formatos)
+        except Exception:
+            return None  # imagem ilegível: a geração na fila registra a falha
+        if variantes is not None:
+            _variantes[imagem_url] = (stat.st_mtime, stat.st_size, variantes, None)
+        return variantes
+
+    with _lock:
+        variantes = _memorizadas(imagem_url, stat)
+        if variantes is not None:
+            return variantes
+        try:
+            variantes = _gerar(caminho, _hash_arquivo(caminho), formatos)
+        except Exception as e:
+            logger.error("imagem_variantes_erro", imagem_url=imagem_url, error=str(e))
+            _variantes[imagem_url] = (stat.st_mtime, stat.st_size, {}, time.monotonic() + FALHA_TTL)
+            return {}
+        _variantes[imagem_url] = (stat.st_mtime, stat.st_size, variantes, None)
+        return variantes
+
+
+def _gerar_adiada(imagem_url):
+    try:
+        gerar_variantes(imagem_url)
+    finally:
+        _agendadas.discard(imagem_url)
+
+
+def srcsets(imagem_url):
+    """{formato: 'url 160w, url 240w, ...'} para os <source> de um <picture>"""
+    variantes = gerar_variantes(imagem_url, gerar=False)
+    if variantes is None:
+        # Decodificar e codificar AVIF/WebP custa centenas de ms: o card sai só com a
+        # imagem original e as variantes entram nos próximos renders
+        if imagem_url not in _agendadas:
+            _agendadas.add(imagem_url)
+            if not adiar(_gerar_adiada, imagem_url, tentativas=1):
+                _agendadas.discard(imagem_url)
+        return {}
+    return {
+        formato: ', '.join(f'{url} {largura}w' for largura, url, _ in itens)
+        for formato, itens in variantes.items()
+    }
+
+
+def relatorio(imagens):
+    """Gera as variantes de várias imagens e calcula os bytes economizados"""
+    linhas = []
+    for imagem_url in imagens:
+        caminho = resolver_origem(imagem_url)
+        variantes = gerar_variantes(imagem_url)
+        if not caminho or not variantes:
+            continue
+        original = os.path.getsize(caminho)
+        # Pior caso no celular: a maior variante do formato mais leve
+        maior_por_formato = [itens[-1][2] for itens in variantes.values()]
+        linhas.append({
+            'imagem_url': imagem_url,
+            'original_bytes': original,
+            'variante_bytes': min(maior_por_formato),
+            'economia_bytes': original - min(maior_por_formato)
+        })
+    return linhas
+
+
+def init_imagens(app):
+    """Disponibiliza os helpers de imagem nos templates"""
+    app.jinja_env.globals.update(srcsets_imagem=srcsets, sizes_card=SIZES_CARD)
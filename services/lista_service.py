@@ -0,0 +1,150 @@
+"""
+Modo multi-lista: cada Lista (casal) tem seus presentes, resolvida pelo
+domínio da requisição ou pelo prefixo /l/<slug>/ da URL.
+"""
+import re
+from flask import g, request, abort
+from config import Config
+from database import db
+from lru_cache import LRUCache
+from models.lista import Lista, LISTA_PADRAO_ID
+from security import logger
+from services import pix_service
+
+# Prefixo das listas servidas por caminho: /l/<slug>/...
+PREFIXO_RE = re.compile(r'^/l/([a-z0-9][a-z0-9-]{0,59})(/.*)?$')
+
+# Resolução domínio/slug -> lista, cacheada por worker (invalidada por TTL)
+_listas = LRUCache(max_itens=Config.LISTAS_CACHE_MAX, ttl=Config.LISTAS_CACHE_TTL)
+
+
+class ListaInfo:
+    """Dados da lista usados a cada requisição (sem objeto ORM nem sessão)"""
+    __slots__ = ('id', 'slug', 'noivo_nome', 'data_casamento', 'chave_pix', 'chave_pix_tipo')
+
+    def __init__(self, id, slug, noivo_nome, data_casamento, chave_pix, chave_pix_tipo=None):
+        self.id = id
+        self.slug = slug
+        self.noivo_nome = noivo_nome
+        self.data_casamento = data_casamento
+        # Só a lista padrão recebe na chave global (PIX_CHAVE): a de outro casal sem chave
+        # própria fica sem PIX, nunca com a chave de outra pessoa
+        if id == LISTA_PADRAO_ID:
+            if not chave_pix:
+                chave_pix = Config.PIX_CHAVE
+            chave_pix_tipo = chave_pix_tipo or Config.PIX_TIPO_CHAVE
+        # Chave já no formato do DICT; sem tipo para uma chave ambígua, sem PIX (não adivinha)
+        try:
+            self.chave_pix = pix_service.normalizar_chave(chave_pix, chave_pix_tipo) or None
+        except ValueError as e:
+            logger.error("lista_chave_pix_invalida", lista_id=id, error=str(e))
+            self.chave_pix = None
+        self.chave_pix_tipo = chave_pix_tipo
+
+
+def lista_padrao_info():
+    """Lista padrão montada da Config (modo de um casal só)"""
+    return ListaInfo(LISTA_PADRAO_ID, 'padrao', Config.NOIVO_NOME, Config.DATA_CASAMENTO, Config.PIX_CHAVE)
+
+
+def garantir_lista_padrao():
+    """Cria a lista padrão (id 1) se ainda não existir"""
+    if db.session.get(Lista, LISTA_PADRAO_ID) is None:
+        db.session.add(Lista(
+            id=LISTA_PADRAO_ID,
+            slug='padrao',
+            noivo_nome=Config.NOIVO_NOME,
+            data_casamento=Config.DATA_CASAMENTO,
+            chave_pix=Config.PIX_CHAVE,
+            chave_pix_tipo=Config.PIX_TIPO_CHAVE
+        ))
+        db.session.commit()
+
+
+def criar_lista(slug, noivo_nome, data_casamento, chave_pix=None, dominio=None, chave_pix_tipo=None):
+    """Cria uma nova lista de presentes (chave só com dígitos exige chave_pix_tipo)"""
+    if not PREFIXO_RE.match(f'/l/{slug}'):
+        raise ValueError('Slug inválido: use letras minúsculas, números e hífens')
+    if not (chave_pix or '').strip():
+        raise ValueError('Chave PIX obrigatória: cada lista recebe na chave do próprio casal')
+    pix_service.normalizar_chave(chave_pix, chave_pix_tipo)  # ValueError se ambígua ou inválida
+    lista = Lista(slug=slug, noivo_nome=noivo_nome, data_casamento=data_casamento,
+                  chave_pix=chave_pix, chave_pix_tipo=chave_pix_tipo, dominio=dominio)
+    db.session.add(lista)
+    db.session.commit()
+    return lista
+
+
+def _buscar(coluna, valor):
+    chave = (coluna, valor)
+    info = _listas.get(chave)
+    if info is None:
+        lista = db.session.execute(
+            db.select(Lista.id, Lista.slug, Lista.noivo_nome, Lista.data_casamento, Lista.chave_pix,
+                      Lista.chave_pix_tipo)
+            .where(getattr(Lista, coluna) == valor, Lista.ativo.is_(True))
+        ).first()
+        # Guarda também a ausência para não consultar o banco a cada requisição
+        info = ListaInfo(*lista) if lista else False
+        _listas.set(chave, info)
+    return info or None
+
+
+def lista_por_slug(slug):
+    return _buscar('slug', slug)
+
+
+def lista_por_dominio(dominio):
+    return _buscar('dominio', dominio)
+
+
+def lista_atual():
+    """Lista da requisição atual (a padrão fora de uma requisição)"""
+    return g.get('lista') or lista_padrao_info()
+
+
+def invalidar_listas():
+    _listas.clear()
+
+
+class ListaPathMiddleware:
+    """
+    Move o prefixo /l/<slug> de PATH_INFO para SCRIPT_NAME: as rotas existentes
+    atendem a lista sem duplicação e url_for gera links com o prefixo.
+    """
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        match = PREFIXO_RE.match(environ.get('PATH_INFO', ''))
+        if match:
+            slug = match.group(1)
+            environ['lista.slug'] = slug
+            environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + f'/l/{slug}'
+            environ['PATH_INFO'] = match.group(2) or '/'
+        return self.wsgi_app(environ, start_response)
+
+
+def init_listas(app):
+    """Garante a lista padrão e resolve a lista de cada requisição"""
+    with app.app_context():
+        garantir_lista_padrao()
+
+    if not Config.MULTI_LISTA:
+        return app
+
+    app.wsgi_app = ListaPathMiddleware(app.wsgi_app)
+
+    @app.before_request
+    def resolver_lista():
+        slug = request.environ.get('lista.slug')
+        if slug:
+            lista = lista_por_slug(slug)
+            if lista is None:
+                abort(404)
+        else:
+            lista = lista_por_dominio(request.host.split(':')[0].lower())
+        g.lista = lista or lista_padrao_info()
+
+    logger.info("multi_lista_ativado")
+    return app
@@ -0,0 +1,176 @@
+"""
+Cliente da API REST do Mercado Pago (consultas de pagamentos e merchant
+orders). As respostas seguem o formato do SDK oficial: {'status': <http>,
+'response': <json>}. MERCADOPAGO_API_URL permite apontar para o stub local
+(scripts/mercadopago_stub.py).
+
+Todas as instâncias do processo compartilham uma requests.Session (keep-alive
+e pool do urllib3, sem novo handshake TLS por chamada), com timeouts de conexão
+e de leitura explícitos. Consultas de pagamento e merchant order por id ficam
+num cache curto (MERCADOPAGO_CACHE_TTL), que absorve as rajadas de webhooks
+sobre o mesmo pagamento.
+
+As chamadas passam pelo disjuntor 'mercadopago' (services/resiliencia.py): com
+a API fora, falham na hora em vez de segurar a thread até o timeout; dentro de
+uma requisição, o timeout de leitura nunca passa do prazo que resta a ela.
+Falhas transitórias (rede, 429, 5xx) têm novas tentativas com backoff e jitter
+(com_retry), também limitadas ao prazo; com o circuito aberto não há retry.
+"""
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+from lru_cache import LRUCache
+from metrics import metrics
+from services.resiliencia import CircuitoAberto, com_retry, disjuntor, prazo_restante
+
+
+class MercadoPagoErro(Exception):
+    """Falha de rede, resposta 429/5xx ou circuito aberto: vale tentar de novo mais tarde"""
+
+    def __init__(self, mensagem, status=None):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class CircuitoAbertoErro(MercadoPagoErro, CircuitoAberto):
+    """Chamada recusada pelo disjuntor, sem tocar na rede (a fila de retentativas espera ele fechar)"""
+
+    def __init__(self, restante):
+        CircuitoAberto.__init__(self, 'mercadopago', restante)
+        self.status = None
+
+
+class _Cliente:
+    sessao = None
+    adaptador = None
+
+
+_lock = threading.Lock()
+
+# Respostas 200 de consultas idempotentes por id
+_respostas = LRUCache(max_itens=Config.MERCADOPAGO_CACHE_MAX, ttl=Config.MERCADOPAGO_CACHE_TTL)
+
+
+def sessao_http():
+    """requests.Session do processo, criada no primeiro uso (e de novo depois de um fork)"""
+    if _Cliente.sessao is None:
+        with _lock:
+            if _Cliente.sessao is None:
+                sessao = requests.Session()
+                # Sem retries do urllib3: quem chama decide (reconciliação, webhooks)
+                adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=Config.MERCADOPAGO_POOL_MAX, max_retries=0)
+                sessao.mount('https://', adaptador)
+                sessao.mount('http://', adaptador)
+                _Cliente.adaptador = adaptador
+                _Cliente.sessao = sessao
+    return _Cliente.sessao
+
+
+def _descartar_sessao():
+    # Conexões herdadas do processo pai não podem ser compartilhadas (gunicorn com preload_app)
+    _Cliente.sessao = None
+    _Cliente.adaptador = None
+    _respostas.clear()
+
+
+os.register_at_fork(after_in_child=_descartar_sessao)
+
+
+def estatisticas_pool():
+    """Conexões abertas x requisições feitas pelo pool (reuso = 1 - conexões/requisições)"""
+    conexoes = requisicoes = 0
+    if _Cliente.adaptador is not None:
+        pools = _Cliente.adaptador.poolmanager.pools
+        for chave in list(pools.keys()):
+            pool = pools.get(chave)
+            if pool is not None:
+                conexoes += pool.num_connections
+                requisicoes += pool.num_requests
+    return {
+        'conexoes_abertas': conexoes,
+        'requisicoes': requisicoes,
+        'reuso': round(1 - conexoes / requisicoes, 3) if requisicoes else None,
+        'cache': _respostas.stats(),
+    }
+
+
+metrics.registrar_fonte('mercadopago', estatisticas_pool)
+
+
+class MercadoPagoService:
+    def __init__(self, access_token=None, base_url=None):
+        self.access_token = access_token or Config.MERCADOPAGO_ACCESS_TOKEN
+        self.base_url = (base_url or Config.MERCADOPAGO_API_URL).rstrip('/')
+
+    def _get(self, caminho, params=None, cache=False):
+        cache = cache and Config.MERCADOPAGO_CACHE_TTL > 0
+        chave = (self.base_url, self.access_token, caminho)
+        if cache:
+            guardada = _respostas.get(chave)
+            if guardada is not None:
+                return guardada
+
+        conexao, leitura = Config.MERCADOPAGO_CONNECT_TIMEOUT, Config.MERCADOPAGO_READ_TIMEOUT
+        restante = prazo_restante()
+        if restante is not None:
+            if restante <= 0:
+                raise MercadoPagoErro(f'{caminho}: prazo da requisição esgotado')
+            conexao, leitura = min(conexao, restante), min(leitura, restante)
+
+        circuito = disjuntor('mercadopago')
+        if not circuito.permitir():
+            raise CircuitoAbertoErro(circuito.restante_aberto())
+
+        headers = {'Authorization': f'Bearer {self.access_token}'} if self.access_token else {}
+        inicio = time.perf_counter()
+        try:
+            resposta = sessao_http().get(
+                f'{self.base_url}{caminho}', params=params, headers=headers, timeout=(conexao, leitura)
+            )
+        except requests.RequestException as e:
+            circuito.falha()
+            metrics.incr('mercadopago.erros')
+            raise MercadoPagoErro(f'{caminho}: {e}') from e
+        except BaseException:
+            circuito.falha()
+            raise
+        finally:
+            metrics.observe('mercadopago.latencia_ms', (time.perf_counter() - inicio) * 1000)
+
+        if resposta.status_code == 429 or resposta.status_code >= 500:
+            circuito.falha()
+            metrics.incr('mercadopago.erros')
+            raise MercadoPagoErro(f'{caminho}: HTTP {resposta.status_code}', resposta.status_code)
+        circuito.sucesso()
+        try:
+            corpo = resposta.json()
+        except ValueError:
+            corpo = None
+        resultado = {'status': resposta.status_code, 'response': corpo}
+        if cache and resposta.status_code == 200:
+            _respostas.set(chave, resultado)
+        return resultado
+
+    def _consultar(self, caminho, params=None, cache=False):
+        """_get com retries; o disjuntor já fica dentro de _get (CircuitoAbertoErro não é repetido)"""
+        return com_retry(self._get, caminho, params, cache, tentativas=Config.MERCADOPAGO_TENTATIVAS,
+                         excecoes=(MercadoPagoErro,))
+
+    def consultar_pagamento(self, payment_id, cache=True):
+        """Pagamento pelo id (404 -> response com a mensagem de erro)"""
+        return self._consultar(f'/v1/payments/{payment_id}', cache=cache)
+
+    def buscar_pagamentos(self, external_reference):
+        """Pagamentos de uma referência externa (id da contribuição), mais recente primeiro"""
+        return self._consultar('/v1/payments/search', {
+            'external_reference': external_reference, 'sort': 'date_created', 'criteria': 'desc'
+        })
+
+    def consultar_merchant_order(self, order_id, cache=True):
+        return self._consultar(f'/merchant_orders/{order_id}', cache=cache)
+
+    def testar_credenciais(self):
+        return self._get('/users/me')['status'] == 200
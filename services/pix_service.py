@@ -0,0 +1,204 @@
+"""
+PIX "copia e cola": payload BR Code (padrão EMV do Banco Central) com o valor
+e o txid da contribuição, e o QR Code desse payload em SVG ou PNG.
+
+Montar o payload custa microssegundos; o QR (Reed-Solomon, escolha de máscara
+e desenho) é o caro. As imagens ficam num LRU limitado em bytes e chaveado
+pelo payload, que é determinado por (chave da lista, valor, txid): o modal
+reaberto ou a página recarregada não refazem o QR.
+"""
+import hashlib
+import hmac
+import io
+import re
+import unicodedata
+from config import Config
+from dinheiro import reais_texto
+from lru_cache import LRUCache
+from metrics import metrics
+
+# CRC16-CCITT (polinômio 0x1021, valor inicial 0xFFFF), exigido no campo 63
+_TABELA_CRC = []
+for _byte in range(256):
+    _crc = _byte << 8
+    for _ in range(8):
+        _crc = ((_crc << 1) ^ 0x1021) if _crc & 0x8000 else (_crc << 1)
+    _TABELA_CRC.append(_crc & 0xFFFF)
+
+
+def crc16(dados):
+    crc = 0xFFFF
+    for byte in dados:
+        crc = ((crc << 8) & 0xFFFF) ^ _TABELA_CRC[((crc >> 8) ^ byte) & 0xFF]
+    return crc
+
+
+def _campo(identificador, valor):
+    """Campo TLV do EMV: id (2 dígitos) + tamanho (2 dígitos) + valor"""
+    if len(valor) > 99:
+        raise ValueError(f'Campo {identificador} do PIX maior que 99 caracteres')
+    return f'{identificador}{len(valor):02d}{valor}'
+
+
+def _texto_ascii(texto, limite):
+    """Nome e cidade do recebedor: sem acentos, só caracteres aceitos pelos bancos"""
+    texto = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode()
+    return re.sub(r'[^A-Za-z0-9 .&-]', '', texto).strip()[:limite] or 'N/A'
+
+
+def _cpf_valido(digitos):
+    if len(digitos) != 11 or digitos == digitos[0] * 11:
+        return False
+    for tamanho in (9, 10):
+        soma = sum(int(d) * (tamanho + 1 - i) for i, d in enumerate(digitos[:tamanho]))
+        if (soma * 10) % 11 % 10 != int(digitos[tamanho]):
+            return False
+    return True
+
+
+# Tipos de chave do DICT (PIX_TIPO_CHAVE, Lista.chave_pix_tipo)
+TIPOS_CHAVE = ('cpf', 'cnpj', 'telefone', 'email', 'aleatoria')
+
+
+def normalizar_chave(chave, tipo=None):
+    """
+    Chave no formato do DICT: e-mail em minúsculas, CPF/CNPJ só dígitos,
+    telefone em +55DDDNUMERO (o cadastro costuma ter só DDD + número) e
+    chave aleatória como está. O tipo não é adivinhado: só dígitos com 10 ou
+    11 posições pode ser CPF ou celular (parte dos celulares passa no dígito
+    verificador do CPF), então sem `tipo` é ValueError.
+    """
+    chave = (chave or '').strip()
+    if not chave:
+        return ''
+    if tipo is not None and tipo not in TIPOS_CHAVE:
+        raise ValueError(f'Tipo de chave PIX inválido: {tipo}')
+    digitos = re.sub(r'\D', '', chave)
+    if tipo is None:
+        if '@' in chave:
+            tipo = 'email'
+        elif chave.startswith('+'):
+            tipo = 'telefone'
+        elif not re.fullmatch(r'[\d.\-/() ]+', chave):
+            tipo = 'aleatoria'
+        elif len(digitos) == 14:
+            tipo = 'cnpj'
+        else:
+            raise ValueError('Chave PIX só com dígitos: informe o tipo (cpf ou telefone)')
+
+    if tipo == 'email':
+        return chave.lower()
+    if tipo == 'telefone':
+        if chave.startswith('+'):
+            return '+' + digitos
+        if len(digitos) not in (10, 11):
+            raise ValueError('Telefone PIX: DDD + número ou +55...')
+        return '+55' + digitos
+    if tipo == 'cpf':
+        if not _cpf_valido(digitos):
+            raise ValueError('CPF da chave PIX inválido')
+        return digitos
+    if tipo == 'cnpj':
+        if len(digitos) != 14:
+            raise ValueError('CNPJ da chave PIX inválido')
+        return digitos
+    return chave
+
+
+def txid_contribuicao(contribuicao_id):
+    """txid do PIX: o id da contribuição (alfanumérico, até 25 caracteres)"""
+    return str(contribuicao_id)
+
+
+def gerar_payload(chave, valor_centavos, txid, nome, cidade, tipo=None):
+    """Payload "copia e cola" de um PIX estático com valor e txid"""
+    if not re.fullmatch(r'[A-Za-z0-9]{1,25}', txid):
+        raise ValueError(f'txid inválido: {txid!r}')
+    chave = normalizar_chave(chave, tipo)
+    if not chave:
+        raise ValueError('Chave PIX não configurada')
+    conta = _campo('00', 'br.gov.bcb.pix') + _campo('01', chave)
+    payload = (
+        _campo('00', '01')
+        + _campo('26', conta)
+        + _campo('52', '0000')
+        + _campo('53', '986')  # BRL
+        + (_campo('54', reais_texto(valor_centavos)) if valor_centavos else '')
+        + _campo('58', 'BR')
+        + _campo('59', _texto_ascii(nome, 25))
+        + _campo('60', _texto_ascii(cidade, 15))
+        + _campo('62', _campo('05', txid))
+        + '6304'
+    )
+    return payload + f'{crc16(payload.encode()):04X}'
+
+
+def payload_lista(lista, valor_centavos, txid):
+    """Payload para a chave PIX da lista (ListaInfo, chave já normalizada; só a lista padrão usa a global)"""
+    return gerar_payload(lista.chave_pix, valor_centavos, txid,
+                         lista.noivo_nome, Config.PIX_CIDADE, lista.chave_pix_tipo)
+
+
+# --- QR Code -----------------------------------------------------------------
+
+MIMETYPES = {'svg': 'image/svg+xml', 'png': 'image/png'}
+
+# (formato, payload) -> bytes da imagem
+_imagens = LRUCache(max_bytes=Config.PIX_QR_CACHE_MAX_BYTES)
+
+
+def formatos_qr():
+    """Formatos que dá para gerar: qrcode instalado (SVG) e Pillow (PNG)"""
+    try:
+        import qrcode  # noqa: F401
+    except ImportError:
+        return ()
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return ('svg',)
+    return ('svg', 'png')
+
+
+def _desenhar_qr(payload, formato):
+    import qrcode
+    from qrcode.image.svg import SvgPathImage
+
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=8, border=4)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    if formato == 'svg':
+        return qr.make_image(image_factory=SvgPathImage).to_string()
+    saida = io.BytesIO()
+    qr.make_image().save(saida, format='PNG', optimize=True)
+    return saida.getvalue()
+
+
+def renderizar_qr(payload, formato='svg', usar_cache=True):
+    """Bytes do QR Code do payload no formato pedido ('svg' ou 'png')"""
+    if formato not in MIMETYPES:
+        raise ValueError(f'Formato de QR Code inválido: {formato!r}')
+    chave = (formato, payload)
+    imagem = _imagens.get(chave) if usar_cache else None
+    if imagem is None:
+        imagem = _desenhar_qr(payload, formato)
+        metrics.incr('pix.qr_gerados')
+        if usar_cache:
+            _imagens.set(chave, imagem)
+    return imagem
+
+
+def assinatura_qr(lista_id, valor_centavos, txid):
+    """
+    Assina (lista, valor, txid) na URL do QR: a rota desenha sem ir ao banco,
+    e ninguém enche o cache (nem gasta CPU) com valores inventados.
+    """
+    mensagem = f'pix:{lista_id}:{valor_centavos}:{txid}'.encode()
+    return hmac.new(Config.SECRET_KEY.encode(), mensagem, hashlib.sha256).hexdigest()[:20]
+
+
+def assinatura_valida(lista_id, valor_centavos, txid, assinatura):
+    return hmac.compare_digest(assinatura_qr(lista_id, valor_centavos, txid), assinatura or '')
+
+
+metrics.registrar_fonte('pix_qr', _imagens.stats)
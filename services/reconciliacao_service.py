@@ -0,0 +1,158 @@
+"""
+Reconciliação de contribuições pendentes com o Mercado Pago, para os webhooks
+perdidos. As pendentes são lidas em lotes por keyset (id > último do lote
+anterior), consultadas em paralelo num pool de threads limitado e dentro de um
+orçamento de consultas por segundo do provedor; as mudanças de status e os
+incrementos de valor_arrecadado de cada lote são gravados numa transação só.
+"""
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from config import Config
+from database import db
+from metrics import metrics
+from models.contribuicao import Contribuicao
+from models.presente import Presente
+from security import logger
+from services.agregados_service import STATUS_CONFIRMADOS
+from services.mercado_pago_service import MercadoPagoErro, MercadoPagoService
+
+# Ainda sem desfecho: continuam na fila da reconciliação
+STATUS_PENDENTES = ('pendente', 'pending', 'in_process', 'authorized')
+
+
+class LimiteTaxa:
+    """Token bucket compartilhado entre threads: até `taxa` consultas/s, com rajada de `rajada`"""
+
+    def __init__(self, taxa, rajada=None):
+        self.taxa = taxa
+        self.capacidade = rajada or max(1.0, taxa)
+        self._tokens = self.capacidade
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        if not self.taxa:
+            return
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.taxa
+            time.sleep(espera)
+
+
+# Um orçamento por provedor, compartilhado por todas as reconciliações do processo
+_limites = {}
+_limites_lock = threading.Lock()
+
+
+def limite_do_provedor(provedor='mercadopago', taxa=None):
+    with _limites_lock:
+        if provedor not in _limites:
+            _limites[provedor] = LimiteTaxa(Config.RECONCILIACAO_TAXA if taxa is None else taxa)
+        return _limites[provedor]
+
+
+def _consultar(servico, limite, contribuicao_id, payment_id):
+    """(pagamento ou None, erro ou None) de uma contribuição; roda nas threads do pool"""
+    limite.aguardar()
+    try:
+        if payment_id:
+            # Sem cache: a reconciliação existe justamente para ver o status atual
+            resposta = servico.consultar_pagamento(payment_id, cache=False)
+            return (resposta['response'] if resposta['status'] == 200 else None), None
+        # Sem payment_id (webhook nunca chegou): busca pela referência externa
+        resposta = servico.buscar_pagamentos(str(contribuicao_id))
+        pagamentos = (resposta['response'] or {}).get('results') or [] if resposta['status'] == 200 else []
+        aprovado = next((p for p in pagamentos if p.get('status') in STATUS_CONFIRMADOS), None)
+        return aprovado or (pagamentos[0] if pagamentos else None), None
+    except MercadoPagoErro as e:
+        return None, str(e)
+
+
+def _aplicar(contribuicoes, resultados, relatorio):
+    """Grava o lote numa transação: status, payment_id e incrementos por presente"""
+    incrementos = defaultdict(int)
+    for contribuicao, (pagamento, erro) in zip(contribuicoes, resultados):
+        if erro:
+            relatorio['erros'] += 1
+            continue
+        status = (pagamento or {}).get('status')
+        if not status:
+            relatorio['sem_pagamento'] += 1
+            continue
+        if status in STATUS_PENDENTES:
+            continue
+        if not contribuicao.payment_id and pagamento.get('id'):
+            contribuicao.payment_id = str(pagamento['id'])
+        contribuicao.status = status
+        relatorio['atualizadas'] += 1
+        if status in STATUS_CONFIRMADOS:
+            relatorio['aprovadas'] += 1
+            incrementos[contribuicao.presente_id] += contribuicao.valor_centavos
+
+    # Incremento no SQL: não perde contribuições gravadas por requisições no meio do lote
+    for presente_id, centavos in incrementos.items():
+        db.session.execute(
+            db.update(Presente).where(Presente.id == presente_id)
+            .values(valor_arrecadado_centavos=db.func.coalesce(Presente.valor_arrecadado_centavos, 0) + centavos)
+        )
+    db.session.commit()
+
+
+def reconciliar(lote=None, threads=None, idade_minima=None, servico=None, limite=None):
+    """
+    Percorre todas as pendentes criadas há mais de `idade_minima` segundos e
+    devolve um relatório com contagens e tempos por lote.
+    """
+    lote = lote or Config.RECONCILIACAO_LOTE
+    threads = threads or Config.RECONCILIACAO_THREADS
+    idade_minima = Config.RECONCILIACAO_IDADE_MINIMA if idade_minima is None else idade_minima
+    servico = servico or MercadoPagoService()
+    limite = limite or limite_do_provedor()
+
+    corte = datetime.utcnow() - timedelta(seconds=idade_minima)
+    relatorio = {'lotes': 0, 'consultadas': 0, 'atualizadas': 0, 'aprovadas': 0,
+                 'sem_pagamento': 0, 'erros': 0, 'segundos': 0.0, 'ms_por_lote': []}
+    inicio = time.perf_counter()
+    ultimo_id = 0
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='reconciliacao') as pool:
+        while True:
+            contribuicoes = (
+                Contribuicao.query
+                .filter(Contribuicao.status.in_(STATUS_PENDENTES),
+                        Contribuicao.id > ultimo_id,
+                        Contribuicao.created_at <= corte)
+                .order_by(Contribuicao.id)
+                .limit(lote)
+                .all()
+            )
+            if not contribuicoes:
+                break
+            ultimo_id = contribuicoes[-1].id
+
+            inicio_lote = time.perf_counter()
+            # As threads só recebem ids: objetos da sessão ficam na thread principal
+            resultados = list(pool.map(
+                lambda c: _consultar(servico, limite, *c),
+                [(c.id, c.payment_id) for c in contribuicoes]
+            ))
+            _aplicar(contribuicoes, resultados, relatorio)
+
+            relatorio['lotes'] += 1
+            relatorio['consultadas'] += len(contribuicoes)
+            relatorio['ms_por_lote'].append(round((time.perf_counter() - inicio_lote) * 1000, 1))
+
+    relatorio['segundos'] = round(time.perf_counter() - inicio, 3)
+    for chave in ('consultadas', 'atualizadas', 'aprovadas', 'erros'):
+        metrics.incr(f'reconciliacao.{chave}', relatorio[chave])
+    logger.info("reconciliacao_concluida", **{k: v for k, v in relatorio.items() if k != 'ms_por_lote'})
+    return relatorio
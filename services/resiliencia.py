@@ -0,0 +1,268 @@
+"""
+Resiliência das chamadas a dependências externas (Mercado Pago).
+
+- Disjuntor (circuit breaker) por dependência, compartilhado pelas threads do
+  worker: depois de DISJUNTOR_FALHAS falhas seguidas abre e as chamadas falham
+  na hora, sem ocupar a thread da requisição com timeouts; passados
+  DISJUNTOR_ABERTO_SEGUNDOS deixa passar uma chamada de teste (meio aberto),
+  que fecha ou reabre o circuito.
+- com_retry: novas tentativas com backoff exponencial e jitter, que nunca
+  dormem além do prazo da requisição atual (REQUEST_DEADLINE_SEGUNDOS).
+- adiar: o que pode esperar (reconsultas, notificações) vai para uma fila em
+  background com seus próprios retries, fora da thread da requisição.
+"""
+import functools
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import nullcontext
+from flask import current_app, g, has_app_context, has_request_context
+from config import Config
+from metrics import metrics
+from security import logger
+
+
+class CircuitoAberto(Exception):
+    """A dependência está fora: a chamada nem foi tentada"""
+
+    def __init__(self, nome, restante):
+        super().__init__(f'circuito {nome} aberto (mais {restante:.1f}s)')
+        self.nome = nome
+        self.restante = restante
+
+
+class Disjuntor:
+    FECHADO = 'fechado'
+    ABERTO = 'aberto'
+    MEIO_ABERTO = 'meio_aberto'
+
+    def __init__(self, nome, falhas=None, aberto_segundos=None):
+        self.nome = nome
+        self.limite_falhas = Config.DISJUNTOR_FALHAS if falhas is None else falhas
+        self.aberto_segundos = Config.DISJUNTOR_ABERTO_SEGUNDOS if aberto_segundos is None else aberto_segundos
+        self.estado = self.FECHADO
+        self.falhas = 0
+        self._aberto_ate = 0.0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    def restante_aberto(self):
+        return max(0.0, self._aberto_ate - time.monotonic())
+
+    def permitir(self):
+        """True se a chamada pode seguir; quem recebe True deve chamar sucesso() ou falha()"""
+        if not self.limite_falhas:
+            return True
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return True
+            if self.estado == self.ABERTO:
+                if time.monotonic() < self._aberto_ate:
+                    metrics.incr(f'disjuntor.{self.nome}.rejeitadas')
+                    return False
+                self.estado = self.MEIO_ABERTO
+                self._teste_em_andamento = False
+            # Meio aberto: uma chamada de teste por vez, as demais continuam falhando rápido
+            if self._teste_em_andamento:
+                metrics.incr(f'disjuntor.{self.nome}.rejeitadas')
+                return False
+            self._teste_em_andamento = True
+            return True
+
+    def sucesso(self):
+        with self._lock:
+            self.falhas = 0
+            self._teste_em_andamento = False
+            if self.estado != self.FECHADO:
+                self.estado = self.FECHADO
+                logger.info("disjuntor_fechado", dependencia=self.nome)
+
+    def falha(self):
+        with self._lock:
+            self.falhas += 1
+            self._teste_em_andamento = False
+            if self.limite_falhas and (self.estado == self.MEIO_ABERTO or self.falhas >= self.limite_falhas):
+                if self.estado != self.ABERTO:
+                    metrics.incr(f'disjuntor.{self.nome}.aberturas')
+                    logger.warning("disjuntor_aberto", dependencia=self.nome, falhas=self.falhas,
+                                   segundos=self.aberto_segundos)
+                self.estado = self.ABERTO
+                self._aberto_ate = time.monotonic() + self.aberto_segundos
+
+    def chamar(self, funcao, *args, **kwargs):
+        """Executa funcao pelo disjuntor: qualquer exceção conta como falha"""
+        if not self.permitir():
+            raise CircuitoAberto(self.nome, self.restante_aberto())
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException:
+            self.falha()
+            raise
+        self.sucesso()
+        return resultado
+
+
+# Um disjuntor por dependência e por worker (threads do mesmo processo compartilham o estado)
+_disjuntores = {}
+_disjuntores_lock = threading.Lock()
+
+
+def disjuntor(nome):
+    with _disjuntores_lock:
+        if nome not in _disjuntores:
+            _disjuntores[nome] = Disjuntor(nome)
+        return _disjuntores[nome]
+
+
+def prazo_restante():
+    """Segundos até o prazo da requisição atual (None fora de requisição)"""
+    if not has_request_context():
+        return None
+    prazo = g.get('prazo')
+    return None if prazo is None else prazo - time.monotonic()
+
+
+def com_retry(funcao, *args, tentativas=3, base=0.2, teto=2.0, excecoes=(Exception,), circuito=None, **kwargs):
+    """
+    Chama funcao até `tentativas` vezes, com espera aleatória em [0, min(teto, base * 2^n)]
+    entre elas (full jitter). Desiste antes de dormir além do prazo da requisição e
+    não tenta de novo com o circuito aberto.
+    """
+    for tentativa in range(tentativas):
+        try:
+            if circuito is not None:
+                return circuito.chamar(funcao, *args, **kwargs)
+            return funcao(*args, **kwargs)
+        except CircuitoAberto:
+            raise
+        except excecoes as e:
+            if tentativa == tentativas - 1:
+                raise
+            espera = random.uniform(0, min(teto, base * 2 ** tentativa))
+            restante = prazo_restante()
+            if restante is not None and espera >= restante:
+                metrics.incr('retry.sem_prazo')
+                raise
+            metrics.incr('retry.tentativas')
+            logger.warning("retry_attempt", function=getattr(funcao, '__name__', str(funcao)),
+                           attempt=tentativa + 1, max_retries=tentativas, error=str(e))
+            time.sleep(espera)
+
+
+def retry(**opcoes):
+    """Versão decorator de com_retry"""
+    def decorator(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            return com_retry(funcao, *args, **opcoes, **kwargs)
+        return wrapper
+    return decorator
+
+
+class FilaRetentativas:
+    """
+    Tarefas adiadas, executadas por uma thread do worker na ordem do horário
+    agendado, dentro do app context de quem agendou. Falhas voltam para a fila
+    com backoff e jitter; com o circuito aberto, esperam ele fechar.
+    """
+
+    def __init__(self, maximo=None):
+        self.maximo = Config.RETRY_FILA_MAX if maximo is None else maximo
+        self._heap = []
+        self._sequencia = itertools.count()
+        self._condicao = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def agendar(self, funcao, *args, tentativas=5, base=1.0, teto=60.0, atraso=0.0, circuito=None, **kwargs):
+        """Enfileira funcao(*args, **kwargs); False se a fila está cheia (a tarefa é descartada)"""
+        app = current_app._get_current_object() if has_app_context() else None
+        tarefa = {'funcao': funcao, 'args': args, 'kwargs': kwargs, 'app': app, 'circuito': circuito,
+                  'tentativa': 0, 'tentativas': tentativas, 'base': base, 'teto': teto}
+        with self._condicao:
+            self._garantir_thread()
+            if len(self._heap) >= self.maximo:
+                metrics.incr('retry.adiadas_descartadas')
+                logger.warning("retry_fila_cheia", function=getattr(funcao, '__name__', str(funcao)))
+                return False
+            self._empilhar(tarefa, atraso)
+        metrics.incr('retry.adiadas')
+        return True
+
+    def _empilhar(self, tarefa, atraso):
+        heapq.heappush(self._heap, (time.monotonic() + atraso, next(self._sequencia), tarefa))
+        self._condicao.notify()
+
+    def _garantir_thread(self):
+        # Depois de um fork a thread do pai não existe no filho: recomeça com a fila vazia
+        if self._pid != os.getpid():
+            self._heap = []
+            self._thread = None
+            self._pid = os.getpid()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._rodar, name='fila-retentativas', daemon=True)
+            self._thread.start()
+
+    def _rodar(self):
+        while True:
+            with self._condicao:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._condicao.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, tarefa = heapq.heappop(self._heap)
+            self._executar(tarefa)
+
+    def _executar(self, tarefa):
+        funcao = tarefa['funcao']
+        circuito = tarefa['circuito']
+        try:
+            with tarefa['app'].app_context() if tarefa['app'] is not None else nullcontext():
+                if circuito is not None:
+                    circuito.chamar(funcao, *tarefa['args'], **tarefa['kwargs'])
+                else:
+                    funcao(*tarefa['args'], **tarefa['kwargs'])
+            metrics.incr('retry.adiadas_concluidas')
+            return
+        except CircuitoAberto as e:
+            # Não gasta tentativa: só volta quando o disjuntor for testar a dependência
+            with self._condicao:
+                self._empilhar(tarefa, e.restante + random.uniform(0, 1))
+            return
+        except Exception as e:
+            erro = e
+
+        tarefa['tentativa'] += 1
+        if tarefa['tentativa'] >= tarefa['tentativas']:
+            metrics.incr('retry.adiadas_perdidas')
+            logger.error("max_retries_reached", function=getattr(funcao, '__name__', str(funcao)), error=str(erro))
+            return
+        espera = random.uniform(0, min(tarefa['teto'], tarefa['base'] * 2 ** tarefa['tentativa']))
+        with self._condicao:
+            self._empilhar(tarefa, espera)
+
+
+fila_retentativas = FilaRetentativas()
+adiar = fila_retentativas.agendar
+
+
+def estado_resiliencia():
+    return {
+        'disjuntores': {nome: {'estado': d.estado, 'falhas': d.falhas, 'aberto_por': round(d.restante_aberto(), 1)}
+                        for nome, d in list(_disjuntores.items())},
+        'fila_retentativas': len(fila_retentativas),
+    }
+
+
+metrics.registrar_fonte('resiliencia', estado_resiliencia)
+
+
+def init_resiliencia(app):
+    """Marca o prazo de cada requisição, usado para limitar retries e timeouts"""
+    @app.before_request
+    def marcar_prazo():
+        g.prazo = time.monotonic() + Config.REQUEST_DEADLINE_SEGUNDOS
@@ -1,11 +1,10 @@
 """
 Serviço de validação para contribuições e pagamentos
 """
-from decimal import Decimal
-from datetime import datetime, timedelta
 from models.contribuicao import Contribuicao
 from models.presente import Presente
 from database import db
+from dinheiro import para_centavos
 
 class ValidationService:
     @staticmethod
@@ -22,23 +21,9 @@ class ValidationService:
             
         if presente:
             # 2. Verifica apenas valor mínimo
-            valor_decimal = Decimal(str(valor))
-            if valor_decimal < Decimal('5.00'):
+            if para_centavos(valor) < 500:
                 errors.append("Valor mínimo de contribuição: R$ 5,00")
         
-        # 3. Verifica limite de tentativas por email (para evitar spam)
-        if email:
-            agora = datetime.utcnow()
-            inicio_janela = agora - timedelta(minutes=5)  # Reduzido para 5 minutos
-            
-            tentativas = Contribuicao.query.filter(
-                Contribuicao.email_contribuinte == email,
-                Contribuicao.created_at >= inicio_janela
-            ).count()
-            
-            if tentativas >= 5:
-                errors.append("Muitas tentativas em um curto período. Tente novamente em 5 minutos")
-        
         return errors
     
     @staticmethod
@@ -0,0 +1,252 @@
+"""
+Modo snapshot (SNAPSHOT=1): a página pública e as páginas /obrigado e /erro
+renderizadas para HTML estático (mais o .gz) a cada nova versão do catálogo, e
+servidas por um middleware WSGI antes do Flask, sem roteamento, SQLAlchemy nem
+Jinja. O Python fica com /api/*, /admin e o resto; um proxy na frente pode
+servir a mesma pasta direto (veja o README).
+
+Layout em SNAPSHOT_DIR: padrao/ (lista padrão), l/<slug>/ (listas por caminho)
+e dominios/<dominio>/ (listas por domínio, com MULTI_LISTA=1). Cada pasta tem
+index.html, obrigado.html, erro.html, os .gz e snapshot.json (versão e
+cabeçalhos), gravado por último. Toda escrita é arquivo temporário + rename:
+quem lê (o middleware, o nginx) nunca vê um arquivo pela metade.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from werkzeug.http import parse_accept_header
+from werkzeug.datastructures import Accept
+from config import Config
+from lru_cache import LRUCache
+from metrics import metrics
+from security import logger
+
+# Rota -> arquivo (mesmos nomes que o try_files do proxy procura)
+PAGINAS = {'/': 'index.html', '/obrigado': 'obrigado.html', '/erro': 'erro.html'}
+META = 'snapshot.json'
+
+# Cabeçalhos da resposta renderizada que valem para o arquivo (segurança e tipo)
+CABECALHOS = ('Content-Type', 'Content-Security-Policy', 'Strict-Transport-Security',
+              'X-Content-Type-Options', 'X-Frame-Options', 'X-XSS-Protection', 'Referrer-Policy')
+
+PREFIXO_RE = re.compile(r'^/l/([a-z0-9][a-z0-9-]{0,59})(/.*)?$')
+DOMINIO_RE = re.compile(r'^[a-z0-9-]+(\.[a-z0-9-]+)*$')
+
+# Pastas carregadas em memória pelo middleware (recarregadas quando o snapshot.json muda)
+MAX_PASTAS_EM_MEMORIA = 1000
+
+_lock = threading.Lock()
+_versoes = {}  # lista_id -> versão do catálogo já gravada por este processo
+
+
+def _gravar_atomico(caminho, dados):
+    temporario = f'{caminho}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(dados)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+
+def _ler(caminho):
+    try:
+        with open(caminho, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _destinos(lista):
+    """(pasta, host, prefixo de URL) em que a lista é servida"""
+    if not Config.MULTI_LISTA:
+        return [(os.path.join(Config.SNAPSHOT_DIR, 'padrao'), 'localhost', '')]
+    destinos = [(os.path.join(Config.SNAPSHOT_DIR, 'l', lista.slug), 'localhost', f'/l/{lista.slug}')]
+    dominio = (lista.dominio or '').lower()
+    if DOMINIO_RE.match(dominio):
+        destinos.append((os.path.join(Config.SNAPSHOT_DIR, 'dominios', dominio), dominio, ''))
+    return destinos
+
+
+def _renderizar(app, host, prefixo):
+    """{arquivo: (html, cabeçalhos)} pelas rotas de verdade, ou None se alguma falhar"""
+    cliente = app.test_client()
+    paginas = {}
+    for rota, arquivo in PAGINAS.items():
+        resposta = cliente.get(prefixo + rota, base_url=f'http://{host}/',
+                               environ_base={'snapshot.renderizando': True})
+        try:
+            corpo = resposta.get_data()
+            if resposta.status_code != 200 or b'</html>' not in corpo:
+                logger.warning("snapshot_render_falhou", rota=prefixo + rota, status=resposta.status_code)
+                return None
+            paginas[arquivo] = (corpo, [[k, v] for k, v in resposta.headers.items() if k in CABECALHOS])
+        finally:
+            resposta.close()
+    return paginas
+
+
+def _gravar_pasta(pasta, paginas, versao):
+    """Grava só o que mudou; snapshot.json por último. Retorna quantos arquivos gravou"""
+    os.makedirs(pasta, exist_ok=True)
+    gravados = 0
+    for arquivo, (corpo, _) in paginas.items():
+        caminho = os.path.join(pasta, arquivo)
+        if _ler(caminho) != corpo:
+            _gravar_atomico(caminho + '.gz', gzip.compress(corpo, compresslevel=9, mtime=0))
+            _gravar_atomico(caminho, corpo)
+            gravados += 1
+    meta = json.dumps({
+        'versao': versao,
+        'cabecalhos': {arquivo: cabecalhos for arquivo, (_, cabecalhos) in paginas.items()}
+    }, sort_keys=True).encode()
+    caminho = os.path.join(pasta, META)
+    if gravados or _ler(caminho) != meta:
+        _gravar_atomico(caminho, meta)
+    return gravados
+
+
+def gerar_snapshot(app, lista_id=None, forcar=False):
+    """
+    Renderiza as páginas da lista e grava as que mudaram, se a versão do
+    catálogo mudou desde a última geração neste processo (ou com forcar).
+    Retorna quantos arquivos HTML foram gravados.
+    """
+    from models.lista import Lista, LISTA_PADRAO_ID
+    from database import db
+    from services.catalogo_service import versao_catalogo
+
+    lista_id = lista_id or LISTA_PADRAO_ID
+    with _lock, app.app_context():
+        versao = versao_catalogo(lista_id)
+        if not forcar and _versoes.get(lista_id) == versao:
+            return 0
+        lista = db.session.get(Lista, lista_id)
+        if lista is None or not lista.ativo:
+            return 0
+        destinos = _destinos(lista)
+        db.session.remove()
+
+        gravados = 0
+        for pasta, host, prefixo in destinos:
+            paginas = _renderizar(app, host, prefixo)
+            if paginas is None:
+                return gravados  # mantém o snapshot anterior; tenta de novo na próxima versão
+            gravados += _gravar_pasta(pasta, paginas, versao)
+        _versoes[lista_id] = versao
+    metrics.incr('snapshot.geracoes')
+    logger.info("snapshot_gerado", lista_id=lista_id, versao=versao, arquivos=gravados)
+    return gravados
+
+
+def gerar_todas(app, forcar=True):
+    """Gera o snapshot de todas as listas ativas (deploy, cron)"""
+    from models.lista import Lista
+    from database import db
+
+    with app.app_context():
+        ids = db.session.execute(db.select(Lista.id).where(Lista.ativo.is_(True))).scalars().all()
+    if not Config.MULTI_LISTA:
+        ids = ids[:1]
+    return sum(gerar_snapshot(app, lista_id, forcar=forcar) for lista_id in ids)
+
+
+class SnapshotMiddleware:
+    """Serve os snapshots de GET/HEAD das páginas públicas antes de chegar ao Flask"""
+
+    def __init__(self, wsgi_app, raiz):
+        self.wsgi_app = wsgi_app
+        self.raiz = raiz
+        # pasta -> (mtime do snapshot.json, {arquivo: (corpo, corpo_gz, etag, cabeçalhos)})
+        self._pastas = LRUCache(max_itens=MAX_PASTAS_EM_MEMORIA)
+
+    def _localizar(self, environ):
+        """(pasta, rota) da requisição, seguindo a mesma resolução de lista_service"""
+        caminho = environ.get('PATH_INFO') or '/'
+        if not Config.MULTI_LISTA:
+            return os.path.join(self.raiz, 'padrao'), caminho
+        match = PREFIXO_RE.match(caminho)
+        if match:
+            return os.path.join(self.raiz, 'l', match.group(1)), match.group(2) or '/'
+        # Sem prefixo, só domínios com snapshot próprio; os demais caem no Flask
+        dominio = environ.get('HTTP_HOST', '').split(':')[0].lower()
+        if not DOMINIO_RE.match(dominio):
+            return None, caminho
+        return os.path.join(self.raiz, 'dominios', dominio), caminho
+
+    def _carregar(self, pasta):
+        try:
+            mtime = os.stat(os.path.join(pasta, META)).st_mtime_ns
+        except OSError:
+            return None
+        carregada = self._pastas.get(pasta)
+        if carregada is not None and carregada[0] == mtime:
+            return carregada[1]
+
+        try:
+            meta = json.loads(_ler(os.path.join(pasta, META)) or b'')
+        except ValueError:
+            return None
+        paginas = {}
+        for arquivo, cabecalhos in meta.get('cabecalhos', {}).items():
+            corpo = _ler(os.path.join(pasta, arquivo))
+            if corpo is None:
+                continue
+            etag = '"%s"' % hashlib.sha256(corpo).hexdigest()[:20]
+            paginas[arquivo] = (corpo, _ler(os.path.join(pasta, arquivo + '.gz')), etag,
+                                [tuple(c) for c in cabecalhos])
+        self._pastas.set(pasta, (mtime, paginas))
+        return paginas
+
+    def __call__(self, environ, start_response):
+        metodo = environ.get('REQUEST_METHOD')
+        if metodo not in ('GET', 'HEAD') or environ.get('snapshot.renderizando'):
+            return self.wsgi_app(environ, start_response)
+        pasta, rota = self._localizar(environ)
+        arquivo = PAGINAS.get(rota)
+        pagina = (self._carregar(pasta) or {}).get(arquivo) if pasta and arquivo else None
+        if pagina is None:
+            return self.wsgi_app(environ, start_response)
+
+        corpo, corpo_gz, etag, cabecalhos = pagina
+        metrics.incr('snapshot.servidas')
+        headers = list(cabecalhos) + [
+            ('ETag', etag),
+            ('Cache-Control', f'public, max-age={Config.SNAPSHOT_MAX_AGE}'),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+            start_response('304 Not Modified', headers)
+            return []
+        if corpo_gz and parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING'), Accept)['gzip']:
+            corpo = corpo_gz
+            headers.append(('Content-Encoding', 'gzip'))
+        headers.append(('Content-Length', str(len(corpo))))
+        start_response('200 OK', headers)
+        return [] if metodo == 'HEAD' else [corpo]
+
+
+def init_snapshot(app):
+    """
+    Com SNAPSHOT=1: gera o snapshot da lista padrão, regrava a cada invalidação
+    do catálogo e instala o middleware (por último, para ficar por fora de todos).
+    """
+    if not Config.SNAPSHOT:
+        return app
+    from services.catalogo_service import ao_invalidar_catalogo
+
+    def regenerar(lista_id):
+        try:
+            gerar_snapshot(app, lista_id)
+        except Exception as e:
+            # Snapshot velho continua servido; a sincronização do catálogo não pode falhar por isso
+            metrics.incr('snapshot.erros')
+            logger.error("snapshot_erro", lista_id=lista_id, error=str(e))
+
+    ao_invalidar_catalogo(regenerar)
+    regenerar(None)
+    app.wsgi_app = SnapshotMiddleware(app.wsgi_app, Config.SNAPSHOT_DIR)
+    logger.info("snapshot_ativado", dir=Config.SNAPSHOT_DIR)
+    return app
@@ -30,7 +30,8 @@ class WeddingGiftApp {
     openPagamentoModal(button) {
         const presenteId = button.dataset.presenteId;
         const presenteNome = button.dataset.presenteNome;
-        const valorTotal = parseFloat(button.dataset.presenteValor);
+        // Texto "150.00" vindo do servidor: sem float no navegador
+        const valorTotal = button.dataset.presenteValor;
 
         // Valida se elementos existem antes de usar
         const nomeSpan = document.getElementById('modal-presente-nome');
@@ -49,18 +50,18 @@ class WeddingGiftApp {
         
         // Define o valor fixo do presente (não editável)
         if (valorExibidoSpan) {
-            valorExibidoSpan.textContent = valorTotal.toFixed(2);
+            valorExibidoSpan.textContent = valorTotal;
         }
         
         // Define o valor fixo no campo hidden
-        valorInput.value = valorTotal.toFixed(2);
+        valorInput.value = valorTotal;
 
         // Limpa o formulário (exceto o valor que é fixo)
         const form = document.getElementById('formPagamento');
         if (form) {
             form.reset();
             // Restaura o valor fixo após o reset
-            valorInput.value = valorTotal.toFixed(2);
+            valorInput.value = valorTotal;
         }
 
         // Abre o modal
@@ -102,7 +103,7 @@ class WeddingGiftApp {
             email: formData.get('email'),
             cpf: formData.get('cpf'),
             telefone: formData.get('telefone'),
-            valor: parseFloat(formData.get('valor')),
+            valor: formData.get('valor'),
             mensagem: formData.get('mensagem'),
             metodo_pagamento: 'pix'
         };
@@ -111,7 +112,7 @@ class WeddingGiftApp {
             // Mostra loading
             this.showLoading();
 
-            const response = await fetch('/api/contribuir', {
+            const response = await fetch(document.body.dataset.urlContribuir, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -128,10 +129,7 @@ class WeddingGiftApp {
                 pagamentoModal?.hide();
                 
                 // Preenche e abre modal PIX
-                const valorPixSpan = document.getElementById('valor-pix');
-                if (valorPixSpan) {
-                    valorPixSpan.textContent = data.valor.toFixed(2);
-                }
+                this.mostrarPix(result.pix, data.valor);
                 this.copiarChavePix();
                 
                 const modalPixEl = document.getElementById('modalPix');
@@ -173,10 +171,30 @@ class WeddingGiftApp {
         alert(message);
     }
 
+    // PIX copia e cola (valor e txid) e QR Code gerados pelo servidor
+    mostrarPix(pix, valor) {
+        const valorPixSpan = document.getElementById('valor-pix');
+        if (valorPixSpan) {
+            valorPixSpan.textContent = pix ? pix.valor : valor;
+        }
+        const codigo = document.getElementById('pix-copia-cola');
+        if (codigo && pix) {
+            codigo.value = pix.copia_e_cola;
+        }
+        const qr = document.getElementById('qr-pix');
+        const url = pix && (pix.qr_code.svg || pix.qr_code.png);
+        if (qr) {
+            qr.classList.toggle('d-none', !url);
+            if (url) {
+                qr.src = url;
+            }
+        }
+    }
+
     copiarChavePix() {
-        const chavePix = '83991314075';
+        const chavePix = document.getElementById('pix-copia-cola')?.value || document.body.dataset.chavePix || '';
         navigator.clipboard.writeText(chavePix).then(() => {
-            console.log('Chave PIX copiada: ' + chavePix);
+            console.log('Código PIX copiado');
         }).catch(err => {
             console.error('Erro ao copiar: ', err);
         });
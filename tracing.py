@@ -0,0 +1,377 @@
+"""
+Tracing leve por requisição: spans em contextvars em volta das fases do Flask
+(before/after_request, view), dos trechos marcados com span() e de cada SQL.
+Os spans de toda requisição são registrados em memória; só são exportados
+(OTLP/JSON, arquivo ou coletor) os traces amostrados e os lentos.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import Config
+from metrics import metrics
+
+# Limite de spans por trace (requisições patológicas não crescem sem fim)
+MAX_SPANS = 256
+
+# Tamanho máximo do SQL guardado no span
+MAX_SQL = 300
+
+_span_atual = contextvars.ContextVar('span_atual', default=None)
+
+
+class Trace:
+    __slots__ = ('trace_id', 'spans', 'amostrado', 'descartados')
+
+    def __init__(self, trace_id, amostrado):
+        self.trace_id = trace_id
+        self.spans = []
+        self.amostrado = amostrado
+        self.descartados = 0
+
+
+class Span:
+    __slots__ = ('trace', 'span_id', 'parent_id', 'nome', 'inicio', 'fim', 'atributos', 'erro')
+
+    def __init__(self, trace, nome, parent_id=None, atributos=None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.nome = nome
+        self.inicio = time.time_ns()
+        self.fim = None
+        self.atributos = atributos or {}
+        self.erro = None
+
+
+class _SpanNulo:
+    """Contexto vazio usado fora de um trace (custo de uma consulta ao contextvar)"""
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _SpanNulo()
+
+
+class _ContextoSpan:
+    __slots__ = ('span', 'token')
+
+    def __init__(self, span):
+        self.span = span
+        self.token = None
+
+    def __enter__(self):
+        self.token = _span_atual.set(self.span)
+        return self.span
+
+    def __exit__(self, tipo, valor, tb):
+        self.span.fim = time.time_ns()
+        if valor is not None:
+            self.span.erro = f'{tipo.__name__}: {valor}'
+        _span_atual.reset(self.token)
+        return False
+
+
+def _novo_filho(nome, atributos):
+    pai = _span_atual.get()
+    if pai is None:
+        return None
+    trace = pai.trace
+    if len(trace.spans) >= MAX_SPANS:
+        trace.descartados += 1
+        return None
+    span = Span(trace, nome, pai.span_id, atributos)
+    trace.spans.append(span)
+    return span
+
+
+def span(nome, **atributos):
+    """Context manager de um span filho do span atual (não faz nada sem trace ativo)"""
+    filho = _novo_filho(nome, atributos)
+    return _ContextoSpan(filho) if filho is not None else _NULO
+
+
+def ids_trace(logger, metodo, evento):
+    """Processor do structlog: acrescenta trace_id e span_id dentro de um trace"""
+    atual = _span_atual.get()
+    if atual is not None:
+        evento['trace_id'] = atual.trace.trace_id
+        evento['span_id'] = atual.span_id
+    return evento
+
+
+def _instrumentar(funcao, nome):
+    """Envolve uma função do Flask (hook ou view) num span"""
+    @functools.wraps(funcao)
+    def wrapper(*args, **kwargs):
+        with span(nome):
+            return funcao(*args, **kwargs)
+    return wrapper
+
+
+def _nome_funcao(funcao):
+    funcao = getattr(funcao, 'func', funcao)  # functools.partial
+    return getattr(funcao, '__qualname__', None) or repr(funcao)
+
+
+# --- SQL ---
+def _antes_sql(conn, cursor, statement, parameters, context, executemany):
+    filho = _novo_filho('sql', {'db.system': conn.dialect.name, 'db.statement': statement[:MAX_SQL]})
+    if filho is not None:
+        conn.info.setdefault('tracing_spans', []).append(filho)
+
+
+def _depois_sql(conn, cursor, statement, parameters, context, executemany):
+    pilha = conn.info.get('tracing_spans')
+    if pilha:
+        filho = pilha.pop()
+        filho.fim = time.time_ns()
+        if cursor is not None and cursor.rowcount >= 0:
+            filho.atributos['db.rows'] = cursor.rowcount
+
+
+def _erro_sql(contexto_excecao):
+    pilha = contexto_excecao.connection.info.get('tracing_spans') if contexto_excecao.connection else None
+    if pilha:
+        filho = pilha.pop()
+        filho.fim = time.time_ns()
+        filho.erro = str(contexto_excecao.original_exception)[:MAX_SQL]
+
+
+# --- Exportação OTLP/JSON ---
+def _atributos_otlp(atributos):
+    convertidos = []
+    for chave, valor in atributos.items():
+        if isinstance(valor, bool):
+            convertidos.append({'key': chave, 'value': {'boolValue': valor}})
+        elif isinstance(valor, int):
+            convertidos.append({'key': chave, 'value': {'intValue': str(valor)}})
+        elif isinstance(valor, float):
+            convertidos.append({'key': chave, 'value': {'doubleValue': valor}})
+        else:
+            convertidos.append({'key': chave, 'value': {'stringValue': str(valor)}})
+    return convertidos
+
+
+def para_otlp(traces):
+    """ExportTraceServiceRequest (OTLP/JSON) com os spans dos traces"""
+    spans = []
+    for trace in traces:
+        raiz = trace.spans[0]
+        for s in trace.spans:
+            item = {
+                'traceId': trace.trace_id,
+                'spanId': s.span_id,
+                'name': s.nome,
+                'kind': 2 if s is raiz else 1,  # SERVER na raiz, INTERNAL nos demais
+                'startTimeUnixNano': str(s.inicio),
+                'endTimeUnixNano': str(s.fim or s.inicio),
+                'attributes': _atributos_otlp(s.atributos),
+                'status': {'code': 2, 'message': s.erro} if s.erro else {'code': 0}
+            }
+            if s.parent_id:
+                item['parentSpanId'] = s.parent_id
+            spans.append(item)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _atributos_otlp({'service.name': Config.TRACE_SERVICO, 'process.pid': os.getpid()})},
+            'scopeSpans': [{'scope': {'name': 'tracing'}, 'spans': spans}]
+        }]
+    }
+
+
+class Exportador:
+    """Exporta lotes de traces numa thread própria; com a fila cheia, descarta"""
+
+    def __init__(self, destino, tamanho_lote=64, intervalo=2.0):
+        self.destino = destino
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.fila = queue.Queue(maxsize=Config.TRACE_QUEUE_MAX)
+        self._lock_arquivo = threading.Lock()
+        self._thread = None
+
+    def iniciar(self):
+        self.fila = queue.Queue(maxsize=Config.TRACE_QUEUE_MAX)
+        self._thread = threading.Thread(target=self._rodar, name='tracing-export', daemon=True)
+        self._thread.start()
+
+    def enviar(self, trace):
+        try:
+            self.fila.put_nowait(trace)
+        except queue.Full:
+            metrics.incr('tracing.descartados')
+
+    def parar(self):
+        if self._thread is not None and self._thread.is_alive():
+            self.fila.put(None)
+            self._thread.join(timeout=5)
+
+    def _rodar(self):
+        while True:
+            lote = []
+            try:
+                item = self.fila.get(timeout=self.intervalo)
+                while item is not None:
+                    lote.append(item)
+                    if len(lote) >= self.tamanho_lote:
+                        break
+                    item = self.fila.get_nowait()
+            except queue.Empty:
+                item = True
+            if lote:
+                self.exportar(lote)
+            if item is None:
+                return
+
+    def exportar(self, traces):
+        corpo = json.dumps(para_otlp(traces), separators=(',', ':')).encode('utf-8')
+        try:
+            if self.destino.startswith(('http://', 'https://')):
+                requisicao = urllib.request.Request(self.destino, data=corpo,
+                                                    headers={'Content-Type': 'application/json'})
+                urllib.request.urlopen(requisicao, timeout=5).close()
+            else:
+                # Um ExportTraceServiceRequest por linha
+                with self._lock_arquivo, open(self.destino, 'ab') as f:
+                    f.write(corpo + b'\n')
+            metrics.incr('tracing.exportados', len(traces))
+        except Exception:
+            metrics.incr('tracing.erros_exportacao')
+
+
+# --- Ciclo da requisição ---
+def _parse_traceparent(valor):
+    """W3C traceparent: (trace_id, parent_id, amostrado) ou None"""
+    partes = (valor or '').split('-')
+    if len(partes) != 4 or len(partes[1]) != 32 or len(partes[2]) != 16:
+        return None
+    try:
+        int(partes[1], 16), int(partes[2], 16), int(partes[3], 16)
+    except ValueError:
+        return None
+    return partes[1], partes[2], bool(int(partes[3], 16) & 1)
+
+
+class TracingMiddleware:
+    """Abre o span raiz de cada requisição e decide a exportação quando a resposta termina"""
+
+    def __init__(self, wsgi_app, exportador):
+        self.wsgi_app = wsgi_app
+        self.exportador = exportador
+
+    def __call__(self, environ, start_response):
+        remoto = _parse_traceparent(environ.get('HTTP_TRACEPARENT'))
+        if remoto:
+            trace_id, parent_id, amostrado = remoto
+        else:
+            trace_id, parent_id, amostrado = os.urandom(16).hex(), None, random.random() < Config.TRACE_SAMPLE_RATE
+
+        trace = Trace(trace_id, amostrado)
+        raiz = Span(trace, f"{environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')}", parent_id, {
+            'http.method': environ.get('REQUEST_METHOD'),
+            'http.target': environ.get('PATH_INFO'),
+        })
+        trace.spans.append(raiz)
+        token = _span_atual.set(raiz)
+
+        def start_response_com_status(status, headers, exc_info=None):
+            raiz.atributos['http.status_code'] = int(status.split(' ', 1)[0])
+            headers.append(('X-Trace-Id', trace_id))
+            return start_response(status, headers, exc_info)
+
+        try:
+            resposta = self.wsgi_app(environ, start_response_com_status)
+        except Exception as e:
+            raiz.erro = f'{type(e).__name__}: {e}'
+            self._finalizar(raiz, token)
+            raise
+        return _RespostaRastreada(resposta, lambda: self._finalizar(raiz, token))
+
+    def _finalizar(self, raiz, token):
+        raiz.fim = time.time_ns()
+        try:
+            _span_atual.reset(token)
+        except ValueError:
+            # Resposta consumida em outro contexto (ex.: streaming)
+            _span_atual.set(None)
+
+        trace = raiz.trace
+        duracao_ms = (raiz.fim - raiz.inicio) / 1e6
+        metrics.observe('tracing.requisicao_ms', duracao_ms)
+        if trace.descartados:
+            raiz.atributos['tracing.spans_descartados'] = trace.descartados
+        if raiz.atributos.get('http.status_code', 200) >= 500:
+            raiz.erro = raiz.erro or 'HTTP 5xx'
+        if trace.amostrado or duracao_ms >= Config.TRACE_LENTO_MS or raiz.erro:
+            self.exportador.enviar(trace)
+
+
+class _RespostaRastreada:
+    """Iterável WSGI que fecha o span raiz quando o servidor termina de enviar a resposta"""
+
+    def __init__(self, resposta, ao_fechar):
+        self.resposta = resposta
+        self.ao_fechar = ao_fechar
+
+    def __iter__(self):
+        return iter(self.resposta)
+
+    def close(self):
+        try:
+            if hasattr(self.resposta, 'close'):
+                self.resposta.close()
+        finally:
+            self.ao_fechar()
+
+
+def init_tracing(app):
+    """Liga o tracing (Config.TRACING); chamar depois de registrar rotas e hooks"""
+    if not Config.TRACING:
+        return app
+
+    # Fases do Flask: cada hook e cada view num span com o nome da função
+    for funcs, fase in ((app.before_request_funcs, 'before_request'), (app.after_request_funcs, 'after_request')):
+        for chave, lista in funcs.items():
+            funcs[chave] = [_instrumentar(f, f'{fase}:{_nome_funcao(f)}') for f in lista]
+    for endpoint, view in app.view_functions.items():
+        app.view_functions[endpoint] = _instrumentar(view, f'view:{endpoint}')
+
+    # Rate limit dos decorators @limiter.limit (o global já aparece como before_request)
+    for limiter in app.extensions.get('limiter', ()):
+        limiter._check_request_limit = _instrumentar(limiter._check_request_limit, 'limiter')
+
+    @app.before_request
+    def nomear_trace():
+        # Nome do span raiz pela regra da rota (baixa cardinalidade), não pelo caminho
+        atual = _span_atual.get()
+        if atual is not None and request.url_rule is not None:
+            raiz = atual.trace.spans[0]
+            raiz.nome = f'{request.method} {request.url_rule.rule}'
+            raiz.atributos['http.route'] = request.url_rule.rule
+
+    if not event.contains(Engine, 'before_cursor_execute', _antes_sql):
+        event.listen(Engine, 'before_cursor_execute', _antes_sql)
+        event.listen(Engine, 'after_cursor_execute', _depois_sql)
+        event.listen(Engine, 'handle_error', _erro_sql)
+
+    exportador = Exportador(Config.TRACE_EXPORT)
+    exportador.iniciar()
+    atexit.register(exportador.parar)
+    os.register_at_fork(after_in_child=exportador.iniciar)
+
+    app.wsgi_app = TracingMiddleware(app.wsgi_app, exportador)
+    app.extensions['tracing'] = exportador
+    return app